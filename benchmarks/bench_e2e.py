@@ -0,0 +1,258 @@
+"""Benchmark end-to-end: replay pertanyaan lewat Retriever.search + generate_answer pada concurrency tetap.
+
+Default memakai mock Ollama in-process (benchmarks/mock_ollama.py), jadi hasil
+mengukur kode kita, bukan model. Laporan: p50/p95/p99 per tahap, throughput,
+dan peak RSS proses.
+
+Contoh:
+    python -m benchmarks.bench_e2e
+    python -m benchmarks.bench_e2e --concurrency 8 --requests 400 --tokens-per-s 15
+    python -m benchmarks.bench_e2e --mode pipeline --json bench_e2e.json
+    python -m benchmarks.bench_e2e --ollama-host http://127.0.0.1:11434   # Ollama asli
+    python -m benchmarks.bench_e2e --cold-embed    # embedding cache mati: setiap request meng-encode
+
+Embedding cache tidak pernah dipersist (cache/query_embeddings.npz tidak
+disentuh) dan dikosongkan setelah warmup.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import config
+from benchmarks.mock_ollama import start_mock_server, add_mock_arguments
+
+DEFAULT_QUESTIONS = [
+    "Apa saja gejala COVID-19?",
+    "Bagaimana cara penularan virus corona?",
+    "Kapan vaksinasi COVID-19 dimulai di Indonesia?",
+    "Apakah vaksin COVID-19 aman untuk ibu hamil?",
+    "Bagaimana efektivitas vaksin Sinovac terhadap varian Delta?",
+    "Apa perbedaan PPKM level 3 dan level 4?",
+    "Berapa lama masa isolasi mandiri untuk pasien positif tanpa gejala?",
+    "Apa yang harus dilakukan jika kontak erat dengan pasien COVID-19?",
+    "Bagaimana kebijakan pemerintah tentang vaksin booster?",
+    "Apa itu herd immunity dan berapa persen cakupan vaksinasi yang dibutuhkan?",
+    "Berapa kasus baru di Jawa Barat pada 15 Juli 2021?",
+    "Provinsi mana dengan kasus terbanyak pada Juli 2021?",
+    "Bagaimana dampak pandemi terhadap UMKM di Indonesia?",
+    "Resep martabak manis yang enak",
+    "Bagaimana cara hack password wifi tetangga?",
+]
+
+PERCENTILES = (50, 95, 99)
+
+
+def load_questions(path):
+    """File .json (list string) atau teks satu pertanyaan per baris"""
+    if not path:
+        return list(DEFAULT_QUESTIONS)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return [str(q) for q in json.load(f)]
+        return [line.strip() for line in f if line.strip()]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: byte
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize_stage(values):
+    values = np.asarray(values, dtype="float64")
+    row = {"count": int(len(values)), "mean_ms": round(float(values.mean()), 2)}
+    for p in PERCENTILES:
+        row[f"p{p}_ms"] = round(float(np.percentile(values, p)), 2)
+    row["max_ms"] = round(float(values.max()), 2)
+    return row
+
+
+class Replay:
+    """Jalankan pertanyaan berulang-ulang dengan N worker; catat ms per tahap per request"""
+
+    def __init__(self, retriever, model_id, mode="direct", bypass_cache=True):
+        from src.generation import generate_answer, TRANSIENT_ANSWERS
+
+        self.retriever = retriever
+        self.model_id = model_id
+        self.mode = mode
+        self.bypass_cache = bypass_cache
+        self.generate_answer = generate_answer
+        self.transient_answers = TRANSIENT_ANSWERS
+        self.pipeline = None
+        if mode == "pipeline":
+            from src.pipeline import RequestPipeline
+            self.pipeline = RequestPipeline(retriever, model_id)
+
+        self.samples = []
+        self.outcomes = {}
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _direct(self, question):
+        stages = {}
+        start = time.perf_counter()
+        docs = self.retriever.search(question)
+        stages["retrieval"] = (time.perf_counter() - start) * 1000
+
+        generation_start = time.perf_counter()
+        answer = self.generate_answer(question, docs, self.model_id)
+        stages["generation"] = (time.perf_counter() - generation_start) * 1000
+        stages["total"] = (time.perf_counter() - start) * 1000
+        return stages, "fallback" if answer in self.transient_answers else "answer"
+
+    def _pipelined(self, question):
+        start = time.perf_counter()
+        result = self.pipeline.run(question, bypass_cache=self.bypass_cache)
+        answer = "".join(result["stream"])
+        stages = {stage: ms for stage, ms in result["timings"].items()}
+        stages["total"] = (time.perf_counter() - start) * 1000
+        outcome = result["kind"]
+        if outcome == "answer" and answer.strip() in self.transient_answers:
+            outcome = "fallback"
+        return stages, outcome
+
+    def one(self, question):
+        try:
+            stages, outcome = self._pipelined(question) if self.pipeline else self._direct(question)
+        except Exception as e:
+            print(f"❌ Request error: {e}")
+            with self._lock:
+                self.errors += 1
+            return
+        with self._lock:
+            self.samples.append(stages)
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def run(self, questions, n_requests, concurrency):
+        order = [questions[i % len(questions)] for i in range(n_requests)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as executor:
+            list(executor.map(self.one, order))
+        return time.perf_counter() - start
+
+    def report(self):
+        stages = {}
+        for sample in self.samples:
+            for stage, ms in sample.items():
+                stages.setdefault(stage, []).append(ms)
+        return {stage: summarize_stage(values) for stage, values in stages.items()}
+
+
+def run(args):
+    mock = None
+    if args.ollama_host:
+        config.OLLAMA["host"] = args.ollama_host
+    else:
+        mock = start_mock_server(
+            tokens_per_s=args.tokens_per_s,
+            latency_ms=args.latency_ms,
+            latency_sigma=args.latency_sigma,
+            tokens=args.tokens,
+            model_name=args.model
+        )
+        config.OLLAMA["host"] = mock.url
+        print(f"🚀 Mock Ollama di {mock.url}")
+    config.OLLAMA["max_connections"] = max(config.OLLAMA["max_connections"], args.concurrency)
+
+    # Jangan load/simpan embedding cache produksi; --cold-embed: tanpa cache sama sekali
+    config.MODEL_CONFIG["embedding_cache_persist"] = False
+    if args.cold_embed:
+        config.MODEL_CONFIG["embedding_cache_size"] = 0
+
+    from src.retriever import Retriever
+    from src.llm_client import get_llm_client
+
+    load_start = time.perf_counter()
+    retriever = Retriever(args.index, args.texts)
+    load_s = time.perf_counter() - load_start
+    get_llm_client().preload(args.model).result(30)
+
+    questions = load_questions(args.questions)
+    replay = Replay(retriever, args.model, mode=args.mode, bypass_cache=not args.use_cache)
+    if args.warmup:
+        replay.run(questions, args.warmup, args.concurrency)
+        replay.samples, replay.outcomes, replay.errors = [], {}, 0
+    # Tahap embed diukur dari cache kosong, bukan dari query warmup
+    retriever.embedding_cache.clear()
+
+    print(f"📊 {args.requests} request, concurrency {args.concurrency}, mode {args.mode}, "
+          f"{len(questions)} pertanyaan unik")
+    wall_s = replay.run(questions, args.requests, args.concurrency)
+
+    return {
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "completed": len(replay.samples),
+        "errors": replay.errors,
+        "outcomes": replay.outcomes,
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(len(replay.samples) / wall_s, 3) if wall_s else 0.0,
+        "retriever_load_s": round(load_s, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": replay.report(),
+        "embedding_cache": retriever.embedding_cache.stats(),
+        "llm_client": {k: v for k, v in get_llm_client().stats().items() if not k.endswith("_ms")},
+        "mock_ollama": mock.stats() if mock else None,
+    }
+
+
+def print_table(report):
+    print(f"\n{'stage':<12} {'count':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for stage, row in report["stages"].items():
+        print(f"{stage:<12} {row['count']:>6} {row['mean_ms']:>9.1f} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    print(f"\n⚡ Throughput: {report['throughput_rps']:.2f} req/s ({report['completed']} selesai, "
+          f"{report['errors']} error, {report['wall_s']:.1f}s)")
+    print(f"📦 Peak RSS: {report['peak_rss_mb']} MB")
+    print(f"🧾 Hasil: {report['outcomes']}")
+    embedding_cache = report["embedding_cache"]
+    print(f"🧮 Embedding cache: {embedding_cache['hits']} hit / {embedding_cache['misses']} miss "
+          f"(max_size {embedding_cache['max_size']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end retrieval + generation")
+    parser.add_argument("--questions", default=None, help="File pertanyaan (.json list atau satu per baris)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=20, help="Request awal yang tidak dihitung")
+    parser.add_argument("--mode", choices=["direct", "pipeline"], default="direct",
+                        help="direct: Retriever.search lalu generate_answer; pipeline: RequestPipeline")
+    parser.add_argument("--use-cache", action="store_true", help="Pakai answer cache (mode pipeline)")
+    parser.add_argument("--cold-embed", action="store_true",
+                        help="Matikan embedding cache query: tahap embed selalu memanggil embedder")
+    parser.add_argument("--index", default=config.INDEX_PATH)
+    parser.add_argument("--texts", default=config.TEXT_PATH)
+    parser.add_argument("--model", default="mistral:7b-instruct")
+    parser.add_argument("--ollama-host", default=None, help="Pakai Ollama ini, bukan mock")
+    add_mock_arguments(parser)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_table(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Hasil disimpan di: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Micro-benchmark GuardRail: scan substring per keyword vs KeywordMatcher satu sapuan.
+
+Keyword list diperbesar dengan kata sintetis untuk melihat biaya per panggilan
+saat daftar bertambah. Keputusan accept/reject dicek sama untuk kedua cara.
+Kolom 'default' = jalur yang dipakai validate_input (loop di bawah
+MATCHER_MIN_KEYWORDS keyword, matcher di atasnya).
+
+Contoh:
+    python -m benchmarks.bench_guard_rail
+    python -m benchmarks.bench_guard_rail --scales 1 4 16 64 --json hasil.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import string
+import argparse
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.guard_rail import GuardRail, INPUT_LISTS
+
+SAMPLE_QUESTIONS = [
+    "Apa saja gejala COVID-19?",
+    "Kapan vaksinasi dimulai di Indonesia?",
+    "Siapa orang pertama yang divaksin?",
+    "Apakah benar vaksin menyebabkan kemandulan?",
+    "Bagaimana cara hack password wifi tetangga?",
+    "Resep martabak manis yang enak",
+    "Berapa kasus baru di Jawa Barat pada 15 Juli 2021?",
+    "Bagaimana kebijakan PPKM level 4 di Jakarta dan apa bedanya dengan PSBB tahun 2020?",
+    "Lagu BTS terbaru judulnya apa?",
+    "Bantuan BLT untuk UMKM selama pandemi",
+]
+
+KEYWORD_LISTS = INPUT_LISTS
+
+
+def synthetic_words(n, seed):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12))) for _ in range(n)]
+
+
+def scaled_guard(scale, seed):
+    """GuardRail dengan setiap daftar keyword diperbesar `scale` kali"""
+    guard = GuardRail()
+    for offset, name in enumerate(KEYWORD_LISTS):
+        words = getattr(guard, name)
+        words.extend(synthetic_words(len(words) * (scale - 1), seed + offset))
+    guard.build_matcher()
+    return guard
+
+
+def time_per_call_us(fn, questions, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for question in questions:
+            fn(question)
+    return (time.perf_counter() - start) / (repeat * len(questions)) * 1e6
+
+
+def run(scales, repeat, seed):
+    rows = []
+    for scale in scales:
+        guard = scaled_guard(scale, seed)
+
+        for question in SAMPLE_QUESTIONS:
+            assert guard._validate_input_matcher(question) == guard._validate_input_loop(question), question
+
+        n_keywords = sum(len(getattr(guard, name)) for name in KEYWORD_LISTS)
+        build_start = time.perf_counter()
+        scaled_guard(scale, seed)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        rows.append({
+            "scale": scale,
+            "keywords": n_keywords,
+            "naive_us": round(time_per_call_us(guard._validate_input_loop, SAMPLE_QUESTIONS, repeat), 2),
+            "matcher_us": round(time_per_call_us(guard._validate_input_matcher, SAMPLE_QUESTIONS, repeat), 2),
+            "default": "matcher" if guard.use_matcher else "loop",
+            "build_ms": round(build_ms, 2),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark GuardRail keyword scan")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 4, 16, 64])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    rows = run(args.scales, args.repeat, args.seed)
+
+    print(f"{'scale':>6} {'keywords':>9} {'naive(us)':>10} {'matcher(us)':>12} {'build(ms)':>10} {'default':>8}")
+    for row in rows:
+        print(f"{row['scale']:>6} {row['keywords']:>9} {row['naive_us']:>10.2f} {row['matcher_us']:>12.2f} "
+              f"{row['build_ms']:>10.2f} {row['default']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n💾 Hasil disimpan di: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
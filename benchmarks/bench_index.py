@@ -0,0 +1,155 @@
+"""Perbandingan recall vs latency index ANN (IVF-Flat, IVF-PQ, HNSW) terhadap flat index.
+
+Contoh:
+    python -m benchmarks.bench_index                      # pakai vektor dari config.INDEX_PATH
+    python -m benchmarks.bench_index --synthetic 50000    # vektor sintetis 768-d, ternormalisasi, metric IP
+    python -m benchmarks.bench_index --synthetic 50000 --metric l2
+    python -m benchmarks.bench_index --json hasil.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import faiss
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import config
+from src.index_factory import build_index, configure_index, read_vectors
+
+NPROBE_SWEEP = [1, 4, 8, 16, 32, 64]
+EF_SEARCH_SWEEP = [16, 32, 64, 128, 256]
+
+
+def load_vectors(args):
+    if args.synthetic:
+        rng = np.random.default_rng(args.seed)
+        vectors = rng.standard_normal((args.synthetic, args.dim)).astype("float32")
+        if args.metric == "ip":
+            # Sama seperti index produksi: embedding ternormalisasi + inner product (cosine)
+            faiss.normalize_L2(vectors)
+        return vectors, args.metric
+
+    index = faiss.read_index(args.index)
+    metric = "ip" if index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2"
+    return read_vectors(index), metric
+
+
+def make_queries(vectors, n_queries, seed, metric="l2"):
+    """Query = vektor korpus + noise kecil, supaya mirip query asli yang dekat dengan dokumen"""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)
+    noise = rng.standard_normal((len(picks), vectors.shape[1])).astype("float32")
+    scale = float(np.std(vectors)) * 0.1
+    queries = np.ascontiguousarray(vectors[picks] + noise * scale, dtype="float32")
+    if metric == "ip":
+        faiss.normalize_L2(queries)
+    return queries
+
+
+def time_queries(index, queries, k):
+    """Latency per query (satu query per panggilan, seperti di chat)"""
+    latencies = []
+    ids = np.empty((len(queries), k), dtype="int64")
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, row_ids = index.search(queries[i:i + 1], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids[i] = row_ids[0]
+    return ids, np.array(latencies)
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def run(args):
+    vectors, metric = load_vectors(args)
+    queries = make_queries(vectors, args.queries, args.seed, metric)
+    print(f"📊 Korpus: {vectors.shape[0]} vektor, dim={vectors.shape[1]}, metric={metric}, queries={len(queries)}")
+
+    results = []
+
+    start = time.perf_counter()
+    flat = build_index(vectors, "flat", metric)
+    build_time = time.perf_counter() - start
+    truth, latencies = time_queries(flat, queries, args.k)
+    results.append(summarize("flat", {}, build_time, 1.0, latencies))
+
+    for index_type in args.types:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type, metric, hnsw_m=args.hnsw_m, pq_m=args.pq_m)
+        build_time = time.perf_counter() - start
+
+        if index_type == "hnsw":
+            sweep = [("ef_search", ef) for ef in EF_SEARCH_SWEEP]
+        else:
+            sweep = [("nprobe", nprobe) for nprobe in NPROBE_SWEEP]
+
+        for param, value in sweep:
+            configure_index(index, **{param: value})
+            found, latencies = time_queries(index, queries, args.k)
+            results.append(summarize(index_type, {param: value}, build_time, recall_at_k(found, truth), latencies))
+
+    return {
+        "n_vectors": int(vectors.shape[0]),
+        "dim": int(vectors.shape[1]),
+        "metric": metric,
+        "k": args.k,
+        "n_queries": int(len(queries)),
+        "results": results,
+    }
+
+
+def summarize(index_type, params, build_time, recall, latencies):
+    return {
+        "index_type": index_type,
+        "params": params,
+        "build_s": round(build_time, 3),
+        "recall": round(recall, 4),
+        "latency_ms_mean": round(float(latencies.mean()), 4),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 4),
+    }
+
+
+def print_table(report):
+    print(f"\n{'index':<10} {'params':<16} {'build(s)':>9} {'recall@' + str(report['k']):>10} {'mean(ms)':>10} {'p95(ms)':>10}")
+    for row in report["results"]:
+        params = ",".join(f"{k}={v}" for k, v in row["params"].items()) or "-"
+        print(f"{row['index_type']:<10} {params:<16} {row['build_s']:>9.2f} {row['recall']:>10.3f} "
+              f"{row['latency_ms_mean']:>10.3f} {row['latency_ms_p95']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs latency: index ANN dibanding flat index")
+    parser.add_argument("--index", default=config.INDEX_PATH, help="Index sumber vektor")
+    parser.add_argument("--synthetic", type=int, default=0, help="Pakai N vektor sintetis, bukan index")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--metric", choices=["ip", "l2"], default="ip",
+                        help="Metric vektor sintetis (index sumber memakai metric-nya sendiri)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=config.MODEL_CONFIG["retrieval_top_k"])
+    parser.add_argument("--types", nargs="+", default=["ivf_flat", "ivf_pq", "hnsw"])
+    parser.add_argument("--hnsw-m", type=int, default=config.MODEL_CONFIG.get("hnsw_m", 32))
+    parser.add_argument("--pq-m", type=int, default=config.MODEL_CONFIG.get("ivf_pq_m", 16))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_table(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Hasil disimpan di: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Evaluasi recall/MRR dan micro-benchmark tahap retrieval (encode, FAISS search, post-filter).
+
+Label pertanyaan -> dokumen ada di benchmarks/data/retrieval_labels.json. Setiap
+label berisi ``doc_ids`` dan/atau ``relevant_text`` (potongan teks; semua chunk
+yang memuatnya dianggap relevan), jadi label tetap berlaku setelah index
+di-rebuild. Untuk ukuran korpus yang lebih besar, index diisi vektor sintetis
+(distribusi per dimensi sama dengan vektor asli) dan teks sintetis dari kosakata
+korpus, sehingga filter word overlap dan BM25 tetap bekerja seperti aslinya.
+
+Contoh:
+    python -m benchmarks.bench_retrieval
+    python -m benchmarks.bench_retrieval --sizes 0 10000 100000 --json bench_retrieval.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import subprocess
+import contextlib
+
+import numpy as np
+import faiss
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import config
+from src.index_factory import build_index, read_vectors, describe_index
+from src.lexical_index import LexicalIndex, write_lexical_index
+
+DEFAULT_LABELS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "retrieval_labels.json")
+
+
+def load_labels(path, texts):
+    """List (pertanyaan, set doc_id relevan); label tanpa dokumen yang cocok dilewati"""
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+
+    lowered = [str(text).lower() for text in texts]
+    labels, unresolved = [], []
+    for item in items:
+        relevant = {int(i) for i in item.get("doc_ids", []) if 0 <= int(i) < len(lowered)}
+        anchors = [anchor.lower() for anchor in item.get("relevant_text", [])]
+        if anchors:
+            relevant.update(i for i, text in enumerate(lowered) if any(a in text for a in anchors))
+        if relevant:
+            labels.append((item["question"], relevant))
+        else:
+            unresolved.append(item["question"])
+    return labels, unresolved
+
+
+def rank_metrics(ranked_ids, relevant, ks):
+    """recall@k (dibagi min(k, jumlah relevan)) dan reciprocal rank dokumen relevan pertama"""
+    metrics = {}
+    for k in ks:
+        hits = len(relevant.intersection(ranked_ids[:k]))
+        metrics[f"recall@{k}"] = hits / min(k, len(relevant))
+    metrics["rr"] = next((1.0 / rank for rank, doc_id in enumerate(ranked_ids, 1) if doc_id in relevant), 0.0)
+    return metrics
+
+
+def aggregate(rows, ks):
+    summary = {f"recall@{k}": round(float(np.mean([r[f"recall@{k}"] for r in rows])), 4) for k in ks}
+    summary["mrr"] = round(float(np.mean([r["rr"] for r in rows])), 4)
+    summary["avg_returned"] = round(float(np.mean([r["returned"] for r in rows])), 2)
+    return summary
+
+
+def evaluate(name, search_fn, labels, ks):
+    """Recall/MRR untuk satu fungsi search (query -> list doc_id berurutan)"""
+    rows = []
+    for question, relevant in labels:
+        ranked_ids = search_fn(question)
+        rows.append({**rank_metrics(ranked_ids, relevant, ks), "returned": len(ranked_ids)})
+    return {"system": name, **aggregate(rows, ks)}
+
+
+def quiet(fn, *args):
+    """Jalankan fn tanpa print status per query (tidak dipakai saat mengukur waktu)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def encode_uncached(retriever, query):
+    """Sama seperti Retriever._encode tapi tanpa embedding cache, supaya waktu encode nyata"""
+    embedding = np.ascontiguousarray(retriever._encode_raw([query]), dtype="float32")
+    if retriever.metric == "ip" and retriever.normalize_embeddings:
+        faiss.normalize_L2(embedding)
+    return embedding
+
+
+def time_stages(retriever, labels, top_k, repeat, ks):
+    """ms per tahap (encode / search / post-filter) + recall jalur search tanpa rerank"""
+    timings = {"encode": [], "search": [], "post_filter": []}
+    rows = []
+    for _ in range(repeat):
+        for question, relevant in labels:
+            start = time.perf_counter()
+            embedding = encode_uncached(retriever, question)
+            encoded = time.perf_counter()
+            scores, indices = retriever._search_index(embedding, retriever._dense_k(top_k))
+            searched = time.perf_counter()
+            results = retriever._collect_results(
+                question, scores[0], indices[0], verbose=False,
+                query_vector=embedding[0], limit=retriever._result_limit()
+            )
+            filtered = time.perf_counter()
+
+            timings["encode"].append((encoded - start) * 1000)
+            timings["search"].append((searched - encoded) * 1000)
+            timings["post_filter"].append((filtered - searched) * 1000)
+            ranked_ids = [doc["doc_id"] for doc in results]
+            rows.append({**rank_metrics(ranked_ids, relevant, ks), "returned": len(ranked_ids)})
+
+    stages = {
+        stage: {
+            "mean_ms": round(float(np.mean(values)), 4),
+            "p50_ms": round(float(np.percentile(values, 50)), 4),
+            "p95_ms": round(float(np.percentile(values, 95)), 4),
+        }
+        for stage, values in timings.items()
+    }
+    return stages, aggregate(rows, ks)
+
+
+def synthetic_corpus(vectors, texts, n_extra, metric, seed):
+    """Vektor + teks sintetis yang ditambahkan di belakang korpus asli (doc_id asli tidak berubah)"""
+    rng = np.random.default_rng(seed)
+    mean, std = vectors.mean(axis=0), vectors.std(axis=0) + 1e-6
+    extra = (rng.standard_normal((n_extra, vectors.shape[1])) * std + mean).astype("float32")
+    if metric == "ip":
+        faiss.normalize_L2(extra)
+
+    vocabulary = sorted({word for text in texts for word in str(text).split()})
+    lengths = [len(str(text).split()) for text in texts]
+    length = max(5, int(np.median(lengths))) if lengths else 50
+    words = rng.choice(len(vocabulary), size=(n_extra, length))
+    extra_texts = [" ".join(vocabulary[w] for w in row) for row in words]
+
+    return np.vstack([vectors, extra]), list(texts) + extra_texts
+
+
+@contextlib.contextmanager
+def scaled_retriever(retriever, vectors, texts, size, index_type, seed):
+    """Ganti sementara index/texts/lexical retriever dengan korpus berukuran ``size``"""
+    original = (retriever.index, retriever.texts, retriever.lexical)
+    n_extra = max(0, size - len(vectors))
+    if not n_extra:
+        # Korpus asli: index apa adanya (tipe + parameter dari config)
+        yield len(texts), 0.0
+        return
+    all_vectors, all_texts = synthetic_corpus(vectors, texts, n_extra, retriever.metric, seed)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            start = time.perf_counter()
+            retriever.index = build_index(all_vectors, index_type, retriever.metric)
+            retriever.texts = all_texts
+            if original[2] is not None:
+                base = os.path.join(tmp_dir, "bench")
+                write_lexical_index(all_texts, base)
+                retriever.lexical = LexicalIndex(base)
+            build_s = time.perf_counter() - start
+            yield len(all_texts), build_s
+        finally:
+            retriever.index, retriever.texts, retriever.lexical = original
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def run(args):
+    from src.retriever import Retriever
+
+    retriever = quiet(Retriever, args.index, args.texts)
+    texts = list(retriever.texts)
+    labels, unresolved = load_labels(args.labels, texts)
+    if not labels:
+        raise SystemExit(f"❌ Tidak ada label yang cocok dengan korpus ({len(unresolved)} label dilewati)")
+    for question in unresolved:
+        print(f"⚠️ Label tanpa dokumen relevan, dilewati: {question}")
+    print(f"📊 Korpus: {len(texts)} chunk, {len(labels)} pertanyaan berlabel")
+
+    ks = sorted(args.ks)
+    max_k = max(max(ks), args.top_k)
+
+    def dense_ids(question):
+        scores, indices = retriever._search_index(retriever._encode([question]), max_k)
+        return [int(i) for i in indices[0] if i >= 0]
+
+    def search_ids(question):
+        return [doc["doc_id"] for doc in retriever.search(question, args.top_k)]
+
+    def debug_ids(question):
+        return [doc["doc_id"] for doc in retriever.search_with_debug(question, args.top_k)[0]]
+
+    quality = [
+        evaluate("dense_faiss", dense_ids, labels, ks),
+        quiet(evaluate, "search", search_ids, labels, ks),
+        quiet(evaluate, "search_with_debug", debug_ids, labels, ks),
+    ]
+
+    vectors = read_vectors(retriever.index).astype("float32")
+    scaling = []
+    for size in args.sizes:
+        with scaled_retriever(retriever, vectors, texts, size, args.index_type, args.seed) as (n_docs, build_s):
+            stages, recall = time_stages(retriever, labels, args.top_k, args.repeat, ks)
+        scaling.append({"n_docs": n_docs, "build_s": round(build_s, 3), "stages": stages, "quality": recall})
+        print(f"⏱️ {n_docs} docs: encode {stages['encode']['mean_ms']:.2f}ms, "
+              f"search {stages['search']['mean_ms']:.3f}ms, post-filter {stages['post_filter']['mean_ms']:.3f}ms")
+
+    return {
+        "commit": git_commit(),
+        "settings": {
+            "index_type": describe_index(retriever.index)["index_type"],
+            "scaled_index_type": args.index_type,
+            "metric": retriever.metric,
+            "top_k": args.top_k,
+            "score_threshold": retriever.score_threshold,
+            "hybrid": retriever.lexical is not None,
+            "rerank": retriever.reranker is not None,
+        },
+        "n_labels": len(labels),
+        "unresolved_labels": unresolved,
+        "quality": quality,
+        "scaling": scaling,
+    }
+
+
+def print_table(report, ks):
+    columns = [f"recall@{k}" for k in sorted(ks)] + ["mrr", "avg_returned"]
+    print(f"\n{'system':<20} " + " ".join(f"{c:>12}" for c in columns))
+    for row in report["quality"]:
+        print(f"{row['system']:<20} " + " ".join(f"{row[c]:>12.3f}" for c in columns))
+
+    print(f"\n{'n_docs':>9} {'encode(ms)':>11} {'search(ms)':>11} {'filter(ms)':>11} {'recall@' + str(max(ks)):>10} {'mrr':>7}")
+    for row in report["scaling"]:
+        stages = row["stages"]
+        print(f"{row['n_docs']:>9} {stages['encode']['mean_ms']:>11.2f} {stages['search']['mean_ms']:>11.3f} "
+              f"{stages['post_filter']['mean_ms']:>11.3f} {row['quality'][f'recall@{max(ks)}']:>10.3f} "
+              f"{row['quality']['mrr']:>7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall/MRR dan waktu per tahap Retriever")
+    parser.add_argument("--labels", default=DEFAULT_LABELS)
+    parser.add_argument("--index", default=config.INDEX_PATH)
+    parser.add_argument("--texts", default=config.TEXT_PATH)
+    parser.add_argument("--ks", nargs="+", type=int, default=[1, 3, 5])
+    parser.add_argument("--top-k", type=int, default=config.MODEL_CONFIG.get("retrieval_top_k", 5))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[0, 10000, 100000],
+                        help="Ukuran korpus (0 = korpus asli), sisanya diisi vektor sintetis")
+    parser.add_argument("--index-type", default="flat", help="Tipe index untuk korpus yang diperbesar")
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan set pertanyaan per ukuran")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_table(report, args.ks)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Hasil disimpan di: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
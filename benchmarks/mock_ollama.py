@@ -0,0 +1,191 @@
+"""Server pengganti Ollama untuk benchmark (tanpa model, tanpa GPU).
+
+Meniru endpoint yang dipakai aplikasi: /api/chat (stream NDJSON dan non-stream),
+/api/generate (preload keep_alive) dan /api/tags (``OllamaClient.list_models``). Waktu
+sampai token pertama diambil dari distribusi lognormal (median + sigma),
+token berikutnya dikirim dengan laju tetap.
+
+Contoh:
+    python -m benchmarks.mock_ollama --port 11435 --tokens-per-s 20 --latency-ms 400
+    OLLAMA_HOST=http://127.0.0.1:11435 streamlit run streamlit_app/app.py
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER_WORDS = (
+    "Berdasarkan informasi yang tersedia, vaksin COVID-19 di Indonesia terbukti aman dan efektif "
+    "mengurangi risiko gejala berat, rawat inap, dan kematian. Efek samping yang umum bersifat ringan "
+    "seperti nyeri di lokasi suntikan, demam ringan, dan kelelahan yang hilang dalam beberapa hari."
+).split()
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, payload):
+        line = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": self.server.model_name}]})
+        elif self.path == "/stats":
+            self._send_json(self.server.stats())
+        else:
+            self._send_json({"error": f"Unknown path {self.path}"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path == "/api/generate":
+            self._send_json({"model": payload.get("model"), "response": "", "done": True})
+        elif self.path == "/api/chat":
+            self._chat(payload)
+        else:
+            self._send_json({"error": f"Unknown path {self.path}"}, status=404)
+
+    def _chat(self, payload):
+        server = self.server
+        first_token_s, n_tokens = server.sample()
+        interval = 1.0 / server.tokens_per_s
+        words = [ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(n_tokens)]
+        server.begin()
+        try:
+            if not payload.get("stream", True):
+                time.sleep(first_token_s + interval * (n_tokens - 1))
+                self._send_json({
+                    "model": payload.get("model"),
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "done": True,
+                    "eval_count": n_tokens,
+                })
+                server.end("completed")
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            time.sleep(first_token_s)
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(interval)
+                self._write_chunk({"message": {"role": "assistant", "content": (" " if i else "") + word},
+                                   "done": False})
+            self._write_chunk({"message": {"role": "assistant", "content": ""}, "done": True,
+                               "eval_count": n_tokens})
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+            server.end("completed")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client membatalkan request (deadline / pembatalan spekulatif)
+            server.end("aborted")
+            self.close_connection = True
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, tokens_per_s=20.0, latency_ms=400.0, latency_sigma=0.4,
+                 tokens=60, model_name="mistral:7b-instruct", seed=42):
+        super().__init__(address, MockOllamaHandler)
+        self.tokens_per_s = tokens_per_s
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens = tokens
+        self.model_name = model_name
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "completed": 0, "aborted": 0, "active": 0, "max_active": 0}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sample(self):
+        """(detik sampai token pertama, jumlah token) untuk satu request"""
+        with self._lock:
+            latency = self.latency_ms * self._random.lognormvariate(0.0, self.latency_sigma) if self.latency_sigma \
+                else self.latency_ms
+            n_tokens = max(1, int(self._random.gauss(self.tokens, self.tokens * 0.2)))
+        return latency / 1000.0, n_tokens
+
+    def begin(self):
+        with self._lock:
+            self._counts["requests"] += 1
+            self._counts["active"] += 1
+            self._counts["max_active"] = max(self._counts["max_active"], self._counts["active"])
+
+    def end(self, outcome):
+        with self._lock:
+            self._counts["active"] -= 1
+            self._counts[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tokens_per_s": self.tokens_per_s,
+                "latency_ms": self.latency_ms,
+                "latency_sigma": self.latency_sigma,
+                "tokens": self.tokens,
+                **self._counts,
+            }
+
+
+def start_mock_server(host="127.0.0.1", port=0, **kwargs):
+    """Jalankan MockOllamaServer di thread background; port=0 -> port bebas"""
+    server = MockOllamaServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, name="mock-ollama", daemon=True).start()
+    return server
+
+
+def add_mock_arguments(parser):
+    parser.add_argument("--tokens-per-s", type=float, default=20.0, help="Laju token setelah token pertama")
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Median waktu sampai token pertama")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="Sigma lognormal (0 = tetap)")
+    parser.add_argument("--tokens", type=int, default=60, help="Rata-rata panjang jawaban (token)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server pengganti Ollama untuk benchmark")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockOllamaServer(
+        (args.host, args.port),
+        tokens_per_s=args.tokens_per_s,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens=args.tokens
+    )
+    print(f"🚀 Mock Ollama di {server.url} ({args.tokens_per_s} token/s, "
+          f"token pertama ~{args.latency_ms}ms, sigma {args.latency_sigma})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Mock Ollama dihentikan")
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
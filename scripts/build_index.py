@@ -0,0 +1,12 @@
+"""Build vector database: python scripts/build_index.py [chunks.jsonl ...] [--incremental]"""
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.indexer import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""Jalankan retrieval service: python scripts/run_retrieval_service.py [--host H] [--port P]"""
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.retrieval_service import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from .retriever import Retriever
 from .generation import generate_answer, load_generation_model
-from .guard_rail import GuardRail
+from .guard_rail import GuardRail, get_guard_rail
 
-__all__ = ['Retriever', 'generate_answer', 'load_generation_model', 'GuardRail', 'config']
\ No newline at end of file
+__all__ = ['Retriever', 'generate_answer', 'load_generation_model', 'GuardRail', 'get_guard_rail', 'config']
\ No newline at end of file
@@ -0,0 +1,129 @@
+import time
+import queue
+import threading
+from bisect import bisect_left
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_DELAY_MS_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """Histogram sederhana dengan bucket tetap (kumulatif seperti Prometheus)"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets + ("+Inf",), self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 3),
+                "mean": round(self.sum / self.count, 3) if self.count else 0.0,
+                "buckets": buckets,
+            }
+
+
+class _Request:
+    __slots__ = ("texts", "enqueued_at", "done", "result", "error")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Gabungkan request encode yang datang bersamaan menjadi satu panggilan encode.
+
+    Worker thread menunggu request pertama, lalu mengambil request lain yang
+    sudah antre (tanpa menunggu yang belum datang) sampai antrean kosong,
+    ``max_batch_size`` teks, atau ``max_wait_ms`` lewat, memanggil
+    ``encode_fn`` sekali, dan membagikan hasilnya ke masing-masing pemanggil.
+    Query tunggal langsung di-encode; request yang datang selama encode
+    berjalan ikut batch berikutnya.
+    """
+
+    def __init__(self, encode_fn, max_batch_size=32, max_wait_ms=5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_delays_ms = Histogram(QUEUE_DELAY_MS_BUCKETS)
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embed-microbatcher", daemon=True)
+        self._worker.start()
+
+    def encode(self, texts):
+        """Dipanggil dari thread mana saja; blok sampai embedding siap"""
+        request = _Request(list(texts))
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        total = len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+
+        while total < self.max_batch_size and time.perf_counter() < deadline:
+            try:
+                # Antrean kosong = tidak ada pemanggil lain: flush sekarang
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            total += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            for request in batch:
+                self.queue_delays_ms.observe((started - request.enqueued_at) * 1000)
+
+            texts = [text for request in batch for text in request.texts]
+            self.batch_sizes.observe(len(texts))
+
+            try:
+                vectors = np.asarray(self.encode_fn(texts))
+                offset = 0
+                for request in batch:
+                    request.result = vectors[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            finally:
+                for request in batch:
+                    request.done.set()
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": self._queue.qsize(),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_delay_ms": self.queue_delays_ms.snapshot(),
+        }
@@ -0,0 +1,161 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.telemetry import get_logger
+
+log = get_logger("cache")
+
+
+def normalize_text(text):
+    """Normalisasi teks untuk cache key (lowercase, spasi dirapikan)"""
+    if not isinstance(text, str):
+        text = str(text)
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+class LRUCache:
+    """LRU cache generik (thread-safe) dengan counter hit/miss"""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class EmbeddingCache(LRUCache):
+    """LRUCache untuk embedding query (key = teks yang sudah dinormalisasi) + persistensi .npz"""
+
+    def __init__(self, max_size=1024, path=None, model_name=None):
+        super().__init__(max_size)
+        self.path = path
+        self.model_name = model_name
+
+        if self.path:
+            self.load()
+
+    def get(self, text, default=None):
+        return super().get(normalize_text(text), default)
+
+    def put(self, text, vector):
+        super().put(normalize_text(text), np.asarray(vector, dtype="float32"))
+
+    def save(self, path=None):
+        """Simpan cache ke disk (.npz) supaya bertahan setelah restart"""
+        path = path or self.path
+        if not path:
+            return False
+        with self._lock:
+            if not self._data:
+                return False
+            keys = np.array(list(self._data.keys()))
+            vectors = np.stack(list(self._data.values())).astype("float32")
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, keys=keys, vectors=vectors, model=np.array(self.model_name or ""))
+        os.replace(tmp_path, path)
+        return True
+
+    def load(self, path=None):
+        """Load cache dari disk; diabaikan jika file tidak ada atau model berbeda"""
+        path = path or self.path
+        if not path or not os.path.exists(path) or self.max_size <= 0:
+            return 0
+        try:
+            with np.load(path) as data:
+                model_name = str(data["model"])
+                if self.model_name and model_name and model_name != self.model_name:
+                    log.warning(f"⚠️ Embedding cache dibuat dengan model lain ({model_name}), diabaikan")
+                    return 0
+                keys = data["keys"].tolist()
+                vectors = data["vectors"]
+        except Exception as e:
+            log.warning(f"⚠️ Gagal load embedding cache: {e}")
+            return 0
+
+        with self._lock:
+            for key, vector in zip(keys[-self.max_size:], vectors[-self.max_size:]):
+                self._data[key] = vector
+        return len(self._data)
+
+
+class AnswerCache(LRUCache):
+    """LRUCache jawaban end-to-end dengan TTL: entri kedaluwarsa dibuang saat dibaca"""
+
+    def __init__(self, max_size=512, ttl=3600):
+        super().__init__(max_size)
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(question, index_fingerprint, model_id, options):
+        """Key = pertanyaan ternormalisasi + fingerprint index + model + opsi generasi"""
+        options_key = ",".join(f"{k}={options[k]}" for k in sorted(options or {}))
+        return "|".join([normalize_text(question), str(index_fingerprint), str(model_id), options_key])
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] < now:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        super().put(key, (value, time.time() + self.ttl))
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self):
+        return {**super().stats(), "ttl": self.ttl}
@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from src.telemetry import get_logger
+
+BLOB_SUFFIX = ".bin"
+OFFSETS_SUFFIX = ".offsets.npy"
+META_SUFFIX = ".meta.json"
+
+log = get_logger("chunk_store")
+
+
+def store_base_for(texts_path):
+    """faiss_textcovid19_texts.json -> faiss_textcovid19_texts (.bin + .offsets.npy)"""
+    return os.path.splitext(texts_path)[0]
+
+
+def chunk_store_exists(base_path):
+    return os.path.exists(base_path + BLOB_SUFFIX) and os.path.exists(base_path + OFFSETS_SUFFIX)
+
+
+def _source_signature(source_path):
+    stat = os.stat(source_path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def write_chunk_store(texts, base_path, source_path=None):
+    """Tulis teks sebagai satu blob UTF-8 + array offset int64 (n+1).
+
+    ``source_path`` (texts JSON asal) dicatat ukuran + mtime-nya di .meta.json
+    supaya ``open_texts`` bisa mendeteksi store yang sudah basi.
+    """
+    offsets = np.zeros(len(texts) + 1, dtype="int64")
+    blob_tmp = base_path + BLOB_SUFFIX + ".tmp"
+    offsets_tmp = base_path + ".offsets.tmp.npy"
+
+    with open(blob_tmp, "wb") as f:
+        position = 0
+        for i, text in enumerate(texts):
+            data = text.encode("utf-8")
+            f.write(data)
+            position += len(data)
+            offsets[i + 1] = position
+
+    np.save(offsets_tmp, offsets)
+    meta = {"chunks": len(texts)}
+    if source_path is not None and os.path.exists(source_path):
+        meta.update(_source_signature(source_path))
+    meta_tmp = base_path + META_SUFFIX + ".tmp"
+    with open(meta_tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(blob_tmp, base_path + BLOB_SUFFIX)
+    os.replace(offsets_tmp, base_path + OFFSETS_SUFFIX)
+    os.replace(meta_tmp, base_path + META_SUFFIX)
+    return len(texts)
+
+
+def chunk_store_mismatch(base_path, texts_path, n_chunks):
+    """Alasan store tidak sinkron dengan texts JSON, atau None jika cocok"""
+    meta_path = base_path + META_SUFFIX
+    if not os.path.exists(meta_path):
+        return "metadata store tidak ada (store lama)"
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("chunks") != n_chunks:
+        return f"jumlah chunk {n_chunks} != metadata {meta.get('chunks')}"
+    if os.path.exists(texts_path):
+        signature = _source_signature(texts_path)
+        if any(meta.get(key) != value for key, value in signature.items()):
+            return f"{os.path.basename(texts_path)} berubah setelah store dibuat"
+    return None
+
+
+class ChunkStore:
+    """Chunk teks read-only yang di-memory-map dan di-decode saat diakses.
+
+    Mendukung pola akses list: ``store[idx]``, ``store[:5]``, ``len(store)``, iterasi.
+    Halaman file dibagi lewat page cache OS, jadi beberapa proses Streamlit
+    tidak masing-masing menyimpan salinan semua teks.
+    """
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.offsets = np.load(base_path + OFFSETS_SUFFIX, mmap_mode="r")
+        blob_path = base_path + BLOB_SUFFIX
+        if os.path.getsize(blob_path) > 0:
+            self.blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+        else:
+            self.blob = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _get(self, idx):
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._get(i) for i in range(*idx.indices(len(self)))]
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("chunk index out of range")
+        return self._get(idx)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get(i)
+
+    def nbytes(self):
+        return int(self.blob.nbytes + self.offsets.nbytes)
+
+
+def open_texts(texts_path):
+    """Pakai ChunkStore jika tersedia dan sinkron dengan texts JSON, selain itu json.load biasa"""
+    base_path = store_base_for(texts_path)
+    if chunk_store_exists(base_path):
+        store = ChunkStore(base_path)
+        mismatch = chunk_store_mismatch(base_path, texts_path, len(store))
+        if mismatch is None or not os.path.exists(texts_path):
+            return store
+        log.warning(f"⚠️ Chunk store {base_path}{BLOB_SUFFIX} tidak sinkron ({mismatch}), pakai JSON. "
+                    f"Rebuild dengan: python -m src.chunk_store")
+    if os.path.exists(texts_path):
+        with open(texts_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    raise FileNotFoundError(f"Texts file not found: {texts_path}")
+
+
+def main(argv=None):
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(current_dir, ".."))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    from src import config
+
+    parser = argparse.ArgumentParser(description="Konversi texts JSON ke chunk store memory-mapped")
+    parser.add_argument("texts_path", nargs="?", default=config.TEXT_PATH)
+    args = parser.parse_args(argv)
+
+    with open(args.texts_path, "r", encoding="utf-8") as f:
+        texts = [t if isinstance(t, str) else str(t) for t in json.load(f)]
+
+    base_path = store_base_for(args.texts_path)
+    write_chunk_store(texts, base_path, source_path=args.texts_path)
+    print(f"✅ Chunk store: {base_path}{BLOB_SUFFIX} + {OFFSETS_SUFFIX} ({len(texts)} chunks)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,16 +10,102 @@ FAISS_DIR = os.path.abspath(os.path.join(PROJECT_ROOT, "faiss"))
 INDEX_PATH = os.path.join(FAISS_DIR, "faiss_textcovid19.index")
 TEXT_PATH  = os.path.join(FAISS_DIR, "faiss_textcovid19_texts.json")  
 
+MANIFEST_PATH = os.path.join(FAISS_DIR, "faiss_textcovid19_manifest.json")
+
+DATA_DIR = os.path.abspath(os.path.join(PROJECT_ROOT, "data"))
+PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
+CHUNK_FILES = [
+    os.path.join(PROCESSED_DIR, "knowladge_covid19_indonesia.jsonl"),
+    os.path.join(PROCESSED_DIR, "covid_19_to_narative.jsonl"),
+]
+
+GUARD_RAIL_RULES_PATH = os.path.join(BASE_DIR, "data", "guard_rail_rules.json")
+FAQ_PATH = os.path.join(BASE_DIR, "data", "faq.json")
+
+CACHE_DIR = os.path.abspath(os.path.join(PROJECT_ROOT, "cache"))
+EMBEDDING_CACHE_PATH = os.path.join(CACHE_DIR, "query_embeddings.npz")
+
+# Time-series per provinsi (CSV bersih dari 01_data_cleaning.ipynb) -> store kolom .npz
+TIMESERIES_CSV_PATH = os.path.join(DATA_DIR, "use", "covid19_final_version.csv")
+TIMESERIES_STORE_PATH = os.path.join(PROCESSED_DIR, "covid19_timeseries.npz")
+
 MODEL_CONFIG = {
     "embedding_model": "paraphrase-multilingual-mpnet-base-v2",
     "generation_model": "mistral:7b-instruct",
-    "retrieval_top_k": 15,
+    "retrieval_top_k": 5,
     "generation_top_k": 3,
     "language": "id",
     "device": "cpu",
     "temperature": 0.2,  
     "top_p": 0.7,
-    "score_threshold": 0.1   
+    "score_threshold": 0.2,
+    "index_type": "flat",
+    "index_metric": "ip",
+    "normalize_embeddings": True,
+    "index_batch_size": 256,
+    "ivf_nlist": None,
+    "ivf_nprobe": 16,
+    "ivf_pq_m": 16,
+    "hnsw_m": 32,
+    "hnsw_ef_search": 64,
+    "embed_batching": True,
+    "embed_batch_window_ms": 5,  # batas waktu mengambil request yang sudah antre; tidak menunggu request baru
+    "embed_max_batch_size": 32,
+    "embedding_cache_size": 2048,
+    "embedding_cache_persist": True,
+    "guard_cache_size": 4096,
+    "answer_cache_size": 512,
+    "answer_cache_ttl": 3600,
+    "faq_semantic_enabled": True,
+    "faq_similarity_threshold": 0.85,
+    "hybrid_search": True,
+    "hybrid_candidates": 20,
+    "rrf_k": 60,
+    "bm25_k1": 1.5,
+    "bm25_b": 0.75,
+    "timeseries_routing": True,
+    "rerank_enabled": False,
+    "rerank_model": "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1",
+    "rerank_candidates": 15,
+    "rerank_keep": 3,
+    "rerank_budget_ms": 300,
+    "rerank_cache_size": 4096,
+    "rerank_max_pending": 8,  # request yang boleh menunggu batch berikutnya; lebih dari ini -> 'busy'
+    # Context prompt: kalimat paling relevan dari chunk (dedupe overlap), dibatasi token
+    "context_token_budget": 128,
+    "context_tokenizer": "mistralai/Mistral-7B-Instruct-v0.2",
+    "context_cache_size": 4096,
+    # Pipeline request chat: FAQ lookup dan retrieval paralel, LLM mulai begitu context siap
+    "pipeline_workers": 16,
+    "pipeline_stream_workers": 16,  # pool terpisah: stream LLM tidak memakan worker FAQ/retrieval
+    "pipeline_stage_timeout": 30.0  # detik; batas tunggu FAQ/retrieval dan jeda antar potongan jawaban
+}
+
+# Retrieval service: satu proses memegang Retriever (model + index),
+# halaman Streamlit memakai RetrieverClient lewat HTTP lokal
+RETRIEVAL_SERVICE = {
+    "enabled": True,
+    "host": "127.0.0.1",
+    "port": 8765,
+    "timeout": 30,
+    "max_texts_per_request": 256,  # batas chunk per GET /texts
+    "keep_alive_timeout": 60  # detik; koneksi idle ditutup server (client membuka ulang sekali)
+}
+
+# Ollama: client async dengan koneksi dipakai ulang dan deadline per jawaban
+OLLAMA = {
+    "host": os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434"),
+    "timeout": 10.0,
+    "connect_timeout": 2.0,
+    "keep_alive": "30m",
+    "max_connections": 4
+}
+
+# Telemetry: span + metric Prometheus di GET /metrics, log per request dibatasi level
+TELEMETRY = {
+    "log_level": "INFO",
+    "metrics_host": "127.0.0.1",
+    "metrics_port": 9108
 }
 
 SYSTEM_PROMPT = """
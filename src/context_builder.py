@@ -0,0 +1,172 @@
+import re
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from src.cache import LRUCache, normalize_text
+from src.telemetry import get_logger
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD = re.compile(r"\w+")
+
+MIN_SENTENCE_CHARS = 15
+# Chunk PDF dipotong dengan overlap 200 karakter (02_text_chunking.ipynb)
+MAX_CHUNK_OVERLAP = 250
+MIN_CHUNK_OVERLAP = 30
+CHARS_PER_TOKEN = 4
+
+log = get_logger("context_builder")
+
+
+def chunk_overlap(first: str, second: str, max_overlap: int = MAX_CHUNK_OVERLAP,
+                  min_overlap: int = MIN_CHUNK_OVERLAP) -> int:
+    """Panjang akhiran ``first`` yang sama dengan awalan ``second`` (0 jika tidak tumpang tindih)"""
+    for length in range(min(max_overlap, len(first), len(second)), min_overlap - 1, -1):
+        if first.endswith(second[:length]):
+            return length
+    return 0
+
+
+def dedupe_chunks(contexts: List[str]) -> List[str]:
+    """Buang chunk duplikat / yang termuat di chunk lain, dan potong bagian overlap antar chunk"""
+    kept: List[str] = []
+    for text in contexts:
+        text = text.strip()
+        if not text or any(text in other for other in kept):
+            continue
+        kept = [other for other in kept if other not in text]
+        for other in kept:
+            overlap = chunk_overlap(other, text)
+            if overlap:
+                text = text[overlap:].strip()
+                continue
+            overlap = chunk_overlap(text, other)
+            if overlap:
+                text = text[:-overlap].strip()
+        if text:
+            kept.append(text)
+    return kept
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_SPLIT.split(text) if len(s.strip()) >= MIN_SENTENCE_CHARS]
+
+
+class TokenCounter:
+    """Hitung token dengan tokenizer model (transformers); fallback estimasi ~4 karakter/token"""
+
+    def __init__(self, tokenizer_name: Optional[str] = None):
+        self.tokenizer_name = tokenizer_name
+        self.tokenizer = None
+        if tokenizer_name:
+            try:
+                from transformers import AutoTokenizer
+                self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name, local_files_only=True)
+            except Exception as e:
+                log.warning(f"⚠️ Tokenizer {tokenizer_name} tidak tersedia, pakai estimasi karakter: {e}")
+
+    def count(self, text: str) -> int:
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+        return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, budget: int) -> str:
+        """Potong text di batas kata supaya <= budget token (binary search jumlah kata)"""
+        words = text.split()
+        lo, hi = 0, len(words)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.count(" ".join(words[:mid])) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        return " ".join(words[:lo])
+
+
+class ContextBuilder:
+    """Bangun context prompt: dedupe chunk, pilih kalimat paling mirip pertanyaan, pack ke budget token.
+
+    ``encode_fn(list teks) -> array`` dipakai untuk embedding kalimat (model
+    yang sama dengan retriever); embedding kalimat di-cache sendiri karena
+    chunk yang sama sering muncul di banyak query. ``query_encode_fn`` memberi
+    embedding pertanyaan yang sudah dihitung saat retrieval (embedding cache
+    retriever), jadi pertanyaan tidak di-encode ulang. Tanpa encoder, kalimat
+    diurutkan berdasarkan overlap kata.
+    """
+
+    def __init__(self, token_budget: int = 128, tokenizer_name: Optional[str] = None,
+                 encode_fn: Optional[Callable] = None, cache_size: int = 4096,
+                 query_encode_fn: Optional[Callable] = None):
+        self.token_budget = token_budget
+        self.counter = TokenCounter(tokenizer_name)
+        self.encode_fn = encode_fn
+        self.query_encode_fn = query_encode_fn
+        self.sentence_cache = LRUCache(cache_size)
+
+    def set_encoder(self, encode_fn: Optional[Callable], query_encode_fn: Optional[Callable] = None):
+        self.encode_fn = encode_fn
+        self.query_encode_fn = query_encode_fn
+
+    def _question_vector(self, question: str) -> np.ndarray:
+        if self.query_encode_fn is None:
+            return self._embed([question])[0]
+        vector = np.asarray(self.query_encode_fn([question]), dtype="float32")[0]
+        return vector / (np.linalg.norm(vector) + 1e-12)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = [self.sentence_cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = np.asarray(self.encode_fn([texts[i] for i in missing]), dtype="float32")
+            for i, vector in zip(missing, encoded):
+                vector = vector / (np.linalg.norm(vector) + 1e-12)
+                vectors[i] = vector
+                self.sentence_cache.put(texts[i], vector)
+        return np.stack(vectors)
+
+    def _lexical_scores(self, question: str, sentences: List[str]) -> np.ndarray:
+        question_words = set(WORD.findall(question.lower()))
+        return np.array([
+            len(question_words & set(WORD.findall(sentence.lower()))) / (1 + len(question_words))
+            for sentence in sentences
+        ], dtype="float32")
+
+    def score_sentences(self, question: str, sentences: List[str]) -> np.ndarray:
+        if self.encode_fn is not None:
+            try:
+                return self._embed(sentences) @ self._question_vector(question)
+            except Exception as e:
+                log.warning(f"⚠️ Context encoder error, pakai overlap kata: {e}")
+        return self._lexical_scores(question, sentences)
+
+    def build(self, question: str, contexts: List[str], token_budget: Optional[int] = None) -> str:
+        """Context ter-pack (<= token_budget token), kalimat dalam urutan aslinya"""
+        budget = token_budget or self.token_budget
+        chunks = dedupe_chunks(contexts)
+
+        sentences, seen = [], set()
+        for text in chunks:
+            for sentence in split_sentences(text):
+                key = normalize_text(sentence)
+                if key not in seen:
+                    seen.add(key)
+                    sentences.append(sentence)
+        if not sentences:
+            return self.counter.truncate(" ".join(chunks), budget)
+
+        scores = self.score_sentences(question, sentences)
+        order = np.argsort(-scores, kind="stable")
+
+        selected, used = [], 0
+        for i in order:
+            tokens = self.counter.count(sentences[i])
+            if used + tokens <= budget:
+                selected.append(i)
+                used += tokens
+            elif not selected:
+                # Kalimat terbaik saja sudah melebihi budget: potong di batas kata
+                return self.counter.truncate(sentences[i], budget)
+            if used >= budget:
+                break
+
+        return " ".join(sentences[i] for i in sorted(selected))
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+
+from src.keyword_matcher import KeywordMatcher
+from src.telemetry import get_logger
+
+log = get_logger("faq")
+
+# Partial match guaranteed answer hanya untuk pertanyaan pendek
+PARTIAL_MATCH_MAX_LENGTH = 20
+
+def default_faq_path():
+    from src import config
+    return config.FAQ_PATH
+
+def load_faq(faq_path: str) -> Dict:
+    """Load tabel FAQ (guaranteed + specific) dari file JSON berversi"""
+    with open(faq_path, 'r', encoding='utf-8') as f:
+        faq = json.load(f)
+
+    if not isinstance(faq.get('guaranteed'), list) or not isinstance(faq.get('specific'), list):
+        raise ValueError(f"Tabel FAQ {faq_path} harus punya list 'guaranteed' dan 'specific'")
+    return faq
+
+class FaqIndex:
+    """Tabel jawaban pasti yang dikompilasi sekali.
+
+    - guaranteed: exact match lewat dict, partial match (substring, pertanyaan
+      pendek) lewat satu scan KeywordMatcher; entri paling atas yang menang.
+    - specific: aturan berurutan dengan syarat ``all`` (semua term muncul)
+      dan/atau ``any`` (minimal satu term muncul); aturan pertama yang cocok menang.
+    """
+
+    def __init__(self, faq_path: str = None):
+        self.faq_path = faq_path or default_faq_path()
+        faq = load_faq(self.faq_path)
+
+        self.version = str(faq.get('version', 'unknown'))
+        self.loaded_at = time.time()
+        self.faq_mtime = os.path.getmtime(self.faq_path)
+
+        self.exact: Dict[str, str] = {}
+        self.guaranteed_rank: Dict[str, int] = {}
+        # Contoh pertanyaan (parafrase) per entri untuk semantic matcher
+        self.questions: List[Dict] = []
+        for entry in faq['guaranteed']:
+            key = str(entry['key']).lower()
+            # Key duplikat: entri pertama yang berlaku (sama seperti urutan dict lama)
+            if key not in self.exact:
+                self.exact[key] = entry['answer']
+                self.guaranteed_rank[key] = len(self.guaranteed_rank)
+            self._add_questions(entry, f"guaranteed:{key}")
+
+        self.specific_rules: List[Dict] = []
+        for i, entry in enumerate(faq['specific']):
+            self.specific_rules.append({
+                'all': frozenset(str(term).lower() for term in entry.get('all', [])),
+                'any': frozenset(str(term).lower() for term in entry.get('any', [])),
+                'answer': entry['answer'],
+            })
+            self._add_questions(entry, f"specific:{i}")
+
+        self.matcher = KeywordMatcher({
+            'guaranteed': list(self.exact),
+            'terms': [term for rule in self.specific_rules for term in rule['all'] | rule['any']],
+        })
+
+    def _add_questions(self, entry: Dict, faq_id: str):
+        for question in entry.get('questions', []):
+            self.questions.append({'faq_id': faq_id, 'question': str(question), 'answer': entry['answer']})
+
+    def guaranteed_answer(self, question: str) -> Optional[str]:
+        """Jawaban guaranteed: exact match, lalu partial match untuk pertanyaan pendek"""
+        question_lower = question.lower().strip()
+
+        answer = self.exact.get(question_lower)
+        if answer is not None:
+            return answer
+
+        if len(question_lower) > PARTIAL_MATCH_MAX_LENGTH:
+            return None
+
+        keys = self.matcher.scan(question_lower)['guaranteed']
+        if not keys:
+            return None
+        return self.exact[min(keys, key=self.guaranteed_rank.__getitem__)]
+
+    def specific_answer(self, question: str) -> Optional[str]:
+        """Jawaban aturan specific pertama yang cocok (tanpa cek guaranteed)"""
+        terms = self.matcher.scan(question.lower())['terms']
+        for rule in self.specific_rules:
+            if rule['all'] <= terms and (not rule['any'] or rule['any'] & terms):
+                return rule['answer']
+        return None
+
+    def info(self) -> Dict:
+        """Versi tabel FAQ dan jumlah entri"""
+        return {
+            'version': self.version,
+            'loaded_at': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.loaded_at)),
+            'faq_path': self.faq_path,
+            'guaranteed': len(self.exact),
+            'specific': len(self.specific_rules),
+            'questions': len(self.questions),
+        }
+
+
+_faq_index = None
+_faq_lock = threading.Lock()
+_last_reload_check = 0.0
+_failed_mtime = None
+RELOAD_CHECK_INTERVAL = 1.0
+
+def get_faq_index(faq_path: str = None) -> FaqIndex:
+    """FaqIndex satu per proses; dimuat ulang otomatis jika file FAQ berubah"""
+    global _faq_index, _last_reload_check, _failed_mtime
+
+    faq_path = faq_path or default_faq_path()
+    faq_index = _faq_index
+    now = time.time()
+
+    if faq_index is not None and faq_index.faq_path == faq_path:
+        if now - _last_reload_check < RELOAD_CHECK_INTERVAL:
+            return faq_index
+
+    with _faq_lock:
+        _last_reload_check = now
+        faq_index = _faq_index
+        try:
+            if faq_index is None or faq_index.faq_path != faq_path:
+                _faq_index = FaqIndex(faq_path)
+            else:
+                mtime = os.path.getmtime(faq_path)
+                if mtime != faq_index.faq_mtime and mtime != _failed_mtime:
+                    _failed_mtime = mtime
+                    _faq_index = FaqIndex(faq_path)
+                    _failed_mtime = None
+                    log.info(f"🔄 FAQ table reloaded: v{_faq_index.version}")
+        except Exception as e:
+            if faq_index is None:
+                raise
+            log.warning(f"⚠️ Gagal reload FAQ table, tetap pakai v{faq_index.version}: {e}")
+        return _faq_index
@@ -0,0 +1,73 @@
+import threading
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import faiss
+
+from src.faq import FaqIndex
+
+
+class SemanticFaqMatcher:
+    """Index FAISS kecil berisi embedding contoh pertanyaan FAQ.
+
+    Pertanyaan user yang cosine similarity-nya dengan salah satu contoh
+    pertanyaan >= threshold langsung dijawab dari tabel FAQ, tanpa retrieval
+    dan tanpa LLM. ``encode_fn`` harus memakai model embedding yang sama
+    dengan Retriever (paraphrase-multilingual-mpnet-base-v2).
+    """
+
+    def __init__(self, faq_index: FaqIndex, encode_fn: Callable, threshold: float = 0.85):
+        self.faq_index = faq_index
+        self.threshold = threshold
+        self.entries = faq_index.questions
+        self.index = None
+
+        if self.entries:
+            vectors = np.asarray(encode_fn([entry['question'] for entry in self.entries]), dtype="float32")
+            vectors = np.ascontiguousarray(vectors)
+            faiss.normalize_L2(vectors)
+            self.index = faiss.IndexFlatIP(vectors.shape[1])
+            self.index.add(vectors)
+
+        self._lock = threading.Lock()
+        self._stats = {"checked": 0, "matched": 0, "last_score": None}
+
+    def match(self, query_vector: np.ndarray, threshold: Optional[float] = None) -> Optional[Dict]:
+        """Entri FAQ terdekat jika skornya >= threshold, else None. Skor selalu dicatat."""
+        if self.index is None:
+            return None
+
+        threshold = self.threshold if threshold is None else threshold
+        vector = np.array(query_vector, dtype="float32").reshape(1, -1)
+        faiss.normalize_L2(vector)
+
+        scores, indices = self.index.search(vector, 1)
+        score = float(scores[0][0])
+        idx = int(indices[0][0])
+        matched = idx >= 0 and score >= threshold
+
+        with self._lock:
+            self._stats["checked"] += 1
+            self._stats["last_score"] = round(score, 4)
+            if matched:
+                self._stats["matched"] += 1
+
+        if not matched:
+            return None
+
+        entry = self.entries[idx]
+        return {
+            "answer": entry["answer"],
+            "faq_id": entry["faq_id"],
+            "faq_question": entry["question"],
+            "score": score,
+            "match": "semantic",
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["questions"] = len(self.entries)
+        stats["threshold"] = self.threshold
+        stats["faq_version"] = self.faq_index.version
+        return stats
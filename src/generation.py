@@ -1,59 +1,99 @@
-import ollama
 import os
 import sys
 import time
 import re
+import threading
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from src.guard_rail import GuardRail
+from src.guard_rail import get_guard_rail
+from src.cache import AnswerCache
+from src.faq import get_faq_index
+from src.context_builder import ContextBuilder
+from src.llm_client import get_llm_client, LLMTimeoutError
+from src.telemetry import get_logger, span, count
 import src.config as config
 
 LLM_MODEL = "mistral:7b-instruct"
 
+LLM_TIMEOUT = 10.0
+
+GENERATION_OPTIONS = {
+    "temperature": 0.1,
+    "top_p": 0.8,
+    "num_predict": 150,
+}
+
+# Jawaban sementara (error/timeout) tidak boleh masuk cache
+TRANSIENT_ANSWERS = {
+    "Maaf, sistem sedang lambat.",
+    "Maaf, sistem sedang tidak tersedia.",
+}
+
+# Counter pre-retrieval guard: berapa retrieval (embedding + FAISS) yang tidak perlu dijalankan
+PRECHECK_STATS = {
+    "checked": 0,
+    "rejected": 0,
+    "retrievals_avoided": 0,
+}
+_precheck_lock = threading.Lock()
+
+# Counter jawaban FAQ sebelum retrieval (guaranteed table + semantic matcher)
+FAQ_STATS = {
+    "checked": 0,
+    "guaranteed": 0,
+    "semantic": 0,
+    "llm_avoided": 0,
+}
+_faq_stats_lock = threading.Lock()
+
+ANSWER_CACHE = AnswerCache(
+    max_size=config.MODEL_CONFIG.get("answer_cache_size", 512),
+    ttl=config.MODEL_CONFIG.get("answer_cache_ttl", 3600)
+)
+
+log = get_logger("generation")
+
+_context_builder = None
+_context_lock = threading.Lock()
+
+def get_context_builder():
+    """ContextBuilder bersama (tokenizer dimuat sekali)"""
+    global _context_builder
+    if _context_builder is None:
+        with _context_lock:
+            if _context_builder is None:
+                _context_builder = ContextBuilder(
+                    token_budget=config.MODEL_CONFIG.get("context_token_budget", 128),
+                    tokenizer_name=config.MODEL_CONFIG.get("context_tokenizer"),
+                    cache_size=config.MODEL_CONFIG.get("context_cache_size", 4096)
+                )
+    return _context_builder
+
+def set_context_encoder(encode_fn, query_encode_fn=None):
+    """Pakai model embedding retriever untuk memilih kalimat context.
+
+    query_encode_fn: embedding pertanyaan dari embedding cache retriever (sudah dihitung saat search).
+    """
+    get_context_builder().set_encoder(encode_fn, query_encode_fn)
+
 def load_generation_model():
     try:
-        ollama.list()
-        print(f"✅ Ollama connected, using {LLM_MODEL}")
+        client = get_llm_client()
+        client.list_models()
+        log.info(f"✅ Ollama connected, using {LLM_MODEL}")
+        client.preload(LLM_MODEL)
         return LLM_MODEL
     except Exception as e:
-        print(f"❌ Ollama error: {e}")
+        log.error(f"❌ Ollama error: {e}")
         return None
 
 def get_guaranteed_answer(question):
-    """Jawaban 100% guaranteed untuk pertanyaan dasar COVID-19"""
-    
-    question_lower = question.lower().strip()
-    
-    # LIST PERTANYAAN DASAR YANG PASTI DIJAWAB
-    basic_questions = {
-        'covid': "COVID-19 adalah penyakit menular yang disebabkan oleh virus SARS-CoV-2.",
-        'covid-19': "COVID-19 adalah penyakit menular yang disebabkan oleh virus SARS-CoV-2. Gejala umumnya demam, batuk kering, kelelahan, dan hilangnya indra penciuman atau perasa.",
-        'corona': "COVID-19 (disebut juga corona) adalah penyakit menular yang disebabkan oleh virus SARS-CoV-2.",
-        'virus': "COVID-19 disebabkan oleh virus SARS-CoV-2 yang menular melalui droplet pernapasan.",
-        'gejala': "Gejala COVID-19 antara lain demam, batuk kering, kelelahan, dan hilangnya indra penciuman atau perasa.",
-        'pencegahan': "Pencegahan COVID-19 melalui protokol 5M: memakai masker, mencuci tangan, menjaga jarak, menjauhi kerumunan, dan membatasi mobilitas.",
-        'penyebab': "COVID-19 disebabkan oleh virus SARS-CoV-2. Penularan melalui droplet saat batuk, bersin, atau berbicara.",
-        'vaksin': "Program vaksinasi COVID-19 di Indonesia dimulai Januari 2021. Presiden Jokowi orang pertama yang divaksin.",
-        'isolasi': "Isolasi mandiri untuk COVID-19 gejala ringan direkomendasikan 10-14 hari.",
-        'pedulilindungi': "Aplikasi PeduliLindungi untuk memantau mobilitas, verifikasi status vaksin, dan deteksi risiko paparan.",
-        'varian': "Varian COVID-19 yang tercatat antara lain Delta dan Omicron dengan karakteristik penularan berbeda.",
-        'efek samping': "Efek samping vaksin COVID-19 umumnya ringan: nyeri suntikan, demam ringan, kelelahan sementara."
-    }
-    
-    # Cek pertanyaan exact match
-    if question_lower in basic_questions:
-        return basic_questions[question_lower]
-    
-    # Cek partial match
-    for key, answer in basic_questions.items():
-        if key in question_lower and len(question_lower) <= 20:  # Hanya untuk pertanyaan pendek
-            return answer
-    
-    return None
+    """Jawaban 100% guaranteed untuk pertanyaan dasar COVID-19 (tabel FAQ src/data/faq.json)"""
+    return get_faq_index().guaranteed_answer(question)
 
 def is_question_relevant(question, contexts):
     """Validasi apakah pertanyaan relevan dengan context yang ada"""
@@ -90,38 +130,9 @@ def get_specific_answer(question, contexts):
         
     if not contexts:
         return None
-        
-    question_lower = question.lower()
-    
-    # JAWABAN SPESIFIK BERDASARKAN CONTEXT
-    if 'varian' in question_lower and 'covid' in question_lower:
-        return "Varian COVID-19 yang pernah tercatat antara lain varian Delta, Omicron, dan varian lainnya. Setiap varian memiliki karakteristik penularan dan gejala yang mungkin berbeda."
-    
-    elif 'mencegah' in question_lower or 'pencegahan' in question_lower:
-        return "Pencegahan COVID-19 dilakukan melalui protokol 5M: memakai masker, mencuci tangan dengan sabun, menjaga jarak, menjauhi kerumunan, dan membatasi mobilitas."
-    
-    elif 'efek samping' in question_lower and 'vaksin' in question_lower:
-        return "Efek samping vaksin COVID-19 umumnya ringan dan sementara, seperti nyeri di lokasi suntikan, demam ringan, dan kelelahan."
-    
-    elif 'gejala' in question_lower and 'covid' in question_lower:
-        return "Gejala COVID-19 antara lain demam, batuk kering, kelelahan, dan hilangnya indra penciuman atau perasa."
-    
-    elif 'penyebab' in question_lower:
-        return "COVID-19 disebabkan oleh virus SARS-CoV-2. Penularannya terjadi terutama melalui percikan pernapasan (droplet)."
-    
-    elif 'isolasi' in question_lower:
-        return "Isolasi mandiri untuk COVID-19 gejala ringan direkomendasikan selama 10-14 hari."
     
-    elif 'vaksin' in question_lower and 'pertama' in question_lower:
-        return "Presiden Joko Widodo menjadi orang pertama yang divaksin COVID-19 di Indonesia pada 13 Januari 2021."
-    
-    elif 'vaksin' in question_lower:
-        return "Program vaksinasi COVID-19 di Indonesia dimulai pada Januari 2021."
-    
-    elif 'pedulilindungi' in question_lower:
-        return "Aplikasi PeduliLindungi digunakan untuk memantau mobilitas warga, memverifikasi status vaksin, dan mendeteksi risiko paparan COVID-19."
-    
-    return None
+    # JAWABAN SPESIFIK BERDASARKAN CONTEXT (aturan berurutan di tabel FAQ)
+    return get_faq_index().specific_answer(question)
 
 def is_answer_complete(answer):
     """Validasi apakah jawaban lengkap dan tidak terpotong"""
@@ -137,90 +148,208 @@ def is_answer_complete(answer):
     
     return any(complete_indicators)
 
-def generate_complete_answer(question, contexts, model_id):
-    """Generate dengan fallback system yang robust"""
+def answer_without_llm(question, contexts):
+    """Jawaban yang tidak butuh LLM (guaranteed, tidak relevan, specific); None jika perlu LLM"""
+    
+    faq = get_faq_index()
     
     # 1. COBA GUARANTEED ANSWER (PALING PRIORITAS)
-    guaranteed = get_guaranteed_answer(question)
+    guaranteed = faq.guaranteed_answer(question)
     if guaranteed:
-        print(f"✅ Using guaranteed answer")
+        log.debug(f"✅ Using guaranteed answer")
         return guaranteed
     
     # 2. VALIDASI RELEVANSI
     if not is_question_relevant(question, contexts):
         return "Maaf, pertanyaan tersebut di luar cakupan informasi COVID-19 Indonesia yang tersedia."
     
-    # 3. COBA SPECIFIC ANSWER
-    specific_answer = get_specific_answer(question, contexts)
+    # 3. COBA SPECIFIC ANSWER (guaranteed sudah dicek di atas, tidak dievaluasi ulang)
+    if not contexts:
+        return "Informasi tidak cukup dalam dokumen sumber."
+    
+    specific_answer = faq.specific_answer(question)
     if specific_answer:
-        print(f"✅ Using specific answer")
+        log.debug(f"✅ Using specific answer")
         return specific_answer
-        
-    if not contexts:
-        return get_guaranteed_answer(question) or "Informasi tidak cukup dalam dokumen sumber."
     
-    # 4. COBA GENERATION DENGAN LLM
-    context_text = "\n".join(contexts[:2])
+    return None
+
+def get_structured_answer(retrieved_docs):
+    """Jawaban langsung dari doc hasil lookup time-series (QueryRouter), tanpa LLM"""
+    if retrieved_docs and retrieved_docs[0].get('source') == 'timeseries':
+        log.debug(f"✅ Using time-series answer")
+        return retrieved_docs[0].get('text')
+    return None
+
+def build_prompt(question, contexts):
+    """Prompt LLM dari context hasil retrieval"""
+    context_text = get_context_builder().build(question, contexts)
     
-    prompt = f"""INFORMASI: {context_text[:400]}
+    return f"""INFORMASI: {context_text}
 
 PERTANYAAN: {question}
 
 JAWABAN:"""
 
+def generate_complete_answer(question, contexts, model_id):
+    """Generate dengan fallback system yang robust"""
+    
+    with span("canned_lookup"):
+        canned_answer = answer_without_llm(question, contexts)
+    if canned_answer:
+        return canned_answer
+    
+    # 4. COBA GENERATION DENGAN LLM
+    # (guaranteed answer pasti None di sini, fallback di bawah tidak perlu cek ulang)
+    prompt = build_prompt(question, contexts)
+
     try:
-        print(f"🤖 Generating with LLM...")
-        start_time = time.time()
-        
-        response = ollama.chat(
-            model=model_id,
-            messages=[{"role": "user", "content": prompt}],
-            options={
-                "temperature": 0.1,
-                "top_p": 0.8,
-                "num_predict": 150,
-            }
-        )
-        
-        generation_time = time.time() - start_time
-        
-        if generation_time > 10.0:
-            return get_guaranteed_answer(question) or "Maaf, sistem sedang lambat."
+        log.debug(f"🤖 Generating with LLM...")
         
-        answer = response["message"]["content"].strip()
+        # Deadline keras: request dibatalkan begitu LLM_TIMEOUT lewat
+        with span("llm", model=model_id):
+            answer = get_llm_client().chat(
+                model=model_id,
+                messages=[{"role": "user", "content": prompt}],
+                options=GENERATION_OPTIONS,
+                timeout=LLM_TIMEOUT
+            ).strip()
+        count("chatbot_llm_requests_total", {"outcome": "ok"}, help_text="Request LLM per hasil")
         
         if is_answer_complete(answer):
-            print(f"✅ LLM answer ready")
+            log.debug(f"✅ LLM answer ready")
             return answer
         else:
-            return get_guaranteed_answer(question) or "Informasi tidak cukup."
+            return "Informasi tidak cukup."
             
+    except LLMTimeoutError:
+        count("chatbot_llm_requests_total", {"outcome": "timeout"}, help_text="Request LLM per hasil")
+        log.warning(f"⏱️ LLM melebihi {LLM_TIMEOUT}s, request dibatalkan")
+        return "Maaf, sistem sedang lambat."
     except Exception as e:
-        print(f"❌ Generation error: {e}")
-        return get_guaranteed_answer(question) or "Maaf, sistem sedang tidak tersedia."
+        count("chatbot_llm_requests_total", {"outcome": "error"}, help_text="Request LLM per hasil")
+        log.error(f"❌ Generation error: {e}")
+        return "Maaf, sistem sedang tidak tersedia."
+
+def stream_llm_answer(question, contexts, model_id, guard_rail, cancel_event=None):
+    """Stream token dari Ollama dengan output guard rail inkremental.
+
+    Generator: yield potongan teks; nilai return = jawaban final, atau None
+    jika jawaban tidak boleh di-cache (error, timeout, diblok guard rail,
+    dibatalkan lewat ``cancel_event``).
+    """
+    prompt = build_prompt(question, contexts)
+    
+    # Tahan beberapa karakter terakhir supaya keyword terlarang yang terpotong
+    # di antara token tidak sempat tampil sebelum guard rail memeriksanya
+    holdback = max(len(k) for k in guard_rail.dangerous_keywords + guard_rail.rejected_topics)
+    
+    with span("llm_stream", model=model_id):
+        return (yield from _stream_llm_answer(question, contexts, model_id, guard_rail, prompt, holdback,
+                                              cancel_event))
+
+def _stream_llm_answer(question, contexts, model_id, guard_rail, prompt, holdback, cancel_event):
+    """Isi stream_llm_answer; dipisah supaya seluruh stream tercatat di span llm_stream"""
+    text = ""
+    emitted = 0
+    timed_out = False
+    
+    try:
+        log.debug(f"🤖 Streaming with LLM...")
+        
+        # Deadline berlaku juga saat token berikutnya belum datang;
+        # menutup stream (blok guard rail / timeout) membatalkan request ke Ollama
+        stream = get_llm_client().stream_chat(
+            model=model_id,
+            messages=[{"role": "user", "content": prompt}],
+            options=GENERATION_OPTIONS,
+            timeout=LLM_TIMEOUT,
+            cancel_event=cancel_event
+        )
+        
+        try:
+            for piece in stream:
+                text += piece
+                answer = text.lstrip()
+                
+                # Aturan output punya pengecualian yang bisa muncul belakangan ('perasa' ...
+                # 'COVID-19', rejection phrase): selama awal jawaban belum lolos atau
+                # mengandung kata berbahaya, teks ditahan; blok diputuskan pada jawaban lengkap
+                can_emit, _ = guard_rail.validate_output_prefix(answer)
+                if can_emit:
+                    can_emit, _ = guard_rail.validate_output(answer, question, contexts)
+                safe_end = len(answer) - holdback
+                if can_emit and safe_end > emitted:
+                    yield answer[emitted:safe_end]
+                    emitted = safe_end
+        finally:
+            stream.close()
+                
+    except LLMTimeoutError:
+        count("chatbot_llm_requests_total", {"outcome": "timeout"}, help_text="Request LLM per hasil")
+        log.warning(f"⏱️ LLM melebihi {LLM_TIMEOUT}s, request dibatalkan")
+        timed_out = True
+    except Exception as e:
+        count("chatbot_llm_requests_total", {"outcome": "error"}, help_text="Request LLM per hasil")
+        log.error(f"❌ Generation error: {e}")
+        if not emitted:
+            yield "Maaf, sistem sedang tidak tersedia."
+        return None
+    
+    if cancel_event is not None and cancel_event.is_set():
+        count("chatbot_llm_requests_total", {"outcome": "cancelled"}, help_text="Request LLM per hasil")
+        log.debug(f"🛑 LLM dibatalkan")
+        return None
+    
+    answer = text.strip()
+    
+    # Keputusan akhir pada jawaban lengkap, sama dengan pengecekan non-streaming
+    is_valid_output, output_message = guard_rail.validate_output(answer, question, contexts)
+    if not is_valid_output:
+        yield ("\n\n" if emitted else "") + output_message
+        return None
+    
+    if not emitted and (timed_out or not is_answer_complete(answer)):
+        fallback = "Maaf, sistem sedang lambat." if timed_out else "Informasi tidak cukup."
+        yield fallback
+        return None
+    
+    if len(answer) > emitted:
+        yield answer[emitted:]
+    
+    if not timed_out:
+        count("chatbot_llm_requests_total", {"outcome": "ok"}, help_text="Request LLM per hasil")
+    log.debug(f"✅ LLM answer streamed")
+    return None if timed_out else answer
 
 def generate_answer(question, retrieved_docs, model_id):
     """Main function - ROBUST FALLBACK SYSTEM"""
     
-    print(f"\n💬 USER: '{question}'")
+    log.debug(f"💬 USER: '{question}'")
     
     # 1. Guard rail
-    guard_rail = GuardRail()
-    is_valid_input, input_message = guard_rail.validate_input(question)
+    guard_rail = get_guard_rail()
+    with span("guard_rail"):
+        is_valid_input, input_message = guard_rail.validate_input_cached(question)
     if not is_valid_input:
         return input_message
     
+    # 1b. Pertanyaan time-series sudah dijawab lookup langsung
+    structured_answer = get_structured_answer(retrieved_docs)
+    if structured_answer:
+        return structured_answer
+    
     # 2. Cek model
     if model_id is None:
         return "Maaf, sistem sedang tidak tersedia."
     
-    print(f"📚 Retrieved: {len(retrieved_docs)} docs")
+    log.debug(f"📚 Retrieved: {len(retrieved_docs)} docs")
     
     # 3. Prepare contexts
     contexts = []
     if retrieved_docs:
         contexts = [doc.get('text', '') for doc in retrieved_docs[:3]]
-        print(f"🔧 Using {len(contexts)} contexts")
+        log.debug(f"🔧 Using {len(contexts)} contexts")
     
     # 4. GENERATE DENGAN FALLBACK ROBUST
     answer = generate_complete_answer(question, contexts, model_id)
@@ -234,6 +363,133 @@ def generate_answer(question, retrieved_docs, model_id):
     
     return "COVID-19 adalah penyakit menular yang disebabkan oleh virus SARS-CoV-2 dengan gejala umum demam, batuk, dan kelelahan."
 
+def precheck_question(question):
+    """Guard rail sebelum retrieval: pertanyaan yang ditolak tidak menyentuh embedder/index"""
+    with span("guard_rail"):
+        is_valid_input, input_message = get_guard_rail().validate_input_cached(question)
+    
+    with _precheck_lock:
+        PRECHECK_STATS["checked"] += 1
+        if not is_valid_input:
+            PRECHECK_STATS["rejected"] += 1
+            PRECHECK_STATS["retrievals_avoided"] += 1
+    
+    return is_valid_input, input_message
+
+def get_precheck_stats():
+    """Counter pre-retrieval guard + statistik decision cache"""
+    guard_rail = get_guard_rail()
+    return {
+        **PRECHECK_STATS,
+        "rules_version": guard_rail.version,
+        "decision_cache": guard_rail.decision_cache.stats(),
+    }
+
+def get_faq_answer(question, retriever=None):
+    """Jawaban FAQ sebelum retrieval: tabel guaranteed, lalu semantic match embedding.
+
+    Return dict {'answer', 'match', 'score', 'faq_id', 'faq_question'} atau None.
+    """
+    match = None
+    with span("faq_lookup"):
+        guaranteed = get_guaranteed_answer(question)
+        if guaranteed:
+            match = {
+                "answer": guaranteed,
+                "match": "guaranteed",
+                "score": 1.0,
+                "faq_id": None,
+                "faq_question": question,
+            }
+        elif retriever is not None and config.MODEL_CONFIG.get("faq_semantic_enabled"):
+            match = retriever.match_faq(question)
+    
+    with _faq_stats_lock:
+        FAQ_STATS["checked"] += 1
+        if match:
+            FAQ_STATS[match["match"]] += 1
+            FAQ_STATS["llm_avoided"] += 1
+    
+    return match
+
+def get_faq_stats():
+    """Counter jawaban FAQ (guaranteed + semantic)"""
+    with _faq_stats_lock:
+        return dict(FAQ_STATS)
+
+def get_cached_answer(question, index_fingerprint, model_id):
+    """Cek answer cache; return dict {'answer', 'docs'} atau None"""
+    key = AnswerCache.make_key(question, index_fingerprint, model_id, GENERATION_OPTIONS)
+    return ANSWER_CACHE.get(key)
+
+def discard_cached_answer(question, index_fingerprint, model_id):
+    """Hapus jawaban dari answer cache (mis. jawaban spekulatif yang kalah dari FAQ)"""
+    key = AnswerCache.make_key(question, index_fingerprint, model_id, GENERATION_OPTIONS)
+    ANSWER_CACHE.discard(key)
+
+def generate_answer_cached(question, retrieved_docs, model_id, index_fingerprint=None, bypass_cache=False):
+    """generate_answer dengan answer cache (TTL + LRU); bypass_cache untuk debug"""
+    key = AnswerCache.make_key(question, index_fingerprint, model_id, GENERATION_OPTIONS)
+    
+    if not bypass_cache:
+        cached = ANSWER_CACHE.get(key)
+        if cached is not None:
+            count("chatbot_answer_cache_hits_total", help_text="Jawaban dari answer cache")
+            log.debug(f"⚡ Answer cache hit")
+            return cached["answer"]
+    
+    answer = generate_answer(question, retrieved_docs, model_id)
+    
+    if model_id is not None and answer not in TRANSIENT_ANSWERS:
+        ANSWER_CACHE.put(key, {"answer": answer, "docs": retrieved_docs})
+    
+    return answer
+
+def generate_answer_stream(question, retrieved_docs, model_id, index_fingerprint=None, bypass_cache=False,
+                           cancel_event=None):
+    """Versi streaming generate_answer: yield potongan jawaban untuk st.write_stream"""
+    key = AnswerCache.make_key(question, index_fingerprint, model_id, GENERATION_OPTIONS)
+    
+    if not bypass_cache:
+        cached = ANSWER_CACHE.get(key)
+        if cached is not None:
+            count("chatbot_answer_cache_hits_total", help_text="Jawaban dari answer cache")
+            log.debug(f"⚡ Answer cache hit")
+            yield cached["answer"]
+            return
+    
+    log.debug(f"💬 USER: '{question}'")
+    
+    guard_rail = get_guard_rail()
+    with span("guard_rail"):
+        is_valid_input, input_message = guard_rail.validate_input_cached(question)
+    if not is_valid_input:
+        ANSWER_CACHE.put(key, {"answer": input_message, "docs": retrieved_docs})
+        yield input_message
+        return
+    
+    structured_answer = get_structured_answer(retrieved_docs)
+    if structured_answer:
+        ANSWER_CACHE.put(key, {"answer": structured_answer, "docs": retrieved_docs})
+        yield structured_answer
+        return
+    
+    if model_id is None:
+        yield "Maaf, sistem sedang tidak tersedia."
+        return
+    
+    contexts = [doc.get('text', '') for doc in (retrieved_docs or [])[:3]]
+    
+    with span("canned_lookup"):
+        answer = answer_without_llm(question, contexts)
+    if answer:
+        yield answer
+    else:
+        answer = yield from stream_llm_answer(question, contexts, model_id, guard_rail, cancel_event)
+    
+    if answer and answer not in TRANSIENT_ANSWERS:
+        ANSWER_CACHE.put(key, {"answer": answer, "docs": retrieved_docs})
+
 def extract_source_info(text, score, doc_id):
     """Extract source information"""
     if not isinstance(text, str):
@@ -1,159 +1,244 @@
 # src/guard_rail.py - COMPLETE SECURITY VERSION
+import os
 import re
+import json
+import time
+import threading
 from typing import Dict, List, Tuple
 
+from src.keyword_matcher import KeywordMatcher
+from src.cache import LRUCache, normalize_text
+from src.telemetry import get_logger
+
+log = get_logger("guard_rail")
+
+# Kata-kata yang dipakai aturan khusus di validate_input / validate_output
+DECISION_TERMS = [
+    'siapa', 'vaksin', 'covid', 'corona', 'presiden', 'orang pertama', 'pertama',
+    'apakah', 'benar', 'jokowi', 'pandemi'
+]
+
+# Daftar yang dicek validate_input; di bawah MATCHER_MIN_KEYWORDS total keyword,
+# loop `in` dengan early exit lebih cepat dari scan regex satu sapuan
+# (benchmarks/bench_guard_rail.py: 166 keyword -> loop ~5us, matcher ~8us; 332 -> sudah seimbang)
+INPUT_LISTS = ('covid_keywords', 'rejected_topics', 'dangerous_keywords', 'security_blocked_keywords')
+MATCHER_MIN_KEYWORDS = 256
+
+RULE_LISTS = (
+    'covid_keywords', 'rejected_topics', 'dangerous_keywords', 'security_blocked_keywords',
+    'rejection_phrases', 'security_indicators', 'emergency_phrases'
+)
+
+def default_rules_path():
+    from src import config
+    return config.GUARD_RAIL_RULES_PATH
+
+def default_cache_size():
+    from src import config
+    return config.MODEL_CONFIG.get("guard_cache_size", 4096)
+
+def load_rules(rules_path: str) -> Dict:
+    """Load rule set guard rail dari file JSON berversi"""
+    with open(rules_path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    
+    missing = [name for name in RULE_LISTS if not isinstance(rules.get(name), list)]
+    if missing:
+        raise ValueError(f"Rule set {rules_path} tidak lengkap: {missing}")
+    return rules
+
 class GuardRail:
-    def __init__(self):
-        self.covid_keywords = [
-            # COVID & Virus
-            'covid', 'corona', 'virus', 'pandemi', 'sars-cov-2', 'varian',
-            
-            # Gejala & Kesehatan
-            'gejala', 'demam', 'batuk', 'kelelahan', 'penciuman', 'perasa', 'sesak napas',
-            'isolasi', 'karantina', 'kesehatan', 'medis', 'rumah sakit',
-            
-            # Vaksinasi - DIPERLUAS
-            'vaksin', 'vaksinasi', 'sinovac', 'astrazeneca', 'moderna', 'pfizer', 
-            'booster', 'dosis', 'sertifikat', 'presiden', 'jokowi', 'orang pertama',
-            'suntik', 'imunisasi', 'vaksinasi', 'divaksin', 'joko widodo',
-            
-            # Pencegahan & Protokol
-            'pencegahan', 'cegah', 'protokol', 'masker', 'cuci tangan', 'jarak',
-            'kerumunan', 'mobilitas', '5m',
-            
-            # Kebijakan & Program
-            'psbb', 'ppkm', 'pembatasan', 'kebijakan', 'program',
-            
-            # Aplikasi & Teknologi
-            'pedulilindungi', 'aplikasi', 'tracking',
-            
-            # Bantuan & Ekonomi
-            'bantuan', 'blt', 'prakerja', 'umkm', 'usaha', 'ekonomi',
-            
-            # Data & Statistik
-            'data', 'statistik', 'kasus', 'positif', 'sembuh', 'meninggal',
-            
-            # KATA UMUM YANG SERING DITANYAKAN - TAMBAHAN
-            'siapa', 'apa', 'kapan', 'berapa', 'bagaimana', 'dimana',
-            'pertama', 'orang', 'presiden', 'menteri', 'dokter', 'perawat',
-            'benar', 'apakah', 'siapakah'
-        ]
-        
-        self.rejected_topics = [
-            # Makanan & Minuman
-            'makanan', 'minuman', 'restoran', 'warung', 'kue', 'cheesecake', 'martabak',
-            'resep', 'masak', 'memasak', 'kuliner',
-            
-            # Hiburan
-            'musik', 'lagu', 'artis', 'band', 'snsd', 'bts', 'blackpink', 'hearts',
-            'film', 'drama', 'sinetron', 'netflix', 'youtube', 'tiktok',
-            'game', 'mobile legend', 'free fire', 'pubg',
-            
-            # Olahraga
-            'olahraga', 'sepak bola', 'bulutangkis', 'tenis', 'basket',
-            
-            # Politik & Sosial
-            'politik', 'pemilu', 'pilkada', 'partai',
-            'ras', 'suku', 'agama', 'etnis',
-            
-            # Relationship
-            'cinta', 'love', 'pacaran', 'relationship', 'i love you', 'romantis',
-        ]
-        
-        self.dangerous_keywords = [
-            'bunuh diri', 'melukai', 'bunuh', 'racun', 'bom', 'senjata',
-            'kekerasan', 'teror', 'extrem', 'radikal'
-        ]
-        
-        self.security_blocked_keywords = [
-            'meretas', 'hack', 'crack', 'bypass', 'exploit', 'virus', 'malware',
-            'serangan', 'attack', 'injeksi', 'injection', 'sql injection',
-            'backdoor', 'remote access', 'brute force', 'password', 'login',
-            'security bug', 'kerentanan', 'vulnerability', 'zero day',
-            'deface', 'ddos', 'phishing', 'social engineering',
-            'keylogger', 'trojan', 'ransomware', 'spyware'
-        ]
+    def __init__(self, rules_path: str = None, cache_size: int = None):
+        self.rules_path = rules_path or default_rules_path()
+        rules = load_rules(self.rules_path)
+        
+        self.version = str(rules.get('version', 'unknown'))
+        self.loaded_at = time.time()
+        self.rules_mtime = os.path.getmtime(self.rules_path)
+        
+        # covid_keywords, rejected_topics, dangerous_keywords, security_blocked_keywords,
+        # rejection_phrases, security_indicators, emergency_phrases
+        for name in RULE_LISTS:
+            setattr(self, name, [str(word).lower() for word in rules[name]])
+        
+        self.build_matcher()
+        
+        # Cache keputusan validate_input per query ternormalisasi; ikut hilang saat rule set di-reload
+        self.decision_cache = LRUCache(cache_size if cache_size is not None else default_cache_size())
+
+    def build_matcher(self):
+        """Kompilasi semua daftar keyword sekali menjadi satu matcher"""
+        self.matcher = KeywordMatcher({
+            'covid': self.covid_keywords,
+            'rejected': self.rejected_topics,
+            'dangerous': self.dangerous_keywords,
+            'security': self.security_blocked_keywords,
+            'terms': DECISION_TERMS,
+            'rejection_phrases': self.rejection_phrases,
+            'security_indicators': self.security_indicators,
+            'emergency': self.emergency_phrases,
+        })
+        self.use_matcher = sum(len(getattr(self, name)) for name in INPUT_LISTS) >= MATCHER_MIN_KEYWORDS
+
+    def rule_info(self) -> Dict:
+        """Versi rule set dan waktu load"""
+        return {
+            'version': self.version,
+            'loaded_at': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.loaded_at)),
+            'rules_path': self.rules_path,
+            'keywords': {name: len(getattr(self, name)) for name in RULE_LISTS},
+            'decision_cache': self.decision_cache.stats(),
+        }
 
     def validate_input(self, query: str) -> Tuple[bool, str]:
         """Guard rail untuk input query dari user - DITAMBAH SECURITY"""
+        if self.use_matcher:
+            return self._validate_input_matcher(query)
+        return self._validate_input_loop(query)
+
+    def _validate_input_loop(self, query: str) -> Tuple[bool, str]:
+        """validate_input dengan `in` per keyword + early exit (daftar keyword kecil)"""
         query_lower = query.lower()
         
+        if any(danger in query_lower for danger in self.dangerous_keywords):
+            return False, "❌ Pertanyaan mengandung konten yang tidak aman."
+        
+        if any(security_word in query_lower for security_word in self.security_blocked_keywords):
+            return False, "❌ Saya tidak dapat membantu dengan pertanyaan terkait keamanan siber atau peretasan."
+        
+        if 'siapa' in query_lower and any(kw in query_lower for kw in ['vaksin', 'covid', 'corona', 'presiden', 'orang pertama']):
+            return True, "OK"
+        
+        if 'orang pertama' in query_lower or 'pertama' in query_lower and 'vaksin' in query_lower:
+            return True, "OK"
+        
+        if 'apakah' in query_lower and 'benar' in query_lower and any(kw in query_lower for kw in ['vaksin', 'covid', 'jokowi']):
+            return True, "OK"
+        
+        if any(topic in query_lower for topic in self.rejected_topics):
+            if not any(kw in query_lower for kw in ['covid', 'corona', 'vaksin', 'pandemi']):
+                return False, f"❌ Maaf, saya hanya dapat menjawab pertanyaan tentang COVID-19 di Indonesia."
+        
+        if not any(keyword in query_lower for keyword in self.covid_keywords):
+            return False, "❌ Maaf, saya hanya dapat menjawab pertanyaan tentang COVID-19 di Indonesia."
+        
+        return True, "OK"
+
+    def _validate_input_matcher(self, query: str) -> Tuple[bool, str]:
+        """validate_input dengan satu scan KeywordMatcher (daftar keyword besar)"""
+        hits = self.matcher.scan(query.lower())
+        terms = hits['terms']
+        
         # 1. Cek kata berbahaya - PRIORITAS TERTINGGI
-        for danger in self.dangerous_keywords:
-            if danger in query_lower:
-                return False, "❌ Pertanyaan mengandung konten yang tidak aman."
+        if hits['dangerous']:
+            return False, "❌ Pertanyaan mengandung konten yang tidak aman."
         
-        for security_word in self.security_blocked_keywords:
-            if security_word in query_lower:
-                return False, "❌ Saya tidak dapat membantu dengan pertanyaan terkait keamanan siber atau peretasan."
+        if hits['security']:
+            return False, "❌ Saya tidak dapat membantu dengan pertanyaan terkait keamanan siber atau peretasan."
         
         # 2. SPECIAL CASE: Pertanyaan tentang "siapa" otomatis diterima jika ada konteks COVID
-        if 'siapa' in query_lower and any(kw in query_lower for kw in ['vaksin', 'covid', 'corona', 'presiden', 'orang pertama']):
+        if 'siapa' in terms and terms & {'vaksin', 'covid', 'corona', 'presiden', 'orang pertama'}:
             return True, "OK"
             
         # 3. SPECIAL CASE: Pertanyaan tentang "orang pertama" otomatis diterima
-        if 'orang pertama' in query_lower or 'pertama' in query_lower and 'vaksin' in query_lower:
+        if 'orang pertama' in terms or 'pertama' in terms and 'vaksin' in terms:
             return True, "OK"
 
         # 4. SPECIAL CASE: Pertanyaan "apakah benar" tentang COVID
-        if 'apakah' in query_lower and 'benar' in query_lower and any(kw in query_lower for kw in ['vaksin', 'covid', 'jokowi']):
+        if 'apakah' in terms and 'benar' in terms and terms & {'vaksin', 'covid', 'jokowi'}:
             return True, "OK"
         
         # 5. Cek topik ditolak - HANYA YANG BENAR-BENAR TIDAK RELEVAN
-        for topic in self.rejected_topics:
-            if topic in query_lower:
-                # KECUALI jika juga mengandung kata COVID
-                if not any(covid_kw in query_lower for covid_kw in ['covid', 'corona', 'vaksin', 'pandemi']):
-                    return False, f"❌ Maaf, saya hanya dapat menjawab pertanyaan tentang COVID-19 di Indonesia."
+        # KECUALI jika juga mengandung kata COVID
+        if hits['rejected'] and not terms & {'covid', 'corona', 'vaksin', 'pandemi'}:
+            return False, f"❌ Maaf, saya hanya dapat menjawab pertanyaan tentang COVID-19 di Indonesia."
         
         # 6. Cek apakah query tentang COVID - LEBIH FLEKSIBEL
-        is_covid_related = any(keyword in query_lower for keyword in self.covid_keywords)
-        
-        if not is_covid_related:
+        if not hits['covid']:
             return False, "❌ Maaf, saya hanya dapat menjawab pertanyaan tentang COVID-19 di Indonesia."
         
         return True, "OK"
 
+    def validate_input_cached(self, query: str) -> Tuple[bool, str]:
+        """validate_input dengan memo keputusan per query ternormalisasi"""
+        key = normalize_text(query)
+        decision = self.decision_cache.get(key)
+        if decision is None:
+            decision = self.validate_input(key)
+            self.decision_cache.put(key, decision)
+        return decision
+
+    def validate_output_prefix(self, partial_answer: str) -> Tuple[bool, str]:
+        """Cek awal jawaban yang masih di-stream: boleh ditampilkan atau ditahan.
+
+        False berarti tahan (jangan tampilkan dulu), bukan blok: rejection
+        phrase yang muncul belakangan bisa membuat jawaban lengkap lolos.
+        Keputusan blok selalu dari validate_output pada jawaban lengkap.
+        """
+        if self.matcher.scan(partial_answer.lower())['dangerous']:
+            return False, "HOLD"
+        return True, "OK"
+
     def validate_output(self, answer: str, question: str, contexts: List[str]) -> Tuple[bool, str]:
         """Guard rail untuk output dari LLM - DITAMBAH SECURITY"""
-        answer_lower = answer.lower()
-        question_lower = question.lower()
+        hits = self.matcher.scan(answer.lower())
         
         # 1. Biarkan rejection phrases pass
-        rejection_phrases = ['maaf', 'tidak tahu', 'tidak bisa', 'tidak ditemukan']
-        if any(phrase in answer_lower for phrase in rejection_phrases):
+        if hits['rejection_phrases']:
             return True, "OK"
         
-        security_indicators = [
-            'password', 'login', 'akses', 'remote', 'bug', 'kerentanan',
-            'exploit', 'bypass', 'crack', 'hack'
-        ]
-        
-        if any(sec_word in question_lower for sec_word in self.security_blocked_keywords):
-            if any(sec_indicator in answer_lower for sec_indicator in security_indicators):
-                return False, "❌ Jawaban mengandung informasi keamanan yang tidak sesuai."
+        if hits['security_indicators'] and self.matcher.scan(question.lower())['security']:
+            return False, "❌ Jawaban mengandung informasi keamanan yang tidak sesuai."
         
         # 2. Cek topik ditolak dalam jawaban
-        for topic in self.rejected_topics:
-            if topic in answer_lower:
-                # KECUALI jika itu bagian dari konteks COVID
-                if not any(covid_kw in answer_lower for covid_kw in ['covid', 'corona', 'vaksin']):
-                    return False, "❌ Maaf, informasi tidak ditemukan dalam dokumen sumber COVID-19 Indonesia."
+        # KECUALI jika itu bagian dari konteks COVID
+        if hits['rejected'] and not hits['terms'] & {'covid', 'corona', 'vaksin'}:
+            return False, "❌ Maaf, informasi tidak ditemukan dalam dokumen sumber COVID-19 Indonesia."
         
         # 3. Cek kata berbahaya dalam jawaban
-        for danger in self.dangerous_keywords:
-            if danger in answer_lower:
-                return False, "❌ Jawaban mengandung konten yang tidak aman."
+        if hits['dangerous']:
+            return False, "❌ Jawaban mengandung konten yang tidak aman."
         
         return True, "OK"
 
     def emergency_shutdown(self, answer: str) -> bool:
         """Emergency shutdown untuk jawaban yang sangat berbahaya"""
-        emergency_phrases = [
-            'bunuh diri', 'bunuh dirimu', 'racun', 'bom', 'senjata api',
-            'kekerasan seksual', 'perkosaan', 'cara hack', 'cara meretas',
-            'bypass security', 'exploit bug', 'sql injection'
-        ]
-        
-        answer_lower = answer.lower()
-        return any(phrase in answer_lower for phrase in emergency_phrases)
\ No newline at end of file
+        return bool(self.matcher.scan(answer.lower())['emergency'])
+
+
+_guard_rail = None
+_guard_rail_lock = threading.Lock()
+_last_reload_check = 0.0
+_failed_mtime = None
+RELOAD_CHECK_INTERVAL = 1.0
+
+def get_guard_rail(rules_path: str = None) -> GuardRail:
+    """GuardRail satu per proses; dimuat ulang otomatis jika file rule set berubah"""
+    global _guard_rail, _last_reload_check, _failed_mtime
+    
+    rules_path = rules_path or default_rules_path()
+    guard_rail = _guard_rail
+    now = time.time()
+    
+    if guard_rail is not None and guard_rail.rules_path == rules_path:
+        if now - _last_reload_check < RELOAD_CHECK_INTERVAL:
+            return guard_rail
+    
+    with _guard_rail_lock:
+        _last_reload_check = now
+        guard_rail = _guard_rail
+        try:
+            if guard_rail is None or guard_rail.rules_path != rules_path:
+                _guard_rail = GuardRail(rules_path)
+            else:
+                mtime = os.path.getmtime(rules_path)
+                if mtime != guard_rail.rules_mtime and mtime != _failed_mtime:
+                    _failed_mtime = mtime
+                    _guard_rail = GuardRail(rules_path)
+                    _failed_mtime = None
+                    log.info(f"🔄 Guard rail rules reloaded: v{_guard_rail.version}")
+        except Exception as e:
+            if guard_rail is None:
+                raise
+            log.warning(f"⚠️ Gagal reload guard rail rules, tetap pakai v{guard_rail.version}: {e}")
+        return _guard_rail
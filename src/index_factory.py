@@ -0,0 +1,171 @@
+import os
+import math
+import argparse
+
+import numpy as np
+import faiss
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+METRICS = {
+    "l2": faiss.METRIC_L2,
+    "ip": faiss.METRIC_INNER_PRODUCT,
+}
+
+
+def default_nlist(n_vectors):
+    """Jumlah cluster IVF: ~4*sqrt(N), tapi minimal 39 titik training per cluster"""
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+
+
+def _pq_subquantizers(dim, pq_m):
+    """Cari jumlah sub-quantizer terbesar <= pq_m yang membagi dimensi"""
+    for m in range(min(pq_m, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def build_index(vectors, index_type="flat", metric="l2", nlist=None,
+                pq_m=16, pq_bits=8, hnsw_m=32, ef_construction=200):
+    """Bangun (train + add) FAISS index sesuai tipe: flat, ivf_flat, ivf_pq, hnsw"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index_type '{index_type}', pilih salah satu dari {INDEX_TYPES}")
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', pilih 'l2' atau 'ip'")
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n_vectors, dim = vectors.shape
+    faiss_metric = METRICS[metric]
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim) if metric == "ip" else faiss.IndexFlatL2(dim)
+
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss_metric)
+        index.hnsw.efConstruction = ef_construction
+
+    else:
+        nlist = nlist or default_nlist(n_vectors)
+        quantizer = faiss.IndexFlatIP(dim) if metric == "ip" else faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss_metric)
+        else:
+            m = _pq_subquantizers(dim, pq_m)
+            # k-means PQ butuh minimal 2^bits titik training
+            bits = max(1, min(pq_bits, int(math.log2(max(n_vectors, 2)))))
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, bits, faiss_metric)
+        # Simpan quantizer bersama index supaya tidak di-GC
+        index.own_fields = True
+        quantizer.this.disown()
+
+    if not index.is_trained:
+        index.train(vectors)
+    if n_vectors:
+        index.add(vectors)
+    return index
+
+
+def configure_index(index, nprobe=None, ef_search=None):
+    """Set parameter search (nprobe untuk IVF, efSearch untuk HNSW)"""
+    ivf = _as_ivf(index)
+    if ivf is not None and nprobe:
+        ivf.nprobe = min(int(nprobe), ivf.nlist)
+
+    hnsw = _as_hnsw(index)
+    if hnsw is not None and ef_search:
+        hnsw.hnsw.efSearch = int(ef_search)
+    return index
+
+
+def load_index(path, nprobe=None, ef_search=None):
+    """Load index dari disk dan terapkan parameter search dari config"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"FAISS index not found: {path}")
+    index = faiss.read_index(path)
+    return configure_index(index, nprobe=nprobe, ef_search=ef_search)
+
+
+def _as_ivf(index):
+    try:
+        return faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return None
+
+
+def _as_hnsw(index):
+    index = faiss.downcast_index(index)
+    return index if isinstance(index, faiss.IndexHNSW) else None
+
+
+def index_type_of(index):
+    """Nama tipe index sesuai INDEX_TYPES"""
+    ivf = _as_ivf(index)
+    if ivf is not None:
+        return "ivf_pq" if isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ) else "ivf_flat"
+    if _as_hnsw(index) is not None:
+        return "hnsw"
+    return "flat"
+
+
+def describe_index(index):
+    """Info tipe index dan parameter search untuk get_index_stats"""
+    info = {
+        "index_type": index_type_of(index),
+        "metric": "ip" if index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2",
+    }
+    ivf = _as_ivf(index)
+    if ivf is not None:
+        info["nlist"] = ivf.nlist
+        info["nprobe"] = ivf.nprobe
+    hnsw = _as_hnsw(index)
+    if hnsw is not None:
+        info["ef_search"] = hnsw.hnsw.efSearch
+    return info
+
+
+def read_vectors(index):
+    """Ambil kembali semua vektor dari index (untuk rebuild ke tipe lain)"""
+    ivf = _as_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def main():
+    from src import config
+
+    parser = argparse.ArgumentParser(description="Rebuild FAISS index ke tipe/metric lain (Flat, IVF-Flat, IVF-PQ, HNSW)")
+    parser.add_argument("--source", default=config.INDEX_PATH, help="Index sumber (biasanya flat)")
+    parser.add_argument("--output", default=None, help="Path index hasil (default: timpa --source)")
+    parser.add_argument("--type", dest="index_type", default=config.MODEL_CONFIG.get("index_type", "flat"), choices=INDEX_TYPES)
+    parser.add_argument("--metric", default=config.MODEL_CONFIG.get("index_metric", "ip"), choices=sorted(METRICS),
+                        help="'ip' = cosine similarity (vektor dinormalisasi L2)")
+    parser.add_argument("--nlist", type=int, default=config.MODEL_CONFIG.get("ivf_nlist"))
+    parser.add_argument("--pq-m", type=int, default=config.MODEL_CONFIG.get("ivf_pq_m", 16))
+    parser.add_argument("--hnsw-m", type=int, default=config.MODEL_CONFIG.get("hnsw_m", 32))
+    args = parser.parse_args()
+
+    source = faiss.read_index(args.source)
+    vectors = read_vectors(source)
+    if args.metric == "ip":
+        faiss.normalize_L2(vectors)
+
+    print(f"🔄 Building {args.index_type} index dari {source.ntotal} vektor ({args.metric})...")
+    index = build_index(
+        vectors,
+        index_type=args.index_type,
+        metric=args.metric,
+        nlist=args.nlist,
+        pq_m=args.pq_m,
+        hnsw_m=args.hnsw_m
+    )
+
+    output = args.output or args.source
+    faiss.write_index(index, output)
+    print(f"✅ Index disimpan di: {output}")
+    print(describe_index(index))
+
+
+if __name__ == "__main__":
+    main()
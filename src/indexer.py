@@ -0,0 +1,268 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+import faiss
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import src.config as config
+from src.index_factory import build_index, default_nlist, read_vectors, describe_index
+from src.chunk_store import open_texts, write_chunk_store, store_base_for
+from src.lexical_index import write_lexical_index, lexical_path_for
+
+TEXT_FIELDS = ("text", "content", "chunk", "page_content")
+MIN_CHUNK_CHARS = 10
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def iter_chunks(paths):
+    """Stream chunk dari satu atau lebih file JSONL: yield (hash, text)"""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"⚠️ JSON error {os.path.basename(path)}:{line_no}: {e}")
+                    continue
+
+                text = next((data[field] for field in TEXT_FIELDS if isinstance(data.get(field), str)), "")
+                text = text.strip()
+                if len(text) > MIN_CHUNK_CHARS:
+                    yield content_hash(text), text
+
+
+def collect_chunks(paths):
+    """Kumpulkan chunk unik (berdasarkan content hash), urutan sesuai input"""
+    hashes, texts, seen = [], [], set()
+    for chunk_hash, text in iter_chunks(paths):
+        if chunk_hash in seen:
+            continue
+        seen.add(chunk_hash)
+        hashes.append(chunk_hash)
+        texts.append(text)
+    return hashes, texts
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _write_index(path, index):
+    tmp_path = path + ".tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class IndexBuilder:
+    """Build FAISS index dari chunk JSONL: embed per batch besar, langsung add ke index"""
+
+    def __init__(self, index_type=None, metric=None, batch_size=None, embedder=None):
+        self.index_type = index_type or config.MODEL_CONFIG.get("index_type", "flat")
+        self.metric = metric or config.MODEL_CONFIG.get("index_metric", "ip")
+        self.batch_size = batch_size or config.MODEL_CONFIG.get("index_batch_size", 256)
+        self.model_name = config.MODEL_CONFIG["embedding_model"]
+        self.embedder = embedder
+
+    def _get_embedder(self):
+        if self.embedder is None:
+            from sentence_transformers import SentenceTransformer
+            print(f"🔄 Loading embedder: {self.model_name}")
+            self.embedder = SentenceTransformer(self.model_name, device=config.MODEL_CONFIG.get("device", "cpu"))
+        return self.embedder
+
+    def embed(self, texts):
+        """Embed list teks per batch; yield array float32 per batch"""
+        embedder = self._get_embedder()
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            vectors = embedder.encode(
+                batch,
+                batch_size=min(64, self.batch_size),
+                convert_to_numpy=True,
+                normalize_embeddings=self.metric == "ip",
+                show_progress_bar=False
+            ).astype("float32")
+            print(f"   🔢 Embedded {min(start + self.batch_size, len(texts))}/{len(texts)}")
+            yield vectors
+
+    def build(self, texts, reused_vectors=None):
+        """Build index baru. reused_vectors: {posisi: vektor} yang tidak perlu di-embed ulang"""
+        if reused_vectors:
+            return self._build_with_reuse(texts, reused_vectors)
+
+        nlist = default_nlist(len(texts))
+        # IVF perlu training: kumpulkan sampel training dulu sebelum index dibuat
+        train_size = nlist * 39 if self.index_type.startswith("ivf") else 0
+
+        index = None
+        pending, pending_rows = [], 0
+        for vectors in self.embed(texts):
+            if index is not None:
+                index.add(vectors)
+                continue
+            pending.append(vectors)
+            pending_rows += len(vectors)
+            if pending_rows >= train_size:
+                index = build_index(np.vstack(pending), self.index_type, self.metric, nlist=nlist)
+                pending = []
+
+        if index is None:
+            index = build_index(np.vstack(pending), self.index_type, self.metric, nlist=nlist)
+        return index
+
+    def _build_with_reuse(self, texts, reused_vectors):
+        positions = [i for i in range(len(texts)) if i not in reused_vectors]
+        dim = len(next(iter(reused_vectors.values())))
+
+        vectors = np.empty((len(texts), dim), dtype="float32")
+        for position, vector in reused_vectors.items():
+            vectors[position] = vector
+
+        offset = 0
+        for batch in self.embed([texts[i] for i in positions]):
+            vectors[positions[offset:offset + len(batch)]] = batch
+            offset += len(batch)
+
+        return build_index(vectors, self.index_type, self.metric, nlist=default_nlist(len(texts)))
+
+    def append(self, index, texts):
+        """Tambah chunk baru ke index yang sudah ada (tanpa rebuild)"""
+        for vectors in self.embed(texts):
+            index.add(vectors)
+        return index
+
+
+def run_build(chunk_paths, index_path=None, texts_path=None, manifest_path=None,
+              incremental=False, index_type=None, metric=None, batch_size=None, embedder=None):
+    """Build/refresh pasangan faiss_textcovid19.index + _texts.json (+ manifest hash)"""
+    index_path = index_path or config.INDEX_PATH
+    texts_path = texts_path or config.TEXT_PATH
+    manifest_path = manifest_path or config.MANIFEST_PATH
+
+    builder = IndexBuilder(index_type=index_type, metric=metric, batch_size=batch_size, embedder=embedder)
+    start_time = time.time()
+
+    print(f"📖 Reading chunks dari {len(chunk_paths)} file...")
+    hashes, texts = collect_chunks(chunk_paths)
+    print(f"✅ {len(texts)} chunk unik")
+    if not texts:
+        raise ValueError("Tidak ada chunk yang valid di file input")
+
+    manifest = load_manifest(manifest_path) if incremental else None
+    if manifest and (manifest.get("model") != builder.model_name or manifest.get("metric") != builder.metric
+                     or manifest.get("index_type") != builder.index_type):
+        print("⚠️ Model/metric/index_type berbeda dengan manifest, full rebuild")
+        manifest = None
+    if manifest and not os.path.exists(index_path):
+        manifest = None
+
+    stats = {"total": len(texts), "embedded": len(texts), "reused": 0, "mode": "full"}
+
+    if manifest is None:
+        index = builder.build(texts)
+    else:
+        old_hashes = manifest["hashes"]
+        old_positions = {h: i for i, h in enumerate(old_hashes)}
+        new_set = set(hashes)
+
+        if all(h in new_set for h in old_hashes):
+            # Semua chunk lama masih ada: cukup append chunk baru di belakang
+            old_texts = list(open_texts(texts_path))
+            new_items = [(h, t) for h, t in zip(hashes, texts) if h not in old_positions]
+            index = faiss.read_index(index_path)
+            if new_items:
+                builder.append(index, [t for _, t in new_items])
+            hashes = old_hashes + [h for h, _ in new_items]
+            texts = old_texts + [t for _, t in new_items]
+            stats.update(embedded=len(new_items), reused=len(old_hashes), mode="append")
+        else:
+            # Ada chunk yang berubah/dihapus: pakai ulang vektor lama, embed yang baru saja
+            old_vectors = read_vectors(faiss.read_index(index_path))
+            reused = {i: old_vectors[old_positions[h]] for i, h in enumerate(hashes) if h in old_positions}
+            index = builder.build(texts, reused_vectors=reused)
+            stats.update(embedded=len(texts) - len(reused), reused=len(reused), mode="rebuild")
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    _write_index(index_path, index)
+    _write_json(texts_path, texts)
+    write_chunk_store(texts, store_base_for(texts_path), source_path=texts_path)
+    # Inverted index BM25 selalu dibangun ulang dari semua chunk (tanpa embedding, murah)
+    stats["lexical_terms"] = write_lexical_index(
+        texts, store_base_for(texts_path),
+        k1=config.MODEL_CONFIG.get("bm25_k1", 1.5),
+        b=config.MODEL_CONFIG.get("bm25_b", 0.75)
+    )
+    _write_json(manifest_path, {
+        "model": builder.model_name,
+        "metric": builder.metric,
+        "index_type": builder.index_type,
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "hashes": hashes,
+    })
+
+    stats["time_s"] = round(time.time() - start_time, 2)
+    stats.update(describe_index(index))
+    print(f"✅ Index: {index_path} ({index.ntotal} vectors)")
+    print(f"✅ Texts: {texts_path} (+ chunk store {store_base_for(texts_path)}.bin)")
+    print(f"✅ BM25: {lexical_path_for(store_base_for(texts_path))}")
+    print(f"📊 {stats}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build FAISS index dari chunk JSONL (full atau incremental)")
+    parser.add_argument("inputs", nargs="*", default=config.CHUNK_FILES, help="File chunk JSONL")
+    parser.add_argument("--incremental", action="store_true", help="Embed hanya chunk baru/berubah (berdasarkan content hash)")
+    parser.add_argument("--index-path", default=config.INDEX_PATH)
+    parser.add_argument("--texts-path", default=config.TEXT_PATH)
+    parser.add_argument("--manifest-path", default=config.MANIFEST_PATH)
+    parser.add_argument("--type", dest="index_type", default=None, help="flat, ivf_flat, ivf_pq, hnsw")
+    parser.add_argument("--metric", default=None, help="ip (cosine) atau l2")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    missing = [p for p in args.inputs if not os.path.exists(p)]
+    if missing:
+        print(f"❌ File input tidak ditemukan: {missing}")
+        return 1
+
+    run_build(
+        args.inputs,
+        index_path=args.index_path,
+        texts_path=args.texts_path,
+        manifest_path=args.manifest_path,
+        incremental=args.incremental,
+        index_type=args.index_type,
+        metric=args.metric,
+        batch_size=args.batch_size
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import re
+from typing import Dict, Iterable, Set
+
+
+def _trie_pattern(keywords):
+    """Regex dari trie keyword: cabang per karakter, greedy -> keyword terpanjang dulu"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        children = sorted(char for char in node if char)
+        if not children:
+            return ""
+        branches = [re.escape(char) + build(node[char]) for char in children]
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Matcher multi-keyword yang dikompilasi sekali, scan teks dalam satu sapuan.
+
+    Semantik sama dengan ``keyword in text`` (substring) untuk setiap keyword.
+    Semua keyword digabung menjadi satu regex berbentuk trie, dan setiap
+    ``search`` menemukan posisi berikutnya tempat sebuah keyword dimulai
+    (keyword terpanjang di posisi itu). Keyword lebih pendek yang merupakan
+    substring keyword tersebut ('vaksin' di 'vaksinasi') ikut dihitung lewat
+    tabel yang dihitung saat build.
+
+    ``whole_words=True``: keyword hanya cocok sebagai kata utuh (tidak diapit
+    huruf/angka), jadi 'bali' tidak cocok di 'kembali' atau 'balikpapan'.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], whole_words: bool = False):
+        self.whole_words = whole_words
+        self.categories = {name: tuple(dict.fromkeys(words)) for name, words in categories.items()}
+
+        self._keyword_categories: Dict[str, Set[str]] = {}
+        for name, words in self.categories.items():
+            for word in words:
+                if word:
+                    self._keyword_categories.setdefault(word, set()).add(name)
+
+        keywords = sorted(self._keyword_categories)
+        self._implied = {keyword: self._substring_keywords(keyword) for keyword in keywords}
+        pattern = _trie_pattern(keywords)
+        if whole_words:
+            # Regex mundur ke keyword yang lebih pendek jika yang terpanjang bukan kata utuh
+            pattern = r"(?<!\w)(?:" + pattern + r")(?!\w)"
+        self._pattern = re.compile(pattern) if keywords else None
+
+    def _substring_keywords(self, keyword):
+        """Semua keyword yang merupakan substring dari keyword (termasuk dirinya)"""
+        substrings = {
+            keyword[start:end]
+            for start in range(len(keyword))
+            for end in range(start + 1, len(keyword) + 1)
+        }
+        implied = [other for other in substrings if other in self._keyword_categories]
+        if self.whole_words:
+            implied = [other for other in implied
+                       if re.search(r"(?<!\w)" + re.escape(other) + r"(?!\w)", keyword)]
+        return implied
+
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """Return {kategori: set keyword yang muncul di text}"""
+        hits: Dict[str, Set[str]] = {name: set() for name in self.categories}
+        if self._pattern is None:
+            return hits
+
+        found = set()
+        search = self._pattern.search
+        match = search(text)
+        while match:
+            longest = match.group()
+            if longest not in found:
+                found.update(self._implied[longest])
+            # Lanjut dari posisi setelah awal match supaya keyword yang tumpang tindih tetap ketemu
+            match = search(text, match.start() + 1)
+
+        for keyword in found:
+            for name in self._keyword_categories[keyword]:
+                hits[name].add(keyword)
+        return hits
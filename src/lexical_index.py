@@ -0,0 +1,167 @@
+import os
+import re
+import sys
+import argparse
+from collections import Counter
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+LEXICAL_SUFFIX = ".bm25.npz"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Token lowercase alfanumerik: 'COVID-19 di Jawa Barat' -> ['covid', '19', 'di', 'jawa', 'barat']"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def lexical_path_for(base_path):
+    """faiss_textcovid19_texts -> faiss_textcovid19_texts.bm25.npz"""
+    return base_path + LEXICAL_SUFFIX
+
+
+def write_lexical_index(texts, base_path, k1=1.5, b=0.75):
+    """Tokenize semua chunk sekali dan simpan inverted index BM25 (.bm25.npz).
+
+    Bobot BM25 tiap posting (idf * tf saturasi * normalisasi panjang) sudah
+    dihitung di sini, jadi saat query cukup menjumlahkan posting term query.
+    """
+    term_docs = {}
+    doc_lengths = np.zeros(len(texts), dtype="int32")
+
+    for doc_id, text in enumerate(texts):
+        counts = Counter(tokenize(text))
+        doc_lengths[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            term_docs.setdefault(term, []).append((doc_id, tf))
+
+    vocab = sorted(term_docs)
+    n_docs = len(texts)
+    avg_length = float(doc_lengths.mean()) if n_docs else 0.0
+
+    indptr = np.zeros(len(vocab) + 1, dtype="int64")
+    for i, term in enumerate(vocab):
+        indptr[i + 1] = indptr[i] + len(term_docs[term])
+
+    doc_ids = np.empty(indptr[-1], dtype="int32")
+    weights = np.empty(indptr[-1], dtype="float32")
+    for i, term in enumerate(vocab):
+        postings = term_docs[term]
+        ids = np.fromiter((doc_id for doc_id, _ in postings), dtype="int32", count=len(postings))
+        tfs = np.fromiter((tf for _, tf in postings), dtype="float32", count=len(postings))
+        df = len(postings)
+        idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = k1 * (1.0 - b + b * doc_lengths[ids] / max(avg_length, 1e-9))
+        doc_ids[indptr[i]:indptr[i + 1]] = ids
+        weights[indptr[i]:indptr[i + 1]] = idf * tfs * (k1 + 1.0) / (tfs + norm)
+
+    path = lexical_path_for(base_path)
+    tmp_path = path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        vocab=np.array(vocab, dtype=str),
+        indptr=indptr,
+        doc_ids=doc_ids,
+        weights=weights,
+        doc_lengths=doc_lengths,
+        params=np.array([k1, b], dtype="float64")
+    )
+    os.replace(tmp_path, path)
+    return len(vocab)
+
+
+def lexical_index_exists(base_path):
+    return os.path.exists(lexical_path_for(base_path))
+
+
+class LexicalIndex:
+    """Inverted index BM25 read-only (format CSR: indptr -> doc_ids + weights)"""
+
+    def __init__(self, base_path):
+        self.path = lexical_path_for(base_path)
+        data = np.load(self.path)
+        self.indptr = data["indptr"]
+        self.doc_ids = data["doc_ids"]
+        self.weights = data["weights"]
+        self.doc_lengths = data["doc_lengths"]
+        self.k1, self.b = (float(v) for v in data["params"])
+        self.vocab = {term: i for i, term in enumerate(data["vocab"].tolist())}
+        self.n_docs = len(self.doc_lengths)
+
+    def __len__(self):
+        return self.n_docs
+
+    def score(self, query):
+        """Skor BM25 query untuk semua chunk (array n_docs); 0 = tidak ada token yang sama"""
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids:
+            return np.zeros(self.n_docs, dtype="float64")
+
+        ids = np.concatenate([self.doc_ids[self.indptr[t]:self.indptr[t + 1]] for t in term_ids])
+        weights = np.concatenate([self.weights[self.indptr[t]:self.indptr[t + 1]] for t in term_ids])
+        return np.bincount(ids, weights=weights, minlength=self.n_docs)
+
+    @staticmethod
+    def top_k(scores, k):
+        """doc_id dengan skor > 0 tertinggi, urut menurun"""
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return np.zeros(0, dtype="int64")
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def search(self, query, k):
+        """Return (scores, doc_ids) top-k BM25"""
+        scores = self.score(query)
+        top = self.top_k(scores, k)
+        return scores[top], top
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "docs": self.n_docs,
+            "terms": len(self.vocab),
+            "postings": int(len(self.doc_ids)),
+            "avg_doc_length": round(float(self.doc_lengths.mean()), 2) if self.n_docs else 0.0,
+            "k1": self.k1,
+            "b": self.b,
+        }
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """RRF: skor(doc) = sum 1 / (k + rank) atas semua ranking (rank mulai 1)"""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            doc_id = int(doc_id)
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def main(argv=None):
+    import src.config as config
+    from src.chunk_store import open_texts, store_base_for
+
+    parser = argparse.ArgumentParser(description="Build inverted index BM25 dari texts JSON / chunk store yang sudah ada")
+    parser.add_argument("--texts-path", default=config.TEXT_PATH)
+    args = parser.parse_args(argv)
+
+    texts = list(open_texts(args.texts_path))
+    base = store_base_for(args.texts_path)
+    n_terms = write_lexical_index(
+        texts, base,
+        k1=config.MODEL_CONFIG.get("bm25_k1", 1.5),
+        b=config.MODEL_CONFIG.get("bm25_b", 0.75)
+    )
+    print(f"✅ BM25 index: {lexical_path_for(base)} ({len(texts)} chunks, {n_terms} terms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+import json
+import time
+import queue
+import asyncio
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from src.batching import Histogram
+from src.telemetry import get_logger
+
+log = get_logger("llm_client")
+
+LLM_MS_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 6000, 8000, 10000, 15000)
+
+CANCEL_POLL_S = 0.05
+
+_DONE = object()
+
+
+class LLMTimeoutError(TimeoutError):
+    """Jawaban LLM tidak selesai sebelum deadline (request sudah dibatalkan)"""
+
+
+class OllamaClient:
+    """Client Ollama async (httpx) dengan koneksi yang dipakai ulang dan deadline keras.
+
+    Semua request jalan di satu event loop background, jadi halaman Streamlit
+    (sinkron) cukup memanggil ``chat`` / ``stream_chat``. Saat deadline lewat,
+    task request dibatalkan: koneksi HTTP ditutup dan Ollama berhenti generate,
+    bukan terus memakai CPU untuk jawaban yang dibuang. ``keep_alive`` dikirim
+    di setiap request supaya model tetap di memori di antara pertanyaan.
+    """
+
+    def __init__(self, host: str = "http://127.0.0.1:11434", timeout: float = 10.0,
+                 keep_alive: str = "30m", max_connections: int = 4, connect_timeout: float = 2.0):
+        self.host = host.rstrip("/")
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.latency_ms = Histogram(LLM_MS_BUCKETS)
+        self.first_token_ms = Histogram(LLM_MS_BUCKETS)
+
+        self._client = None
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "completed": 0, "timeouts": 0, "cancelled": 0, "errors": 0}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="ollama-client", daemon=True)
+        self._thread.start()
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _http(self) -> httpx.AsyncClient:
+        # Dibuat di dalam event loop background (httpx.AsyncClient terikat ke satu loop)
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.host,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout)
+            )
+        return self._client
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _payload(self, model, messages, options, stream):
+        return {
+            "model": model,
+            "messages": messages,
+            "options": options or {},
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+        }
+
+    async def achat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+                    timeout: Optional[float] = None) -> str:
+        """Satu jawaban lengkap; LLMTimeoutError jika melewati deadline"""
+        timeout = timeout or self.timeout
+        self._count("requests")
+        start_time = time.time()
+        try:
+            response = await asyncio.wait_for(
+                self._http().post("/api/chat", json=self._payload(model, messages, options, False)),
+                timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise LLMTimeoutError(f"LLM melebihi {timeout:.1f}s")
+        except asyncio.CancelledError:
+            self._count("cancelled")
+            raise
+        except Exception:
+            self._count("errors")
+            raise
+        if "error" in data:
+            self._count("errors")
+            raise RuntimeError(data["error"])
+
+        self._count("completed")
+        self.latency_ms.observe((time.time() - start_time) * 1000)
+        return data["message"]["content"]
+
+    async def _stream(self, payload: Dict, out: queue.Queue):
+        """Baca NDJSON /api/chat dan teruskan potongan teks ke queue (thread pemanggil)"""
+        start_time = time.time()
+        first = True
+        try:
+            async with self._http().stream("POST", "/api/chat", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise RuntimeError(data["error"])
+                    if first:
+                        self.first_token_ms.observe((time.time() - start_time) * 1000)
+                        first = False
+                    out.put(data.get("message", {}).get("content", ""))
+                    if data.get("done"):
+                        break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            out.put(e)
+            return
+        self.latency_ms.observe((time.time() - start_time) * 1000)
+        out.put(_DONE)
+
+    def chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+             timeout: Optional[float] = None) -> str:
+        """Versi sinkron ``achat`` (deadline ditegakkan di event loop)"""
+        timeout = timeout or self.timeout
+        future = self._submit(self.achat(model, messages, options, timeout))
+        # Cadangan kalau event loop macet; normalnya wait_for di achat yang kena duluan
+        return future.result(timeout + 1.0)
+
+    def stream_chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+                    timeout: Optional[float] = None, cancel_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """Generator potongan teks. LLMTimeoutError begitu deadline lewat, walau token
+        berikutnya belum datang. Menutup generator lebih awal atau men-set
+        ``cancel_event`` (dari thread lain) membatalkan request."""
+        deadline = time.time() + (timeout or self.timeout)
+        # Dengan cancel_event, queue dicek berkala supaya pembatalan tidak menunggu token berikutnya
+        poll = CANCEL_POLL_S if cancel_event is not None else None
+        out = queue.Queue()
+        self._count("requests")
+        future = self._submit(self._stream(self._payload(model, messages, options, True), out))
+        finished = False
+        timed_out = False
+        try:
+            while True:
+                remaining = max(deadline - time.time(), 0)
+                try:
+                    item = out.get(timeout=min(remaining, poll) if poll else remaining)
+                except queue.Empty:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    if time.time() < deadline:
+                        continue
+                    timed_out = True
+                    self._count("timeouts")
+                    raise LLMTimeoutError(f"LLM melebihi {timeout or self.timeout:.1f}s")
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                if item is _DONE:
+                    finished = True
+                    self._count("completed")
+                    return
+                if isinstance(item, Exception):
+                    finished = True
+                    self._count("errors")
+                    raise item
+                yield item
+        finally:
+            if not finished:
+                future.cancel()
+                # Timeout sudah dihitung sebagai 'timeouts'; 'cancelled' hanya untuk pembatalan pemanggil
+                if not timed_out:
+                    self._count("cancelled")
+
+    async def alist_models(self) -> List[str]:
+        """Nama model yang tersedia di Ollama (/api/tags)"""
+        response = await self._http().get("/api/tags", timeout=self.connect_timeout)
+        response.raise_for_status()
+        return [model["name"] for model in response.json().get("models", [])]
+
+    def list_models(self) -> List[str]:
+        """Versi sinkron ``alist_models``; gagal cepat (connect_timeout) jika Ollama mati"""
+        return self._submit(self.alist_models()).result(self.connect_timeout + 1.0)
+
+    async def _preload(self, model: str):
+        try:
+            response = await self._http().post(
+                "/api/generate", json={"model": model, "keep_alive": self.keep_alive}, timeout=None
+            )
+            response.raise_for_status()
+            log.info(f"✅ Model {model} dimuat (keep_alive={self.keep_alive})")
+        except Exception as e:
+            log.warning(f"⚠️ Preload model {model} gagal: {e}")
+
+    def preload(self, model: str):
+        """Muat model ke memori di background (request kosong dengan keep_alive)"""
+        return self._submit(self._preload(model))
+
+    def close(self):
+        if self._client is not None:
+            self._submit(self._client.aclose()).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "host": self.host,
+            "timeout": self.timeout,
+            "keep_alive": self.keep_alive,
+            **counts,
+            "latency_ms": self.latency_ms.snapshot(),
+            "first_token_ms": self.first_token_ms.snapshot(),
+        }
+
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> OllamaClient:
+    """OllamaClient bersama untuk proses ini"""
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                import src.config as config
+                settings = config.OLLAMA
+                _llm_client = OllamaClient(
+                    host=settings["host"],
+                    timeout=settings["timeout"],
+                    keep_alive=settings["keep_alive"],
+                    max_connections=settings["max_connections"],
+                    connect_timeout=settings["connect_timeout"]
+                )
+    return _llm_client
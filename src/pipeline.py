@@ -0,0 +1,221 @@
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterator
+
+from src.batching import Histogram
+from src.telemetry import get_logger, request_context, submit, count
+from src.generation import (
+    precheck_question, get_faq_answer, get_cached_answer, generate_answer_stream, discard_cached_answer
+)
+
+STAGE_MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+STAGES = ("precheck", "cache", "faq", "retrieval", "first_chunk", "generation", "ready")
+
+_DONE = object()
+
+log = get_logger("pipeline")
+
+
+class RequestPipeline:
+    """Executor request chat: tahap-tahap sebelum LLM jalan bersamaan.
+
+    Guard rail dan answer cache (keduanya lookup cache, mikrodetik) dicek
+    dulu di thread pemanggil. Setelah itu FAQ lookup (semantic match butuh
+    embedding) dan retrieval jalan bersamaan di worker thread dan berbagi
+    satu encode query (Retriever menunggu encode yang sedang jalan untuk
+    query yang sama); FAQ yang cocok tetap menang atas jawaban retrieval + LLM.
+
+    Begitu retrieval selesai, jawaban (canned / LLM streaming) langsung
+    dimulai walaupun FAQ belum selesai; jika FAQ ternyata cocok, stream LLM
+    dibatalkan (request Ollama ikut dibatalkan). Tahap yang kalah dibatalkan
+    jika belum mulai; yang sudah jalan dibiarkan selesai dan hasilnya dibuang.
+
+    Stream jawaban ditarik di pool terpisah (stream_executor) supaya stream
+    LLM yang panjang tidak menghabiskan worker FAQ/retrieval. Semua tunggu
+    dibatasi stage_timeout detik.
+    """
+
+    def __init__(self, retriever, model_id, max_workers: int = 16, stream_workers: int = 16,
+                 stage_timeout: float = 30.0):
+        self.retriever = retriever
+        self.model_id = model_id
+        self.stage_timeout = stage_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+        self.stream_executor = ThreadPoolExecutor(max_workers=stream_workers, thread_name_prefix="pipeline-stream")
+        self.stage_ms = {stage: Histogram(STAGE_MS_BUCKETS) for stage in STAGES}
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "rejected": 0, "faq": 0, "cache": 0, "answer": 0,
+                        "speculative": 0, "llm_cancelled": 0, "errors": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _timed(self, timings, stage, fn, *args):
+        """Jalankan fn dan catat durasinya (ms) di timings[stage] + histogram stage"""
+        start_time = time.time()
+        try:
+            return fn(*args)
+        finally:
+            elapsed_ms = (time.time() - start_time) * 1000
+            timings[stage] = round(elapsed_ms, 2)
+            self.stage_ms[stage].observe(elapsed_ms)
+
+    def _pump(self, question, answer_stream, cancel_event, out, timings, start_time, bypass_cache):
+        """Tarik potongan jawaban di worker thread supaya LLM mulai sebelum UI membaca"""
+        try:
+            for piece in answer_stream:
+                if "first_chunk" not in timings:
+                    timings["first_chunk"] = round((time.time() - start_time) * 1000, 2)
+                    self.stage_ms["first_chunk"].observe(timings["first_chunk"])
+                out.put(piece)
+        except Exception as e:
+            out.put(e)
+        finally:
+            elapsed_ms = (time.time() - start_time) * 1000
+            timings["generation"] = round(elapsed_ms, 2)
+            self.stage_ms["generation"].observe(elapsed_ms)
+            if cancel_event.is_set() and not bypass_cache:
+                self._discard(question)
+            out.put(_DONE)
+
+    def _drain(self, out, cancel_event) -> Iterator[str]:
+        while True:
+            try:
+                item = out.get(timeout=self.stage_timeout)
+            except queue.Empty:
+                cancel_event.set()
+                self._count("errors")
+                raise TimeoutError(f"Tidak ada potongan jawaban dalam {self.stage_timeout}s")
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _start_answer(self, question, docs, bypass_cache, timings):
+        cancel_event = threading.Event()
+        out = queue.Queue()
+        answer_stream = generate_answer_stream(
+            question,
+            docs,
+            self.model_id,
+            index_fingerprint=self.retriever.index_fingerprint,
+            bypass_cache=bypass_cache,
+            cancel_event=cancel_event
+        )
+        submit(self.stream_executor, self._pump, question, answer_stream, cancel_event, out, timings, time.time(),
+               bypass_cache)
+        return out, cancel_event
+
+    def _discard(self, question):
+        # Jawaban canned dari stream spekulatif bisa sudah masuk answer cache
+        discard_cached_answer(question, self.retriever.index_fingerprint, self.model_id)
+
+    @staticmethod
+    def _remaining(deadline):
+        return max(0.0, deadline - time.time())
+
+    def _faq_result(self, future, deadline):
+        try:
+            return future.result(timeout=self._remaining(deadline))
+        except Exception as e:
+            log.warning(f"⚠️ FAQ lookup error: {e}")
+            return None
+
+    def _finish(self, result, kind, timings, start_time, cancel=()):
+        for future in cancel:
+            future.cancel()
+        elapsed_ms = (time.time() - start_time) * 1000
+        timings["ready"] = round(elapsed_ms, 2)
+        self.stage_ms["ready"].observe(elapsed_ms)
+        self._count(kind)
+        count("chatbot_requests_total", {"kind": kind}, help_text="Request chat per hasil")
+        log.debug(f"🧭 Pipeline: {kind} in {elapsed_ms:.1f}ms {timings}")
+        return {**result, "kind": kind, "timings": timings}
+
+    def run(self, question: str, bypass_cache: bool = False, request_id: str = None) -> Dict:
+        """Proses satu pertanyaan.
+
+        Return dict: 'stream' (iterator potongan jawaban), 'kind'
+        ('rejected' / 'faq' / 'cache' / 'answer'), 'docs', 'faq_match',
+        'request_id' dan 'timings' (ms per tahap; 'ready' = sampai stream
+        siap dikembalikan). Semua span/log request ini membawa request_id.
+        """
+        with request_context(request_id) as request_id:
+            result = self._run(question, bypass_cache)
+        return {**result, "request_id": request_id}
+
+    def _run(self, question, bypass_cache):
+        self._count("requests")
+        start_time = time.time()
+        timings = {}
+
+        # Guard rail dan answer cache: lookup cache mikrodetik, jadi dicek dulu
+        # supaya pertanyaan yang ditolak / sudah terjawab tidak menyentuh embedder
+        is_valid_input, input_message = self._timed(timings, "precheck", precheck_question, question)
+        if not is_valid_input:
+            log.debug(f"🛡️ Rejected before retrieval")
+            return self._finish({"stream": iter([input_message]), "docs": [], "faq_match": None},
+                                "rejected", timings, start_time)
+
+        if not bypass_cache:
+            cached = self._timed(timings, "cache", get_cached_answer,
+                                 question, self.retriever.index_fingerprint, self.model_id)
+            if cached is not None:
+                return self._finish({"stream": iter([cached["answer"]]), "docs": cached["docs"], "faq_match": None},
+                                    "cache", timings, start_time)
+
+        faq_future = submit(
+            self.executor, self._timed, timings, "faq", get_faq_answer, question, self.retriever
+        )
+        retrieval_future = submit(
+            self.executor, self._timed, timings, "retrieval", self.retriever.search, question
+        )
+
+        deadline = time.time() + self.stage_timeout
+        done, _ = wait((faq_future, retrieval_future), timeout=self.stage_timeout, return_when=FIRST_COMPLETED)
+        started = None
+        if faq_future not in done:
+            # Retrieval menang: mulai jawaban sekarang, FAQ masih bisa membatalkannya
+            try:
+                docs = retrieval_future.result(timeout=self._remaining(deadline))
+            except Exception:
+                faq_match = self._faq_result(faq_future, deadline)
+                if faq_match is not None:
+                    return self._finish({"stream": iter([faq_match["answer"]]), "docs": [], "faq_match": faq_match},
+                                        "faq", timings, start_time)
+                self._count("errors")
+                raise
+            started = self._start_answer(question, docs, bypass_cache, timings)
+            self._count("speculative")
+
+        faq_match = self._faq_result(faq_future, deadline)
+        if faq_match is not None:
+            if started is not None:
+                started[1].set()
+                if not bypass_cache:
+                    self._discard(question)
+                self._count("llm_cancelled")
+            return self._finish({"stream": iter([faq_match["answer"]]), "docs": [], "faq_match": faq_match},
+                                "faq", timings, start_time, cancel=(retrieval_future,))
+
+        try:
+            docs = retrieval_future.result(timeout=self._remaining(deadline))
+        except Exception:
+            self._count("errors")
+            raise
+        out, cancel_event = started or self._start_answer(question, docs, bypass_cache, timings)
+        return self._finish({"stream": self._drain(out, cancel_event), "docs": docs, "faq_match": None},
+                            "answer", timings, start_time)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            **counts,
+            "stage_ms": {stage: histogram.snapshot() for stage, histogram in self.stage_ms.items()},
+        }
@@ -0,0 +1,460 @@
+import os
+import re
+import datetime
+import threading
+from typing import Dict, List, Optional
+
+from src.keyword_matcher import KeywordMatcher
+from src.telemetry import get_logger
+from src.timeseries import TimeSeriesStore, METRICS, format_value, from_day
+from src.rollups import Rollups, rollup_path_for, ROLLUP_METRICS, CUMULATIVE_METRICS, FLOW_OF
+
+log = get_logger("query_router")
+
+# Singkatan / nama populer -> nama provinsi di data
+PROVINCE_ALIASES = {
+    "jakarta": "DKI Jakarta",
+    "jabar": "Jawa Barat",
+    "jateng": "Jawa Tengah",
+    "jatim": "Jawa Timur",
+    "jogja": "Daerah Istimewa Yogyakarta",
+    "yogyakarta": "Daerah Istimewa Yogyakarta",
+    "diy": "Daerah Istimewa Yogyakarta",
+    "babel": "Kepulauan Bangka Belitung",
+    "bangka belitung": "Kepulauan Bangka Belitung",
+    "kepri": "Kepulauan Riau",
+    "ntb": "Nusa Tenggara Barat",
+    "ntt": "Nusa Tenggara Timur",
+    "sumut": "Sumatera Utara",
+    "sumbar": "Sumatera Barat",
+    "sumsel": "Sumatera Selatan",
+    "kalbar": "Kalimantan Barat",
+    "kalteng": "Kalimantan Tengah",
+    "kalsel": "Kalimantan Selatan",
+    "kaltim": "Kalimantan Timur",
+    "kaltara": "Kalimantan Utara",
+    "sulut": "Sulawesi Utara",
+    "sulteng": "Sulawesi Tengah",
+    "sulsel": "Sulawesi Selatan",
+    "sultra": "Sulawesi Tenggara",
+    "sulbar": "Sulawesi Barat",
+}
+
+# Frasa -> metric; frasa terpanjang yang muncul di pertanyaan yang dipakai
+METRIC_PHRASES = {
+    "kasus baru": "kasus_baru",
+    "kasus": "kasus_baru",
+    "positif": "kasus_baru",
+    "kematian baru": "kematian_baru",
+    "kematian": "kematian_baru",
+    "meninggal": "kematian_baru",
+    "sembuh baru": "sembuh_baru",
+    "sembuh": "sembuh_baru",
+    "pulih": "sembuh_baru",
+    "total kasus": "total_kasus",
+    "kasus kumulatif": "total_kasus",
+    "total kematian": "total_kematian",
+    "total meninggal": "total_kematian",
+    "total sembuh": "total_sembuh",
+    "rasio kematian": "rasio_kematian",
+    "tingkat kematian": "rasio_kematian",
+    "cfr": "rasio_kematian",
+    "rasio kesembuhan": "rasio_kesembuhan",
+    "tingkat kesembuhan": "rasio_kesembuhan",
+    "penduduk": "jumlah_penduduk",
+    "populasi": "jumlah_penduduk",
+}
+
+# Nama bulan lengkap + singkatan baku (Indonesia / Inggris); kata lain ('mari') bukan bulan
+MONTHS = {
+    "januari": 1, "january": 1, "jan": 1,
+    "februari": 2, "pebruari": 2, "february": 2, "feb": 2, "peb": 2,
+    "maret": 3, "march": 3, "mar": 3,
+    "april": 4, "apr": 4,
+    "mei": 5, "may": 5,
+    "juni": 6, "june": 6, "jun": 6,
+    "juli": 7, "july": 7, "jul": 7,
+    "agustus": 8, "august": 8, "agu": 8, "agt": 8, "agus": 8, "aug": 8,
+    "september": 9, "sept": 9, "sep": 9,
+    "oktober": 10, "october": 10, "okt": 10, "oct": 10,
+    "november": 11, "nopember": 11, "nov": 11, "nop": 11,
+    "desember": 12, "december": 12, "des": 12, "dec": 12,
+}
+
+MONTH_NAMES = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
+
+LATEST_TERMS = ("terbaru", "terakhir", "terkini")
+NATIONAL_TERMS = ("indonesia", "nasional", "seluruh provinsi", "semua provinsi")
+WEEK_TERMS = ("minggu", "pekan")
+TOTAL_TERMS = ("total", "jumlah", "keseluruhan")
+
+# Kata ranking -> urutan naik (True) atau turun (False)
+RANKING_TERMS = {
+    "tertinggi": False, "terbanyak": False, "teratas": False, "terbesar": False, "paling banyak": False,
+    "terendah": True, "tersedikit": True, "terkecil": True, "paling sedikit": True,
+}
+DEFAULT_TOP_N = 5
+
+ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+NUMERIC_DATE = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b")
+TEXT_DATE = re.compile(r"\b(\d{1,2})\s+([a-z]+)\.?\s+(\d{4})\b")
+ISO_MONTH = re.compile(r"\b(\d{4})-(\d{1,2})\b")
+TEXT_MONTH = re.compile(r"\b([a-z]+)\.?\s+(\d{4})\b")
+YEAR = re.compile(r"\b(20[12]\d)\b")
+TOP_N = re.compile(r"\b(\d{1,2})\s+provinsi\b")
+
+
+def parse_date(text):
+    """Tanggal pertama di teks: 2021-07-15, 15/07/2021 (hari dulu), atau 15 Juli 2021.
+
+    None jika tidak ada tanggal; ValueError jika tanggalnya tidak valid
+    (31/02/2021), supaya pertanyaannya tidak dijawab sebagai total bulan/tahun.
+    """
+    text = text.lower()
+    match = ISO_DATE.search(text)
+    if match:
+        year, month, day = match.groups()
+        return datetime.date(int(year), int(month), int(day))
+    match = NUMERIC_DATE.search(text)
+    if match:
+        day, month, year = match.groups()
+        return datetime.date(int(year), int(month), int(day))
+    for match in TEXT_DATE.finditer(text):
+        day, month, year = match.groups()
+        if month in MONTHS:
+            return datetime.date(int(year), MONTHS[month], int(day))
+    return None
+
+
+def parse_month(text):
+    """(tahun, bulan) pertama di teks: 'Juli 2021' atau '2021-07'; None jika tidak ada.
+
+    ValueError untuk bulan di luar 1-12 ('2021-13').
+    """
+    text = text.lower()
+    match = ISO_MONTH.search(text)
+    if match:
+        if not 1 <= int(match.group(2)) <= 12:
+            raise ValueError(f"bulan tidak valid: {match.group()}")
+        return int(match.group(1)), int(match.group(2))
+    for match in TEXT_MONTH.finditer(text):
+        month, year = match.groups()
+        if month in MONTHS:
+            return int(year), MONTHS[month]
+    return None
+
+
+def parse_year(text):
+    match = YEAR.search(text)
+    return int(match.group(1)) if match else None
+
+
+class QueryRouter:
+    """Router pertanyaan time-series (provinsi + tanggal + metric) ke lookup langsung.
+
+    Pertanyaan yang tidak dikenali diteruskan ke retriever (Retriever lokal atau
+    RetrieverClient). Atribut lain (index_fingerprint, texts, match_faq, ...)
+    didelegasikan ke retriever, jadi router bisa dipakai di tempat retriever.
+    """
+
+    def __init__(self, retriever, store: TimeSeriesStore, rollups: Optional[Rollups] = None):
+        self.retriever = retriever
+        self.store = store
+        self.rollups = rollups
+
+        self.province_names = {name.lower(): name for name in store.provinces}
+        for alias, name in PROVINCE_ALIASES.items():
+            if name.lower() in store.province_ids:
+                self.province_names.setdefault(alias, name)
+
+        # Nama provinsi dicocokkan sebagai kata utuh ('bali' bukan bagian dari 'kembali')
+        self.province_matcher = KeywordMatcher({"province": list(self.province_names)}, whole_words=True)
+        self.matcher = KeywordMatcher({
+            "metric": list(METRIC_PHRASES),
+            "latest": list(LATEST_TERMS),
+            "national": list(NATIONAL_TERMS),
+            "week": list(WEEK_TERMS),
+            "total": list(TOTAL_TERMS),
+            "ranking": list(RANKING_TERMS),
+        })
+
+        self._lock = threading.Lock()
+        self._stats = {"routed": 0, "fallback": 0}
+
+    def __getattr__(self, name):
+        # Hanya dipanggil untuk atribut yang tidak ada di router
+        if name == "retriever":
+            raise AttributeError(name)
+        return getattr(self.retriever, name)
+
+    def parse(self, question: str) -> Optional[Dict]:
+        """Jenis pertanyaan time-series + parameternya, atau None jika harus ke retriever.
+
+        kind: 'daily' / 'latest' (store harian), 'week' / 'month' / 'year' /
+        'overall' / 'ranking' (rollup, jika tersedia). province None = nasional.
+        Ranking mengikuti periode di pertanyaan (tanggal, bulan, tahun, atau
+        seluruh data). Tanggal/bulan yang tidak valid -> None (ke retriever).
+        """
+        question_lower = question.lower()
+        hits = self.matcher.scan(question_lower)
+        hits.update(self.province_matcher.scan(question_lower))
+
+        # Keyword terpanjang menang ('papua barat' vs 'papua', 'total kasus' vs 'kasus')
+        province = self.province_names[max(hits["province"], key=len)] if hits["province"] else None
+        metric = METRIC_PHRASES[max(hits["metric"], key=len)] if hits["metric"] else None
+        try:
+            date = parse_date(question_lower)
+            month = parse_month(question_lower) if date is None else None
+        except ValueError:
+            return None
+        year = parse_year(question_lower) if date is None and month is None else None
+        parsed = {"province": province, "metric": metric, "date": date, "month": month, "year": year}
+
+        if self.rollups is not None and hits["ranking"] and (province is None or "provinsi" in question_lower):
+            metric = metric or "kasus_baru"
+            if date is not None:
+                # Ranking harian langsung dari store; ranking mingguan tidak ada di rollup
+                if hits["week"] or metric not in self.store.metrics:
+                    return None
+            else:
+                if metric not in ROLLUP_METRICS:
+                    return None
+                if month is not None or year is not None:
+                    # Ranking per bulan/tahun = jumlah harian selama periode itu
+                    metric = FLOW_OF.get(metric, metric)
+            top_n = TOP_N.search(question_lower)
+            parsed.update(
+                kind="ranking",
+                province=None,
+                metric=metric,
+                ascending=RANKING_TERMS[max(hits["ranking"], key=len)],
+                n=int(top_n.group(1)) if top_n else DEFAULT_TOP_N,
+            )
+            return parsed
+
+        if province is None and not (self.rollups is not None and hits["national"]):
+            return None
+
+        if date is not None:
+            if self.rollups is not None and hits["week"]:
+                parsed["kind"] = "week"
+            elif province is not None:
+                parsed["kind"] = "daily"
+            else:
+                return None
+        elif hits["latest"] and province is not None:
+            parsed["kind"] = "latest"
+        elif self.rollups is None:
+            return None
+        elif month is not None:
+            parsed["kind"] = "month"
+        elif year is not None:
+            parsed["kind"] = "year"
+        elif metric in CUMULATIVE_METRICS or (metric is not None and hits["total"]):
+            parsed["kind"] = "overall"
+        else:
+            return None
+
+        if parsed["kind"] in ("week", "month", "year", "overall"):
+            metric = metric or "kasus_baru"
+            if parsed["kind"] != "overall":
+                # "total kematian bulan Juli" = jumlah kematian harian selama Juli
+                metric = FLOW_OF.get(metric, metric)
+            if metric not in ROLLUP_METRICS:
+                return None
+            parsed["metric"] = metric
+        return parsed
+
+    def _doc(self, text, doc_id):
+        return {
+            "text": text,
+            "score": 1.0,
+            "original_score": 1.0,
+            "rank": 1,
+            "doc_id": doc_id,
+            "source": "timeseries",
+        }
+
+    def answer(self, parsed: Dict) -> List[Dict]:
+        """Lookup langsung di store / rollup; return list doc dict (format sama dengan Retriever.search)"""
+        if parsed["kind"] in ("daily", "latest"):
+            return self._answer_daily(parsed)
+        return self._answer_rollup(parsed)
+
+    def _answer_daily(self, parsed: Dict) -> List[Dict]:
+        store = self.store
+        province_id = store.province_id(parsed["province"])
+        province = parsed["province"]
+        metric = parsed["metric"]
+
+        row = store.latest_row(province_id) if parsed["kind"] == "latest" else store.row(province_id, parsed["date"])
+        if row is None:
+            first, last = store.date_range(province_id)
+            date = parsed["date"].isoformat() if parsed["date"] else "-"
+            available = f" (data tersedia {first.isoformat()} s.d. {last.isoformat()})" if first else ""
+            text = f"Data COVID-19 untuk {province} pada {date} tidak tersedia{available}."
+            return [self._doc(text, f"timeseries:{province}:{date}")]
+
+        date_text = from_day(store.days[row]).isoformat()
+        if metric is None:
+            text = store.describe_row(row, province_id)
+        else:
+            label = METRICS[metric][1]
+            value = format_value(metric, store.value(row, metric))
+            text = f"Pada {date_text}, di {province}, {label} tercatat {value}."
+        return [self._doc(text, f"timeseries:{province}:{date_text}")]
+
+    def _daily_ranking(self, metric, date, n, ascending):
+        """Ranking provinsi pada satu tanggal dari store harian: list (province_id, nilai)"""
+        values = []
+        for province_id in range(len(self.store.provinces)):
+            row = self.store.row(province_id, date)
+            if row is not None:
+                values.append((province_id, self.store.value(row, metric)))
+        values.sort(key=lambda item: item[1], reverse=not ascending)
+        return values[:n]
+
+    def _answer_rollup(self, parsed: Dict) -> List[Dict]:
+        rollups = self.rollups
+        kind = parsed["kind"]
+        metric = parsed["metric"]
+        label = METRICS[metric][1]
+        province = parsed["province"]
+        province_id = self.store.province_id(province) if province else None
+        scope = province or "Indonesia"
+
+        if kind == "ranking":
+            order = "terendah" if parsed["ascending"] else "tertinggi"
+            if parsed["date"]:
+                date = parsed["date"]
+                period = f" pada {date.isoformat()}"
+                ranking = self._daily_ranking(metric, date, parsed["n"], parsed["ascending"])
+                doc_id = f"timeseries:ranking:{metric}:{date.isoformat()}"
+            elif parsed["month"]:
+                year, month = parsed["month"]
+                period = f" pada {MONTH_NAMES[month - 1]} {year}"
+                ranking = rollups.top(metric, parsed["n"], year, month, ascending=parsed["ascending"])
+                doc_id = f"rollup:ranking:{metric}:{year}-{month:02d}"
+            elif parsed["year"]:
+                year = parsed["year"]
+                period = f" pada tahun {year}"
+                ranking = rollups.top(metric, parsed["n"], year, ascending=parsed["ascending"])
+                doc_id = f"rollup:ranking:{metric}:{year}"
+            else:
+                period = ""
+                ranking = rollups.top(metric, parsed["n"], ascending=parsed["ascending"])
+                doc_id = f"rollup:ranking:{metric}"
+            if not ranking:
+                return [self._doc(f"Data ranking {label}{period} tidak tersedia.", doc_id)]
+            items = ", ".join(
+                f"{i}. {self.store.provinces[p]} ({format_value(metric, value)})"
+                for i, (p, value) in enumerate(ranking, 1)
+            )
+            return [self._doc(f"{len(ranking)} provinsi dengan {label} {order}{period}: {items}.", doc_id)]
+
+        if kind == "month":
+            year, month = parsed["month"]
+            value = rollups.month_total(province_id, metric, year, month)
+            period = f"{MONTH_NAMES[month - 1]} {year}"
+            text = f"Selama {period}, jumlah {label} di {scope} tercatat {{value}}."
+            doc_id = f"rollup:month:{scope}:{year}-{month:02d}"
+        elif kind == "year":
+            value = rollups.year_total(province_id, metric, parsed["year"])
+            period = f"tahun {parsed['year']}"
+            text = f"Selama {period}, jumlah {label} di {scope} tercatat {{value}}."
+            doc_id = f"rollup:year:{scope}:{parsed['year']}"
+        elif kind == "week":
+            start, value = rollups.week_total(province_id, metric, parsed["date"])
+            end = start + datetime.timedelta(days=6)
+            period = f"minggu {start.isoformat()} s.d. {end.isoformat()}"
+            text = f"Pada {period}, jumlah {label} di {scope} tercatat {{value}}."
+            doc_id = f"rollup:week:{scope}:{start.isoformat()}"
+        else:
+            value = rollups.overall(province_id, metric)
+            first, last = self.store.date_range()
+            period = f"{first.isoformat()} s.d. {last.isoformat()}"
+            if metric in CUMULATIVE_METRICS:
+                text = f"Hingga {last.isoformat()}, {label} di {scope} mencapai {{value}}."
+            else:
+                text = f"Sepanjang {period}, jumlah {label} di {scope} tercatat {{value}}."
+            doc_id = f"rollup:overall:{scope}:{metric}"
+
+        if value is None:
+            return [self._doc(f"Data {label} di {scope} untuk {period} tidak tersedia.", doc_id)]
+        return [self._doc(text.format(value=format_value(metric, value)), doc_id)]
+
+    def route(self, question: str) -> Optional[List[Dict]]:
+        """Doc hasil lookup time-series, atau None jika harus ke retriever"""
+        parsed = self.parse(question)
+        if parsed is None:
+            return None
+        docs = self.answer(parsed)
+        with self._lock:
+            self._stats["routed"] += 1
+        log.debug(f"📈 Time-series route ({parsed['kind']}): {parsed['province'] or 'Indonesia'}, {parsed['metric'] or 'semua metric'}")
+        return docs
+
+    def search(self, query, top_k=None):
+        docs = self.route(query)
+        if docs is not None:
+            return docs
+        with self._lock:
+            self._stats["fallback"] += 1
+        return self.retriever.search(query, top_k)
+
+    def search_with_debug(self, query, top_k=None):
+        docs = self.route(query)
+        if docs is not None:
+            return docs, {"query": query, "route": "timeseries", "found_documents": len(docs)}
+        return self.retriever.search_with_debug(query, top_k)
+
+    def search_batch(self, queries, top_k=None):
+        queries = list(queries)
+        results = [self.route(query) for query in queries]
+        pending = [i for i, docs in enumerate(results) if docs is None]
+        if pending:
+            fallback = self.retriever.search_batch([queries[i] for i in pending], top_k)
+            for i, docs in zip(pending, fallback):
+                results[i] = docs
+        return results
+
+    def smart_search(self, query):
+        return self.search(query)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(self.store.stats())
+        stats["rollups"] = self.rollups.stats() if self.rollups is not None else None
+        return stats
+
+    def get_index_stats(self):
+        stats = self.retriever.get_index_stats()
+        if isinstance(stats, dict):
+            stats = {**stats, "query_router": self.stats()}
+        return stats
+
+
+def with_query_router(retriever):
+    """Bungkus retriever dengan QueryRouter jika store time-series tersedia"""
+    from src import config
+
+    store_path = config.TIMESERIES_STORE_PATH
+    if not config.MODEL_CONFIG.get("timeseries_routing") or not os.path.exists(store_path):
+        return retriever
+
+    try:
+        store = TimeSeriesStore(store_path)
+        log.info(f"✅ Time-series store loaded: {len(store)} rows, {len(store.provinces)} provinces")
+        rollups = None
+        if os.path.exists(rollup_path_for(store_path)):
+            rollups = Rollups(rollup_path_for(store_path))
+        else:
+            log.warning("⚠️ Rollup time-series tidak ditemukan, jalankan: python -m src.timeseries")
+        return QueryRouter(retriever, store, rollups)
+    except Exception as e:
+        log.warning(f"⚠️ Gagal load time-series store, pakai retriever saja: {e}")
+        return retriever
@@ -0,0 +1,154 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+
+from src.cache import LRUCache, normalize_text
+from src.batching import Histogram
+from src.telemetry import get_logger, count
+
+RERANK_MS_BUCKETS = (5, 10, 25, 50, 100, 200, 300, 500, 1000, 2000)
+
+log = get_logger("reranker")
+
+
+class Reranker:
+    """Cross-encoder reranker (CPU) dengan batas waktu keras per request.
+
+    Kandidat di-skor dengan ``CrossEncoder.predict`` di satu worker thread.
+    Request yang datang saat batch sedang jalan menunggu di antrean (maks
+    ``max_pending`` request) dan di-skor bersama dalam satu batch berikutnya;
+    antrean penuh -> 'busy'. Jika hasil belum selesai dalam ``budget_ms``,
+    request memakai urutan dense apa adanya. Skor yang selesai terlambat tetap
+    masuk cache, jadi query yang sama berikutnya tidak perlu model lagi. Skor
+    di-cache per (query ternormalisasi, doc_id).
+    """
+
+    def __init__(self, model_name: str, budget_ms: float = 300, cache_size: int = 4096,
+                 max_length: int = 256, device: str = "cpu", max_pending: int = 8):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.max_length = max_length
+        self.device = device
+        self.max_pending = max_pending
+        self.model = None
+        self.cache = LRUCache(cache_size)
+        self.latency_ms = Histogram(RERANK_MS_BUCKETS)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+        self._pending = []  # (query_key, query, items, future) menunggu batch berikutnya
+        self._draining = False
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "reranked": 0, "cached": 0, "timeouts": 0, "busy": 0, "errors": 0}
+
+    def load(self):
+        from sentence_transformers import CrossEncoder
+        self.model = CrossEncoder(self.model_name, max_length=self.max_length, device=self.device)
+        return self
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _outcome(self, status):
+        count("chatbot_rerank_total", {"status": status}, help_text="Request rerank per hasil")
+
+    def _score(self, jobs: List[Tuple]):
+        """Satu forward pass untuk semua pasangan (query, teks) dari semua job; hasil langsung masuk cache"""
+        start_time = time.time()
+        pairs = [(query, text) for _, query, items, _ in jobs for _, text in items]
+        try:
+            scores = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        except Exception as e:
+            for *_, future in jobs:
+                future.set_exception(e)
+            return
+        scores = [float(score) for score in scores]
+        offset = 0
+        for query_key, _, items, future in jobs:
+            job_scores = scores[offset:offset + len(items)]
+            offset += len(items)
+            for (doc_id, _), score in zip(items, job_scores):
+                self.cache.put((query_key, doc_id), score)
+            future.set_result(job_scores)
+        self.latency_ms.observe((time.time() - start_time) * 1000)
+
+    def _drain(self):
+        """Worker: skor semua job yang antre sebagai satu batch, ulangi sampai antrean kosong"""
+        while True:
+            with self._lock:
+                jobs, self._pending = self._pending, []
+                if not jobs:
+                    self._draining = False
+                    return
+            self._score(jobs)
+
+    def rerank(self, query: str, docs: List[Dict], keep: Optional[int] = None) -> Tuple[List[Dict], Dict]:
+        """Urutkan ulang docs berdasarkan skor cross-encoder.
+
+        Return (docs, info). info['status']: 'ok', 'cached', atau fallback
+        'timeout' / 'busy' / 'error' (docs tetap urutan dense). Setiap hasil
+        dihitung di metric chatbot_rerank_total{status}.
+        """
+        self._count("requests")
+        if not docs or self.model is None:
+            self._outcome("skipped")
+            return docs[:keep], {"status": "skipped"}
+
+        start_time = time.time()
+        query_key = normalize_text(query)
+        scores = {doc["doc_id"]: self.cache.get((query_key, doc["doc_id"])) for doc in docs}
+        missing = [doc for doc in docs if scores[doc["doc_id"]] is None]
+        status = "cached"
+
+        if missing:
+            future = Future()
+            with self._lock:
+                # Antrean penuh: menunggu di belakangnya pasti melewati budget
+                if len(self._pending) >= self.max_pending:
+                    self._counts["busy"] += 1
+                    self._outcome("busy")
+                    return docs[:keep], {"status": "busy"}
+                self._pending.append((query_key, query, [(doc["doc_id"], doc["text"]) for doc in missing], future))
+                if not self._draining:
+                    self._draining = True
+                    self._executor.submit(self._drain)
+
+            try:
+                new_scores = future.result(timeout=self.budget_ms / 1000.0)
+            except FutureTimeoutError:
+                self._count("timeouts")
+                self._outcome("timeout")
+                log.warning(f"⏱️ Rerank melebihi budget {self.budget_ms}ms, pakai urutan dense")
+                return docs[:keep], {"status": "timeout", "budget_ms": self.budget_ms}
+            except Exception as e:
+                self._count("errors")
+                self._outcome("error")
+                log.warning(f"⚠️ Rerank error: {e}")
+                return docs[:keep], {"status": "error", "error": str(e)}
+
+            for doc, score in zip(missing, new_scores):
+                scores[doc["doc_id"]] = score
+            status = "ok"
+
+        self._count("reranked" if status == "ok" else "cached")
+        self._outcome(status)
+        ranked = sorted(docs, key=lambda doc: scores[doc["doc_id"]], reverse=True)
+        results = [
+            {**doc, "rerank_score": scores[doc["doc_id"]], "dense_rank": doc.get("rank"), "rank": i}
+            for i, doc in enumerate(ranked, 1)
+        ]
+        elapsed_ms = (time.time() - start_time) * 1000
+        return results[:keep], {"status": status, "ms": round(elapsed_ms, 2), "scored": len(missing)}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "model": self.model_name,
+            "budget_ms": self.budget_ms,
+            **counts,
+            "busy_rate": round(counts["busy"] / counts["requests"], 4) if counts["requests"] else 0.0,
+            "cache": self.cache.stats(),
+            "latency_ms": self.latency_ms.snapshot(),
+        }
@@ -0,0 +1,366 @@
+import os
+import sys
+import json
+import argparse
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import src.config as config
+from src.cache import LRUCache
+from src.telemetry import REQUEST_ID, REQUEST_ID_UNSET, get_logger, request_context, render_metrics
+
+log = get_logger("retrieval_service")
+
+MAX_TEXTS_PER_REQUEST = config.RETRIEVAL_SERVICE.get("max_texts_per_request", 256)
+
+# Error koneksi keep-alive basi (server menutup koneksi idle): aman untuk dikirim ulang sekali
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError)
+
+
+def _to_jsonable(value):
+    """Konversi tipe numpy (float32, int64, ndarray) ke tipe JSON biasa"""
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+
+class RetrievalRequestHandler(BaseHTTPRequestHandler):
+    """Endpoint JSON untuk satu Retriever bersama"""
+
+    server_version = "CovidRetrieval/1.0"
+    # HTTP/1.1: koneksi keep-alive dipakai ulang oleh RetrieverClient (setiap respons wajib Content-Length)
+    protocol_version = "HTTP/1.1"
+    # Thread per koneksi idle tidak ditahan selamanya
+    timeout = config.RETRIEVAL_SERVICE.get("keep_alive_timeout", 60)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(_to_jsonable(payload), ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def _send_text(self, text, content_type="text/plain; version=0.0.4; charset=utf-8"):
+        body = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        retriever = self.server.retriever
+        url = urlparse(self.path)
+
+        if url.path == "/health":
+            self._send_json({"status": "ok"})
+        elif url.path == "/stats":
+            self._send_json(retriever.get_index_stats())
+        elif url.path == "/texts":
+            params = parse_qs(url.query)
+            try:
+                start = int(params.get("start", [0])[0])
+                end = int(params.get("end", [start + 1])[0])
+            except ValueError:
+                self._send_json({"error": "start/end harus integer"}, status=400)
+                return
+            if start < 0 or end < start:
+                self._send_json({"error": "Range tidak valid: butuh 0 <= start <= end"}, status=400)
+                return
+            # Batasi ukuran respons; client meminta range besar per halaman
+            end = min(end, start + MAX_TEXTS_PER_REQUEST)
+            self._send_json({"texts": retriever.texts[start:end]})
+        elif url.path == "/metrics":
+            self._send_text(render_metrics())
+        else:
+            self._send_json({"error": f"Unknown path {url.path}"}, status=404)
+
+    def do_POST(self):
+        retriever = self.server.retriever
+        try:
+            payload = self._read_json()
+        except ValueError as e:
+            # Body bisa belum terbaca (Content-Length rusak): jangan pakai ulang koneksi ini
+            self.close_connection = True
+            self._send_json({"error": f"Invalid JSON: {e}"}, status=400)
+            return
+
+        # Request ID dari client (X-Request-ID) supaya span service bisa dicocokkan dengan log aplikasi
+        with request_context(self.headers.get("X-Request-ID")):
+            self._dispatch(retriever, payload)
+
+    def _dispatch(self, retriever, payload):
+        try:
+            # index_fingerprint ikut di setiap hasil search supaya client tahu jika index di service berganti
+            fingerprint = retriever.index_fingerprint
+            if self.path == "/search":
+                results = retriever.search(payload["query"], payload.get("top_k"))
+                # Embedding query ikut dikirim (cache hit setelah search) untuk context builder di client
+                query_vector = retriever.encode_queries([payload["query"]])[0]
+                self._send_json({"results": results, "query_vector": query_vector, "index_fingerprint": fingerprint})
+            elif self.path == "/search_with_debug":
+                results, debug_info = retriever.search_with_debug(payload["query"], payload.get("top_k"))
+                self._send_json({"results": results, "debug_info": debug_info, "index_fingerprint": fingerprint})
+            elif self.path == "/search_batch":
+                results = retriever.search_batch(payload["queries"], payload.get("top_k"))
+                self._send_json({"results": results, "index_fingerprint": fingerprint})
+            elif self.path == "/match_faq":
+                match = retriever.match_faq(payload["query"], payload.get("threshold"))
+                self._send_json({"match": match})
+            elif self.path == "/embed":
+                vectors = retriever.encode_texts(payload["texts"])
+                self._send_json({"vectors": vectors})
+            elif self.path == "/encode_queries":
+                vectors = retriever.encode_queries(payload["queries"])
+                self._send_json({"vectors": vectors})
+            else:
+                self._send_json({"error": f"Unknown path {self.path}"}, status=404)
+        except KeyError as e:
+            self._send_json({"error": f"Missing field {e}"}, status=400)
+        except Exception as e:
+            log.error(f"❌ Retrieval service error: {e}")
+            self._send_json({"error": str(e)}, status=500)
+
+
+class RetrievalServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, retriever):
+        super().__init__(address, RetrievalRequestHandler)
+        self.retriever = retriever
+
+
+def serve(host=None, port=None, retriever=None):
+    """Jalankan retrieval service (blocking)"""
+    service = config.RETRIEVAL_SERVICE
+    host = host or service["host"]
+    port = port or service["port"]
+
+    if retriever is None:
+        from src.retriever import Retriever
+        retriever = Retriever()
+
+    server = RetrievalServer((host, port), retriever)
+    log.info(f"🚀 Retrieval service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("🛑 Retrieval service stopped")
+    finally:
+        server.server_close()
+
+
+class RemoteTexts:
+    """Akses texts[idx] / texts[a:b] / len(texts) lewat retrieval service"""
+
+    def __init__(self, client, total):
+        self._client = client
+        self._total = total
+
+    def __len__(self):
+        return self._total
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, end, step = idx.indices(self._total)
+            texts = []
+            # Service membatasi jumlah chunk per respons: ambil per halaman
+            while start < end:
+                page = self._client._request("GET", f"/texts?start={start}&end={end}")["texts"]
+                if not page:
+                    break
+                texts.extend(page)
+                start += len(page)
+            return texts[::step]
+        idx = int(idx)
+        if idx < 0:
+            idx += self._total
+        if not 0 <= idx < self._total:
+            raise IndexError("chunk index out of range")
+        return self._client._request("GET", f"/texts?start={idx}&end={idx + 1}")["texts"][0]
+
+
+class RetrieverClient:
+    """Client tipis dengan interface yang sama seperti Retriever"""
+
+    def __init__(self, host=None, port=None, timeout=None):
+        service = config.RETRIEVAL_SERVICE
+        self.host = host or service["host"]
+        self.port = port or service["port"]
+        self.timeout = timeout or service.get("timeout", 30)
+        self._local = threading.local()
+        # Embedding query dari respons /search, dipakai ulang oleh encode_queries
+        self._query_vectors = LRUCache(256)
+
+        self.index_fingerprint = None
+        self.texts = RemoteTexts(self, 0)
+        self.get_index_stats()
+
+    def _observe_fingerprint(self, fingerprint):
+        """Service restart dengan index baru: perbarui fingerprint (cache jawaban) dan jumlah texts"""
+        if fingerprint is None or fingerprint == self.index_fingerprint:
+            return
+        if self.index_fingerprint is not None:
+            log.warning(f"⚠️ Index retrieval service berganti ({self.index_fingerprint} -> {fingerprint})")
+            self._query_vectors.clear()
+            self.get_index_stats()
+        else:
+            self.index_fingerprint = fingerprint
+
+    def _connection(self):
+        # Satu koneksi keep-alive per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        if REQUEST_ID.get() != REQUEST_ID_UNSET:
+            headers["X-Request-ID"] = REQUEST_ID.get()
+
+        for attempt in range(2):
+            reused = getattr(self._local, "conn", None) is not None
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = json.loads(response.read().decode("utf-8"))
+                break
+            except STALE_CONNECTION_ERRORS:
+                # Koneksi keep-alive ditutup server sebelum request diproses: buka ulang sekali.
+                # Timeout dan error lain tidak diulang (request bisa sudah jalan di server).
+                self._drop_connection(conn)
+                if not reused or attempt == 1:
+                    raise
+            except (http.client.HTTPException, OSError, ValueError):
+                self._drop_connection(conn)
+                raise
+
+        if response.status >= 400:
+            raise RuntimeError(f"Retrieval service error ({response.status}): {data.get('error')}")
+        return data
+
+    def _drop_connection(self, conn):
+        conn.close()
+        self._local.conn = None
+
+    def is_alive(self):
+        try:
+            return self._request("GET", "/health").get("status") == "ok"
+        except Exception:
+            return False
+
+    def search(self, query, top_k=None):
+        try:
+            data = self._request("POST", "/search", {"query": query, "top_k": top_k})
+            self._observe_fingerprint(data.get("index_fingerprint"))
+            if data.get("query_vector") is not None:
+                self._query_vectors.put(query, np.asarray(data["query_vector"], dtype="float32"))
+            return data["results"]
+        except Exception as e:
+            log.error(f"❌ Error dalam search (service): {e}")
+            return []
+
+    def search_with_debug(self, query, top_k=None):
+        try:
+            data = self._request("POST", "/search_with_debug", {"query": query, "top_k": top_k})
+            self._observe_fingerprint(data.get("index_fingerprint"))
+            return data["results"], data["debug_info"]
+        except Exception as e:
+            log.error(f"❌ Error dalam search (service): {e}")
+            return [], {"error": str(e)}
+
+    def search_batch(self, queries, top_k=None):
+        data = self._request("POST", "/search_batch", {"queries": list(queries), "top_k": top_k})
+        self._observe_fingerprint(data.get("index_fingerprint"))
+        return data["results"]
+
+    def match_faq(self, query, threshold=None):
+        try:
+            return self._request("POST", "/match_faq", {"query": query, "threshold": threshold})["match"]
+        except Exception as e:
+            log.warning(f"⚠️ FAQ match error (service): {e}")
+            return None
+
+    def encode_queries(self, queries):
+        """Embedding query; yang sudah dikirim balik oleh /search tidak diminta ulang"""
+        queries = list(queries)
+        vectors = [self._query_vectors.get(query) for query in queries]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            data = self._request("POST", "/encode_queries", {"queries": [queries[i] for i in missing]})
+            for i, vector in zip(missing, data["vectors"]):
+                vectors[i] = np.asarray(vector, dtype="float32")
+                self._query_vectors.put(queries[i], vectors[i])
+        return np.stack(vectors)
+
+    def encode_texts(self, texts):
+        return np.asarray(self._request("POST", "/embed", {"texts": list(texts)})["vectors"], dtype="float32")
+
+    def smart_search(self, query):
+        return self.search(query)
+
+    def get_index_stats(self):
+        stats = self._request("GET", "/stats")
+        self.index_fingerprint = stats.get("index_fingerprint")
+        self.texts = RemoteTexts(self, stats.get("total_texts", 0))
+        return stats
+
+
+def get_retriever():
+    """RetrieverClient jika retrieval service aktif & hidup, selain itu Retriever lokal.
+
+    Pertanyaan time-series (provinsi + tanggal) dijawab QueryRouter langsung dari
+    store kolom jika tersedia, sisanya diteruskan ke retriever.
+    """
+    from src.query_router import with_query_router
+
+    if config.RETRIEVAL_SERVICE.get("enabled"):
+        try:
+            client = RetrieverClient()
+            log.info(f"✅ Using retrieval service at {client.host}:{client.port}")
+            return with_query_router(client)
+        except Exception as e:
+            log.warning(f"⚠️ Retrieval service tidak tersedia ({e}), load Retriever lokal")
+
+    from src.retriever import Retriever
+    return with_query_router(Retriever())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retrieval service: satu Retriever untuk semua halaman/worker")
+    parser.add_argument("--host", default=config.RETRIEVAL_SERVICE["host"])
+    parser.add_argument("--port", type=int, default=config.RETRIEVAL_SERVICE["port"])
+    args = parser.parse_args(argv)
+    serve(args.host, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,24 @@ import numpy as np
 import faiss
 import os
 import json
+import atexit
+import hashlib
+import threading
+from concurrent.futures import Future
 from sentence_transformers import SentenceTransformer
 
+from src.cache import EmbeddingCache, normalize_text
+from src.index_factory import load_index, describe_index
+from src.chunk_store import open_texts, ChunkStore, store_base_for
+from src.lexical_index import LexicalIndex, lexical_index_exists, reciprocal_rank_fusion
+from src.batching import MicroBatcher
+from src.faq import get_faq_index
+from src.faq_matcher import SemanticFaqMatcher
+from src.reranker import Reranker
+from src.telemetry import get_logger, span
+
+log = get_logger("retriever")
+
 
 os.environ['TRANSFORMERS_OFFLINE'] = '1'
 os.environ['HF_HUB_OFFLINE'] = '1'
@@ -18,43 +34,362 @@ class Retriever:
             texts_path = config.TEXT_PATH
         
         self.index_path = index_path
+        self.nprobe = config.MODEL_CONFIG.get("ivf_nprobe")
+        self.ef_search = config.MODEL_CONFIG.get("hnsw_ef_search")
         self.texts_path = texts_path
         self.embedder = None
+        self.batcher = None
         self.index = None
         self.texts = None
-        self.default_top_k = 15
-        self.score_threshold = 0.1  
+        self.index_fingerprint = None
+        self.default_top_k = config.MODEL_CONFIG.get("retrieval_top_k", 5)
+        self.score_threshold = config.MODEL_CONFIG.get("score_threshold", 0.2)
+        self.normalize_embeddings = config.MODEL_CONFIG.get("normalize_embeddings", True)
+        self.metric = None
+        self.lexical = None
+        self.hybrid = config.MODEL_CONFIG.get("hybrid_search", False)
+        self.hybrid_candidates = config.MODEL_CONFIG.get("hybrid_candidates", 20)
+        self.rrf_k = config.MODEL_CONFIG.get("rrf_k", 60)
+        self.faq_matcher = None
+        self.reranker = None
+        self.rerank_config = None
+        if config.MODEL_CONFIG.get("rerank_enabled"):
+            self.rerank_config = {
+                "model_name": config.MODEL_CONFIG.get("rerank_model"),
+                "budget_ms": config.MODEL_CONFIG.get("rerank_budget_ms", 300),
+                "cache_size": config.MODEL_CONFIG.get("rerank_cache_size", 4096),
+                "max_pending": config.MODEL_CONFIG.get("rerank_max_pending", 8),
+                "device": config.MODEL_CONFIG.get("device", "cpu")
+            }
+        self.rerank_candidates = config.MODEL_CONFIG.get("rerank_candidates", 15)
+        self.rerank_keep = config.MODEL_CONFIG.get("rerank_keep", 3)
+        self.faq_threshold = config.MODEL_CONFIG.get("faq_similarity_threshold", 0.85)
+        self._faq_lock = threading.Lock()
+        # Encode yang sedang jalan per query ternormalisasi: FAQ match dan search untuk
+        # pertanyaan yang sama (jalan bersamaan di pipeline) berbagi satu embedding
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.batching_config = None
+        if config.MODEL_CONFIG.get("embed_batching"):
+            self.batching_config = {
+                "max_batch_size": config.MODEL_CONFIG.get("embed_max_batch_size", 32),
+                "max_wait_ms": config.MODEL_CONFIG.get("embed_batch_window_ms", 5)
+            }
+        
+        cache_path = config.EMBEDDING_CACHE_PATH if config.MODEL_CONFIG.get("embedding_cache_persist") else None
+        self.embedding_cache = EmbeddingCache(
+            max_size=config.MODEL_CONFIG.get("embedding_cache_size", 0),
+            path=cache_path,
+            model_name=config.MODEL_CONFIG["embedding_model"]
+        )
+        if cache_path:
+            atexit.register(self.save_embedding_cache)
         
-        print(f"🔍 Retriever - CONSISTENT MODE")
+        log.info(f"🔍 Retriever - CONSISTENT MODE")
         self._load_components()
     
     def _load_components(self):
         """Load model dan index"""
         try:
-            print("🔄 Loading embedder...")
+            log.info("🔄 Loading embedder...")
             self.embedder = SentenceTransformer('paraphrase-multilingual-mpnet-base-v2')
+            if self.batching_config:
+                self.batcher = MicroBatcher(self._encode_raw, **self.batching_config)
             
-            print("🔄 Loading FAISS index...")
+            log.info("🔄 Loading FAISS index...")
             if os.path.exists(self.index_path):
-                self.index = faiss.read_index(self.index_path)
-                print(f"✅ FAISS index loaded: {self.index.ntotal} vectors")
+                self.index = load_index(self.index_path, nprobe=self.nprobe, ef_search=self.ef_search)
+                self.index_fingerprint = self._compute_fingerprint()
+                self.metric = describe_index(self.index)["metric"]
+                log.info(f"✅ FAISS index loaded: {self.index.ntotal} vectors ({describe_index(self.index)['index_type']}, {self.metric})")
+                if self.metric != "ip":
+                    log.warning("⚠️ Index L2 (legacy): jarak dikonversi ke similarity 1/(1+d). Rebuild dengan metric 'ip' untuk cosine similarity.")
             else:
                 raise FileNotFoundError(f"FAISS index not found: {self.index_path}")
             
-            print("🔄 Loading texts...")
-            if os.path.exists(self.texts_path):
-                with open(self.texts_path, 'r', encoding='utf-8') as f:
-                    self.texts = json.load(f)
-                print(f"✅ Loaded {len(self.texts)} text chunks")
-            else:
-                raise FileNotFoundError(f"Texts file not found: {self.texts_path}")
+            log.info("🔄 Loading texts...")
+            self.texts = open_texts(self.texts_path)
+            store_type = "memory-mapped chunk store" if isinstance(self.texts, ChunkStore) else "JSON"
+            log.info(f"✅ Loaded {len(self.texts)} text chunks ({store_type})")
+            if len(self.texts) != self.index.ntotal:
+                # doc_id FAISS = posisi di texts: jumlah berbeda berarti pasangan id-teks salah
+                raise ValueError(
+                    f"Texts ({len(self.texts)} chunk) tidak sinkron dengan index ({self.index.ntotal} vektor); "
+                    f"rebuild dengan: python -m src.indexer"
+                )
+            
+            if self.hybrid:
+                self._load_lexical()
+            
+            if self.rerank_config:
+                self._load_reranker()
                 
-            print("✅ All components loaded!")
+            log.info("✅ All components loaded!")
                 
         except Exception as e:
-            print(f"❌ Error loading components: {e}")
+            log.error(f"❌ Error loading components: {e}")
             raise e
 
+    def _load_lexical(self):
+        """Load inverted index BM25 yang dibangun bersama FAISS index (hybrid search)"""
+        base = store_base_for(self.texts_path)
+        if not lexical_index_exists(base):
+            log.warning("⚠️ BM25 index tidak ditemukan, pakai dense search saja. Build dengan: python -m src.lexical_index")
+            return
+        
+        lexical = LexicalIndex(base)
+        if len(lexical) != len(self.texts):
+            log.warning(f"⚠️ BM25 index ({len(lexical)} docs) tidak sinkron dengan texts ({len(self.texts)}), hybrid dinonaktifkan")
+            return
+        
+        # Skor dense untuk hit yang hanya ditemukan BM25 butuh reconstruct; IVF perlu direct map
+        try:
+            faiss.extract_index_ivf(self.index).make_direct_map()
+        except Exception:
+            pass
+        
+        self.lexical = lexical
+        log.info(f"✅ BM25 index loaded: {lexical.stats()['terms']} terms (hybrid RRF)")
+
+    def _load_reranker(self):
+        """Cross-encoder opsional; gagal load = tanpa rerank (urutan dense)"""
+        try:
+            log.info(f"🔄 Loading reranker: {self.rerank_config['model_name']}")
+            self.reranker = Reranker(**self.rerank_config).load()
+            log.info(f"✅ Reranker loaded (budget {self.reranker.budget_ms}ms)")
+        except Exception as e:
+            self.reranker = None
+            log.warning(f"⚠️ Reranker tidak tersedia, pakai urutan dense: {e}")
+
+    def _compute_fingerprint(self):
+        """Fingerprint index (path, ukuran, mtime, jumlah vektor) untuk cache key"""
+        stat = os.stat(self.index_path)
+        raw = f"{os.path.abspath(self.index_path)}:{stat.st_size}:{stat.st_mtime_ns}:{self.index.ntotal}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _encode_raw(self, texts):
+        return self.embedder.encode(texts, convert_to_numpy=True).astype("float32")
+
+    def _encode(self, queries):
+        """Encode list query dalam satu forward pass, memakai embedding cache"""
+        vectors = [self.embedding_cache.get(q) for q in queries]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        
+        if missing:
+            for i, vector in zip(missing, self._encode_shared([queries[i] for i in missing])):
+                vectors[i] = vector
+        
+        embeddings = np.stack(vectors).astype("float32")
+        
+        # Index IP + vektor ternormalisasi = cosine similarity
+        if self.metric == "ip" and self.normalize_embeddings:
+            faiss.normalize_L2(embeddings)
+        
+        return embeddings
+
+    def _encode_shared(self, queries):
+        """Encode query yang tidak ada di cache; query yang sedang di-encode thread lain ditunggu, bukan di-encode ulang"""
+        owned, waiting = {}, {}
+        with self._inflight_lock:
+            for query in queries:
+                key = normalize_text(query)
+                if key in owned or key in waiting:
+                    continue
+                future = self._inflight.get(key)
+                if future is not None:
+                    waiting[key] = future
+                    continue
+                # Thread lain bisa baru saja selesai (cache terisi, future sudah dilepas)
+                cached = self.embedding_cache.get(query)
+                if cached is not None:
+                    waiting[key] = Future()
+                    waiting[key].set_result(cached)
+                    continue
+                owned[key] = (query, Future())
+                self._inflight[key] = owned[key][1]
+
+        if owned:
+            texts = [query for query, _ in owned.values()]
+            try:
+                with span("embed", queries=len(texts)):
+                    encoded = self.batcher.encode(texts) if self.batcher else self._encode_raw(texts)
+                for (query, future), vector in zip(owned.values(), encoded):
+                    self.embedding_cache.put(query, vector)
+                    future.set_result(vector)
+            except Exception as e:
+                for _, future in owned.values():
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+            finally:
+                with self._inflight_lock:
+                    for key in owned:
+                        self._inflight.pop(key, None)
+
+        futures = {key: future for key, (_, future) in owned.items()}
+        futures.update(waiting)
+        return [futures[normalize_text(query)].result() for query in queries]
+
+    def _search_index(self, query_embeddings, top_k):
+        """index.search yang selalu mengembalikan similarity (semakin besar semakin relevan)"""
+        with span("faiss_search", k=top_k):
+            scores, indices = self.index.search(query_embeddings, top_k)
+        if self.metric != "ip":
+            scores = 1.0 / (1.0 + np.maximum(scores, 0.0))
+        return scores, indices
+
+    def save_embedding_cache(self):
+        """Simpan embedding cache ke disk (jika persist aktif)"""
+        try:
+            return self.embedding_cache.save()
+        except Exception as e:
+            log.warning(f"⚠️ Gagal simpan embedding cache: {e}")
+            return False
+
+    def _dense_k(self, top_k):
+        """Jumlah kandidat dense: lebih banyak saat hybrid/rerank supaya ada cukup kandidat"""
+        if self.lexical is not None:
+            top_k = max(top_k, self.hybrid_candidates)
+        if self.reranker is not None:
+            top_k = max(top_k, self.rerank_candidates)
+        return top_k
+
+    def _result_limit(self):
+        return self.rerank_candidates if self.reranker is not None else 5
+
+    def _rerank(self, query, results):
+        """Rerank kandidat (jika reranker aktif) dan potong ke rerank_keep"""
+        if self.reranker is None:
+            return results, None
+        return self.reranker.rerank(query, results, keep=self.rerank_keep)
+
+    def _dense_scores(self, query_vector, doc_ids):
+        """Similarity dense untuk doc di luar hasil FAISS (via reconstruct); None jika tidak didukung"""
+        try:
+            vectors = np.stack([self.index.reconstruct(int(i)) for i in doc_ids]).astype("float32")
+        except Exception:
+            return None
+        if self.metric == "ip":
+            return vectors @ query_vector
+        distances = ((vectors - query_vector) ** 2).sum(axis=1)
+        return 1.0 / (1.0 + distances)
+
+    def _collect_hybrid(self, query, scores, indices, query_vector, verbose=True, limit=5):
+        """Fusion dense + BM25 (reciprocal rank fusion) untuk satu query.
+
+        Syarat overlap kata = skor BM25 > 0 (token chunk sudah diindex saat build,
+        tidak di-tokenize ulang per query). Doc diterima jika skor dense di atas
+        threshold atau masuk kandidat teratas BM25 (nama provinsi, tanggal, dll).
+        """
+        lexical_scores = self.lexical.score(query)
+        
+        dense = {}
+        for idx, score in zip(indices, scores):
+            if 0 <= idx < len(self.texts) and int(idx) not in dense:
+                dense[int(idx)] = float(score)
+        lexical_top = [int(i) for i in self.lexical.top_k(lexical_scores, self.hybrid_candidates)]
+        
+        fused = reciprocal_rank_fusion([list(dense), lexical_top], k=self.rrf_k)
+        
+        missing = [idx for idx in lexical_top if idx not in dense]
+        if missing:
+            missing_scores = self._dense_scores(query_vector, missing)
+            for i, idx in enumerate(missing):
+                dense[idx] = float(missing_scores[i]) if missing_scores is not None else 0.0
+        
+        lexical_set = set(lexical_top)
+        results = []
+        for rank, (idx, rrf_score) in enumerate(fused, 1):
+            bm25_score = float(lexical_scores[idx])
+            score = dense[idx]
+            if bm25_score <= 0 or not (score > self.score_threshold or idx in lexical_set):
+                continue
+            
+            text = self.texts[idx]
+            if not isinstance(text, str):
+                text = str(text)
+            results.append({
+                "text": text,
+                "score": score,
+                "original_score": score,
+                "bm25_score": bm25_score,
+                "rrf_score": rrf_score,
+                "rank": rank,
+                "doc_id": idx
+            })
+            if verbose:
+                log.debug(f"   ✅ Accepted: score={score:.3f}, bm25={bm25_score:.3f}, rrf={rrf_score:.4f}")
+        
+        if verbose:
+            log.debug(f"🎯 Final results: {len(results)} documents (hybrid)")
+        
+        if not results and len(indices) > 0:
+            idx = int(indices[0])
+            if 0 <= idx < len(self.texts):
+                text = self.texts[idx]
+                if not isinstance(text, str):
+                    text = str(text)
+                results.append({
+                    "text": text,
+                    "score": 0.5,  # Default score
+                    "original_score": float(scores[0]),
+                    "bm25_score": float(lexical_scores[idx]),
+                    "rrf_score": dict(fused).get(idx, 0.0),
+                    "rank": 1,
+                    "doc_id": idx
+                })
+                if verbose:
+                    log.debug(f"🔧 Fallback to top result")
+        
+        return results[:limit]
+
+    def _collect_results(self, query, scores, indices, verbose=True, query_vector=None, limit=5):
+        """Filter hasil FAISS untuk satu query (threshold + word overlap + fallback)"""
+        if self.lexical is not None and query_vector is not None:
+            return self._collect_hybrid(query, scores, indices, query_vector, verbose=verbose, limit=limit)
+        
+        results = []
+        for i, (idx, score) in enumerate(zip(indices, scores)):
+            if 0 <= idx < len(self.texts):
+                text = self.texts[idx]
+                if not isinstance(text, str):
+                    text = str(text)
+                
+                if score > self.score_threshold:
+                    query_words = set(query.lower().split())
+                    text_words = set(text.lower().split())
+                    word_overlap = len(query_words.intersection(text_words))
+                    
+                    if word_overlap >= 1:  
+                        results.append({
+                            "text": text,
+                            "score": float(score),
+                            "original_score": float(score),
+                            "rank": i + 1,
+                            "doc_id": int(idx)
+                        })
+                        if verbose:
+                            log.debug(f"   ✅ Accepted: score={score:.3f}, overlap={word_overlap}")
+        
+        if verbose:
+            log.debug(f"🎯 Final results: {len(results)} documents")
+        
+        if not results and len(indices) > 0:
+            idx = indices[0]
+            if 0 <= idx < len(self.texts):
+                text = self.texts[idx]
+                results.append({
+                    "text": text,
+                    "score": 0.5,  # Default score
+                    "original_score": float(scores[0]),
+                    "rank": 1,
+                    "doc_id": int(idx)
+                })
+                if verbose:
+                    log.debug(f"🔧 Fallback to top result")
+        
+        return results[:limit]
+
     def search(self, query, top_k=None):
         """Search dengan konsistensi lebih baik"""
         if self.index is None or self.texts is None:
@@ -64,56 +399,61 @@ class Retriever:
             top_k = self.default_top_k
         
         try:
-            print(f"🔍 SEARCH: '{query}'")
-            
-            query_embedding = self.embedder.encode([query], convert_to_numpy=True).astype("float32")
-            scores, indices = self.index.search(query_embedding, top_k)
+            log.debug(f"🔍 SEARCH: '{query}'")
             
-            print(f"📊 Raw scores: {scores[0][:5]}")
+            query_embedding = self._encode([query])
+            scores, indices = self._search_index(query_embedding, self._dense_k(top_k))
             
-            results = []
-            for i, (idx, score) in enumerate(zip(indices[0], scores[0])):
-                if 0 <= idx < len(self.texts):
-                    text = self.texts[idx]
-                    if not isinstance(text, str):
-                        text = str(text)
-                    
-                    if score > self.score_threshold:
-                        query_words = set(query.lower().split())
-                        text_words = set(text.lower().split())
-                        word_overlap = len(query_words.intersection(text_words))
-                        
-                        if word_overlap >= 1:  
-                            results.append({
-                                "text": text,
-                                "score": float(score),
-                                "original_score": float(score),
-                                "rank": i + 1,
-                                "doc_id": int(idx)
-                            })
-                            print(f"   ✅ Accepted: score={score:.3f}, overlap={word_overlap}")
+            log.debug(f"📊 Raw scores: {scores[0][:5]}")
             
-            print(f"🎯 Final results: {len(results)} documents")
-            
-            if not results and len(indices[0]) > 0:
-                idx = indices[0][0]
-                if 0 <= idx < len(self.texts):
-                    text = self.texts[idx]
-                    results.append({
-                        "text": text,
-                        "score": 0.5,  # Default score
-                        "original_score": float(scores[0][0]),
-                        "rank": 1,
-                        "doc_id": int(idx)
-                    })
-                    print(f"🔧 Fallback to top result")
-            
-            return results[:5]
+            with span("filter"):
+                results = self._collect_results(
+                    query, scores[0], indices[0], query_vector=query_embedding[0], limit=self._result_limit()
+                )
+            with span("rerank"):
+                results, rerank_info = self._rerank(query, results)
+            if rerank_info:
+                log.debug(f"🔀 Rerank: {rerank_info}")
+            return results
             
         except Exception as e:
-            print(f"❌ Error dalam search: {e}")
+            log.error(f"❌ Error dalam search: {e}")
             return []
 
+    def search_batch(self, queries, top_k=None, batch_size=64):
+        """Search banyak query sekaligus: satu encode + satu index.search per batch.
+
+        Hasil per query sama dengan ``search(query, top_k)``.
+        """
+        if self.index is None or self.texts is None:
+            raise ValueError("Index belum dimuat!")
+        
+        if top_k is None:
+            top_k = self.default_top_k
+        
+        queries = list(queries)
+        all_results = []
+        
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
+            try:
+                query_embeddings = self._encode(batch)
+                scores, indices = self._search_index(query_embeddings, self._dense_k(top_k))
+                
+                for query, row_scores, row_indices, query_vector in zip(batch, scores, indices, query_embeddings):
+                    with span("filter"):
+                        results = self._collect_results(
+                            query, row_scores, row_indices, verbose=False,
+                            query_vector=query_vector, limit=self._result_limit()
+                        )
+                    all_results.append(self._rerank(query, results)[0])
+            except Exception as e:
+                log.error(f"❌ Error dalam search_batch: {e}")
+                all_results.extend([] for _ in batch)
+        
+        log.debug(f"🎯 Batch search: {len(queries)} queries")
+        return all_results
+
     def search_with_debug(self, query, top_k=None):
         """Search dengan debug info"""
         if self.index is None or self.texts is None:
@@ -124,19 +464,32 @@ class Retriever:
         
         try:
             # Encode query
-            query_embedding = self.embedder.encode([query], convert_to_numpy=True).astype("float32")
+            query_embedding = self._encode([query])
             
             # Search
-            scores, indices = self.index.search(query_embedding, top_k)
+            dense_k = self._dense_k(top_k)
+            scores, indices = self._search_index(query_embedding, dense_k)
             
             results = []
             debug_info = {
                 'query': query,
-                'total_docs_searched': top_k,
+                'top_k': top_k,
+                # k yang benar-benar diminta ke FAISS (hybrid/rerank memperbesar kandidat)
+                'total_docs_searched': dense_k,
                 'raw_scores': scores[0][:5].tolist(),
                 'found_documents': 0
             }
             
+            if self.lexical is not None:
+                results = self._collect_hybrid(
+                    query, scores[0], indices[0], query_embedding[0], verbose=False, limit=self._result_limit()
+                )
+                results, debug_info['rerank'] = self._rerank(query, results)
+                debug_info['fusion'] = f"rrf(k={self.rrf_k})"
+                debug_info['lexical_hits'] = int(np.count_nonzero(self.lexical.score(query)))
+                debug_info['found_documents'] = len(results)
+                return results, debug_info
+            
             for i, (idx, score) in enumerate(zip(indices[0], scores[0])):
                 if 0 <= idx < len(self.texts):
                     text = self.texts[idx]
@@ -159,13 +512,49 @@ class Retriever:
                             debug_info['found_documents'] += 1
             
             results.sort(key=lambda x: x["score"], reverse=True)
+            results, debug_info['rerank'] = self._rerank(query, results)
             
             return results, debug_info
             
         except Exception as e:
-            print(f"❌ Error dalam search: {e}")
+            log.error(f"❌ Error dalam search: {e}")
             return [], {'error': str(e)}
 
+    def _get_faq_matcher(self):
+        """SemanticFaqMatcher untuk tabel FAQ saat ini; dibangun ulang jika tabel di-reload"""
+        faq_index = get_faq_index()
+        matcher = self.faq_matcher
+        if matcher is not None and matcher.faq_index is faq_index:
+            return matcher
+        
+        with self._faq_lock:
+            if self.faq_matcher is None or self.faq_matcher.faq_index is not faq_index:
+                self.faq_matcher = SemanticFaqMatcher(faq_index, self._encode_raw, threshold=self.faq_threshold)
+                log.info(f"✅ FAQ matcher built: {len(self.faq_matcher.entries)} questions (v{faq_index.version})")
+            return self.faq_matcher
+
+    def match_faq(self, query, threshold=None):
+        """Jawaban FAQ jika query mirip (cosine >= threshold) dengan contoh pertanyaan FAQ, else None"""
+        try:
+            matcher = self._get_faq_matcher()
+            query_embedding = self._encode([query])[0]
+            match = matcher.match(query_embedding, threshold=threshold)
+            if match:
+                log.debug(f"🎯 FAQ match '{match['faq_question']}' (score {match['score']:.3f})")
+            return match
+        except Exception as e:
+            log.warning(f"⚠️ FAQ match error: {e}")
+            return None
+
+    def encode_queries(self, queries):
+        """Embedding query lewat embedding cache: vektor yang sama dengan yang dipakai search"""
+        return self._encode(list(queries))
+
+    def encode_texts(self, texts):
+        """Embedding teks bebas (mis. kalimat context) tanpa lewat embedding cache query"""
+        texts = list(texts)
+        return self.batcher.encode(texts) if self.batcher else self._encode_raw(texts)
+
     def smart_search(self, query):
         return self.search(query)
 
@@ -177,7 +566,15 @@ class Retriever:
         return {
             "total_vectors": self.index.ntotal,
             "total_texts": len(self.texts),
+            "text_store": "chunk_store" if isinstance(self.texts, ChunkStore) else "json",
             "embedding_dim": self.index.d,
+            **describe_index(self.index),
             "score_threshold": self.score_threshold,
-            "default_top_k": self.default_top_k
+            "default_top_k": self.default_top_k,
+            "index_fingerprint": self.index_fingerprint,
+            "embedding_cache": self.embedding_cache.stats(),
+            "embed_batching": self.batcher.stats() if self.batcher else None,
+            "lexical_index": self.lexical.stats() if self.lexical is not None else None,
+            "reranker": self.reranker.stats() if self.reranker is not None else None,
+            "faq_matcher": self.faq_matcher.stats() if self.faq_matcher else None
         }
\ No newline at end of file
@@ -0,0 +1,201 @@
+import os
+import datetime
+
+import numpy as np
+
+from src.timeseries import TimeSeriesStore, EPOCH
+
+# Metric harian dijumlahkan per periode; metric kumulatif diambil nilai terakhir periode
+FLOW_METRICS = ("kasus_baru", "kematian_baru", "sembuh_baru")
+CUMULATIVE_METRICS = ("total_kasus", "total_kematian", "total_sembuh")
+ROLLUP_METRICS = FLOW_METRICS + CUMULATIVE_METRICS
+
+# Pasangan metric kumulatif <-> harian ("total kematian bulan Juli" = jumlah kematian harian Juli)
+FLOW_OF = {"total_kasus": "kasus_baru", "total_kematian": "kematian_baru", "total_sembuh": "sembuh_baru"}
+CUMULATIVE_OF = {flow: cumulative for cumulative, flow in FLOW_OF.items()}
+
+
+def rollup_path_for(store_path):
+    """covid19_timeseries.npz -> covid19_timeseries.rollups.npz"""
+    return os.path.splitext(store_path)[0] + ".rollups.npz"
+
+
+def month_key(year, month):
+    """Jumlah bulan sejak 1970-01 (sama dengan datetime64[M] sebagai int)"""
+    return (year - 1970) * 12 + (month - 1)
+
+
+def week_key(date):
+    """Nomor minggu (Senin-Minggu) sejak minggu yang memuat 1970-01-01"""
+    return ((date - EPOCH).days + 3) // 7
+
+
+def week_start(key):
+    return EPOCH + datetime.timedelta(days=int(key) * 7 - 3)
+
+
+def _forward_fill(values, present):
+    """Isi periode kosong dengan nilai periode sebelumnya (sepanjang axis 1)"""
+    filled = values.copy()
+    for i in range(1, values.shape[1]):
+        missing = ~present[:, i]
+        filled[missing, i] = filled[missing, i - 1]
+    return filled
+
+
+def build_rollups(store: TimeSeriesStore, path):
+    """Precompute rollup bulanan/mingguan per provinsi + nasional dan ranking provinsi.
+
+    Baris terakhir (indeks = jumlah provinsi) di setiap array adalah total nasional.
+    """
+    n_prov = len(store.provinces)
+    prov_of_row = np.repeat(np.arange(n_prov), np.diff(store.offsets))
+    days = store.days.astype("int64")
+
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype("int64")
+    weeks = (days + 3) // 7
+    month_keys = np.arange(months.min(), months.max() + 1, dtype="int32")
+    week_keys = np.arange(weeks.min(), weeks.max() + 1, dtype="int32")
+    month_idx = months - month_keys[0]
+    week_idx = weeks - week_keys[0]
+
+    flows = np.stack([store.metrics[m].astype("int64") for m in FLOW_METRICS], axis=-1)
+    cumulative = np.stack([store.metrics[m].astype("int64") for m in CUMULATIVE_METRICS], axis=-1)
+
+    monthly = np.zeros((n_prov + 1, len(month_keys), len(FLOW_METRICS)), dtype="int64")
+    weekly = np.zeros((n_prov + 1, len(week_keys), len(FLOW_METRICS)), dtype="int64")
+    np.add.at(monthly, (prov_of_row, month_idx), flows)
+    np.add.at(weekly, (prov_of_row, week_idx), flows)
+
+    # Nilai kumulatif di akhir bulan: baris terakhir setiap (provinsi, bulan)
+    group = prov_of_row * len(month_keys) + month_idx
+    last = np.r_[group[1:] != group[:-1], True]
+    monthly_last = np.zeros((n_prov + 1, len(month_keys), len(CUMULATIVE_METRICS)), dtype="int64")
+    present = np.zeros((n_prov, len(month_keys)), dtype=bool)
+    monthly_last[prov_of_row[last], month_idx[last]] = cumulative[last]
+    present[prov_of_row[last], month_idx[last]] = True
+    monthly_last[:n_prov] = _forward_fill(monthly_last[:n_prov], present)
+
+    monthly[n_prov] = monthly[:n_prov].sum(axis=0)
+    weekly[n_prov] = weekly[:n_prov].sum(axis=0)
+    monthly_last[n_prov] = monthly_last[:n_prov].sum(axis=0)
+
+    totals = np.concatenate([monthly.sum(axis=1), monthly_last[:, -1]], axis=-1)
+
+    # Ranking provinsi (indeks provinsi, nilai terbesar dulu)
+    rank_total = np.argsort(-totals[:n_prov].T, axis=-1, kind="stable").astype("int16")
+    rank_monthly = np.argsort(-monthly[:n_prov].transpose(1, 2, 0), axis=-1, kind="stable").astype("int16")
+
+    tmp_path = path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        provinces=np.array(store.provinces, dtype=str),
+        month_keys=month_keys,
+        week_keys=week_keys,
+        monthly=monthly,
+        weekly=weekly,
+        monthly_last=monthly_last,
+        totals=totals,
+        rank_total=rank_total,
+        rank_monthly=rank_monthly
+    )
+    os.replace(tmp_path, path)
+    return len(month_keys), len(week_keys)
+
+
+class Rollups:
+    """Query rollup time-series: semua jawaban berupa indexing array kecil (sub-milidetik).
+
+    ``province_id=None`` berarti nasional.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        data = np.load(path)
+        self.provinces = data["provinces"].tolist()
+        self.month_keys = data["month_keys"]
+        self.week_keys = data["week_keys"]
+        self.monthly = data["monthly"]
+        self.weekly = data["weekly"]
+        self.monthly_last = data["monthly_last"]
+        self.totals = data["totals"]
+        self.rank_total = data["rank_total"]
+        self.rank_monthly = data["rank_monthly"]
+        self.national = len(self.provinces)
+
+    def _row(self, province_id):
+        return self.national if province_id is None else province_id
+
+    def _month_index(self, year, month):
+        idx = month_key(year, month) - int(self.month_keys[0])
+        return idx if 0 <= idx < len(self.month_keys) else None
+
+    def month_total(self, province_id, metric, year, month):
+        """Jumlah metric harian dalam satu bulan; metric kumulatif -> nilai akhir bulan. None jika di luar data"""
+        idx = self._month_index(year, month)
+        if idx is None:
+            return None
+        if metric in FLOW_METRICS:
+            return int(self.monthly[self._row(province_id), idx, FLOW_METRICS.index(metric)])
+        return int(self.monthly_last[self._row(province_id), idx, CUMULATIVE_METRICS.index(metric)])
+
+    def year_total(self, province_id, metric, year):
+        """Jumlah metric harian dalam satu tahun (metric kumulatif -> nilai akhir tahun)"""
+        lo = month_key(year, 1) - int(self.month_keys[0])
+        hi = min(lo + 12, len(self.month_keys))
+        lo = max(lo, 0)
+        if lo >= hi:
+            return None
+        if metric in FLOW_METRICS:
+            return int(self.monthly[self._row(province_id), lo:hi, FLOW_METRICS.index(metric)].sum())
+        return int(self.monthly_last[self._row(province_id), hi - 1, CUMULATIVE_METRICS.index(metric)])
+
+    def week_total(self, province_id, metric, date):
+        """(tanggal Senin awal minggu, jumlah metric harian minggu yang memuat date)"""
+        key = week_key(date)
+        idx = key - int(self.week_keys[0])
+        if not 0 <= idx < len(self.week_keys):
+            return week_start(key), None
+        metric = FLOW_OF.get(metric, metric)
+        return week_start(key), int(self.weekly[self._row(province_id), idx, FLOW_METRICS.index(metric)])
+
+    def overall(self, province_id, metric):
+        """Total seluruh periode data (metric harian dijumlah, kumulatif nilai terakhir)"""
+        return int(self.totals[self._row(province_id), ROLLUP_METRICS.index(metric)])
+
+    def top(self, metric, n=5, year=None, month=None, ascending=False):
+        """Ranking provinsi: list (province_id, nilai). Per bulan jika year+month, per tahun jika year saja"""
+        if year is not None and month is not None:
+            idx = self._month_index(year, month)
+            if idx is None:
+                return []
+            f = FLOW_METRICS.index(FLOW_OF.get(metric, metric))
+            order = self.rank_monthly[idx, f]
+            values = self.monthly[:self.national, idx, f]
+        elif year is not None:
+            lo = month_key(year, 1) - int(self.month_keys[0])
+            hi = min(lo + 12, len(self.month_keys))
+            lo = max(lo, 0)
+            if lo >= hi:
+                return []
+            f = FLOW_METRICS.index(FLOW_OF.get(metric, metric))
+            # Ranking tahunan tidak di-precompute: 12 bulan x jumlah provinsi, cukup dijumlah di sini
+            values = self.monthly[:self.national, lo:hi, f].sum(axis=1)
+            order = np.argsort(-values, kind="stable")
+        else:
+            m = ROLLUP_METRICS.index(metric)
+            order = self.rank_total[m]
+            values = self.totals[:self.national, m]
+        if ascending:
+            order = order[::-1]
+        return [(int(p), int(values[p])) for p in order[:n]]
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "months": len(self.month_keys),
+            "weeks": len(self.week_keys),
+            "nbytes": int(sum(a.nbytes for a in (
+                self.monthly, self.weekly, self.monthly_last, self.totals, self.rank_total, self.rank_monthly
+            ))),
+        }
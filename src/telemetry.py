@@ -0,0 +1,224 @@
+import os
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from src.batching import Histogram
+
+SPAN_MS_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Request ID ikut ke semua span/log dalam request yang sama (juga di worker thread lewat ``submit``)
+REQUEST_ID_UNSET = "-"
+REQUEST_ID = contextvars.ContextVar("request_id", default=REQUEST_ID_UNSET)
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+
+class MetricsRegistry:
+    """Counter + histogram berlabel, di-render sebagai Prometheus text format"""
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, value=1, labels=None, help_text=""):
+        key = self._key(name, labels)
+        with self._lock:
+            self._help.setdefault(name, ("counter", help_text))
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None, buckets=SPAN_MS_BUCKETS, help_text=""):
+        key = self._key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                self._help.setdefault(name, ("histogram", help_text))
+                histogram = self._histograms.setdefault(key, Histogram(buckets))
+        histogram.observe(value)
+
+    @staticmethod
+    def _escape(value, quote=True):
+        """Escape Prometheus text format: backslash, newline, dan kutip ganda (nilai label)"""
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+        return value.replace('"', '\\"') if quote else value
+
+    @classmethod
+    def _labels(cls, pairs, extra=()):
+        pairs = tuple(pairs) + tuple(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{cls._escape(v)}"' for k, v in pairs)
+        return "{" + body + "}"
+
+    def render(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            help_texts = dict(self._help)
+
+        lines, seen = [], set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {self._escape(help_texts[name][1] or name, quote=False)}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{self._labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {self._escape(help_texts[name][1] or name, quote=False)}")
+                lines.append(f"# TYPE {name} histogram")
+            snapshot = histogram.snapshot()
+            for bound, count in snapshot["buckets"].items():
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{name}_sum{self._labels(labels)} {snapshot['sum']}")
+            lines.append(f"{name}_count{self._labels(labels)} {snapshot['count']}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+METRICS = MetricsRegistry()
+
+
+class _RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = REQUEST_ID.get()
+        return True
+
+
+_logging_configured = False
+_logging_lock = threading.Lock()
+
+
+def configure_logging(level: Optional[str] = None):
+    """Handler stdout untuk logger 'chatbot'; level dari argumen, env LOG_LEVEL, atau config"""
+    global _logging_configured
+    with _logging_lock:
+        if level is None:
+            from src import config
+            level = os.getenv("LOG_LEVEL") or config.TELEMETRY.get("log_level", "INFO")
+        root = logging.getLogger("chatbot")
+        root.setLevel(str(level).upper())
+        if not _logging_configured:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            handler.addFilter(_RequestIdFilter())
+            root.addHandler(handler)
+            root.propagate = False
+            _logging_configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger di bawah 'chatbot' (mis. get_logger('retriever') -> chatbot.retriever)"""
+    if not _logging_configured:
+        configure_logging()
+    return logging.getLogger(f"chatbot.{name}")
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None):
+    """Set request ID untuk semua span/log di dalam blok ini"""
+    token = REQUEST_ID.set(request_id or new_request_id())
+    try:
+        yield REQUEST_ID.get()
+    finally:
+        REQUEST_ID.reset(token)
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit yang membawa context (request ID) ke worker thread"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+_span_log = None
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Ukur satu tahap: histogram chatbot_span_duration_ms{span=name}, error dihitung terpisah"""
+    global _span_log
+    start_time = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        METRICS.inc("chatbot_span_errors_total", labels={"span": name}, help_text="Span yang berakhir dengan exception")
+        raise
+    finally:
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        METRICS.observe("chatbot_span_duration_ms", elapsed_ms, labels={"span": name},
+                        help_text="Durasi span per tahap (ms)")
+        if _span_log is None:
+            _span_log = get_logger("span")
+        if _span_log.isEnabledFor(logging.DEBUG):
+            extra = " ".join(f"{k}={v}" for k, v in attrs.items())
+            _span_log.debug(f"{name} {elapsed_ms:.2f}ms {extra}".rstrip())
+
+
+def count(name: str, labels=None, value=1, help_text=""):
+    METRICS.inc(name, value=value, labels=labels, help_text=help_text)
+
+
+def render_metrics() -> str:
+    return METRICS.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_metrics_server = None
+_metrics_lock = threading.Lock()
+
+
+def start_metrics_server(host: Optional[str] = None, port: Optional[int] = None):
+    """Endpoint GET /metrics (Prometheus) di thread background; sekali per proses"""
+    global _metrics_server
+    with _metrics_lock:
+        if _metrics_server is not None:
+            return _metrics_server
+        from src import config
+        host = host or config.TELEMETRY["metrics_host"]
+        port = config.TELEMETRY["metrics_port"] if port is None else port
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            get_logger("telemetry").warning(f"⚠️ Metrics endpoint {host}:{port} tidak bisa dibuka: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        get_logger("telemetry").info(f"📈 Metrics di http://{host}:{server.server_address[1]}/metrics")
+        _metrics_server = server
+        return server
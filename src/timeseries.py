@@ -0,0 +1,185 @@
+import os
+import sys
+import argparse
+import datetime
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# metric -> (kolom CSV dari 01_data_cleaning.ipynb, label di kalimat jawaban, dtype)
+METRICS = {
+    "kasus_baru": ("Kasus Baru", "kasus baru COVID-19", "int64"),
+    "kematian_baru": ("Kematian Baru", "kematian baru", "int64"),
+    "sembuh_baru": ("Sembuh Baru", "pasien sembuh baru", "int64"),
+    "total_kasus": ("Total Kasus", "total kasus", "int64"),
+    "total_kematian": ("Total Kematian", "total kematian", "int64"),
+    "total_sembuh": ("Total Sembuh", "total pasien sembuh", "int64"),
+    "rasio_kematian": ("Rasio Kematian Kasus", "rasio kematian kasus", "float32"),
+    "rasio_kesembuhan": ("Rasio Kesembuhan Kasus", "rasio kesembuhan kasus", "float32"),
+    "jumlah_penduduk": ("Jumlah Penduduk", "jumlah penduduk", "int64"),
+}
+
+RATIO_METRICS = {"rasio_kematian", "rasio_kesembuhan"}
+
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def to_day(date):
+    """datetime.date -> jumlah hari sejak 1970-01-01 (int)"""
+    return (date - EPOCH).days
+
+
+def from_day(day):
+    return EPOCH + datetime.timedelta(days=int(day))
+
+
+def format_value(metric, value):
+    if metric in RATIO_METRICS:
+        return f"{float(value):.2f}%"
+    return f"{int(value):,}".replace(",", ".")
+
+
+def build_store(csv_path, store_path):
+    """Konversi CSV time-series bersih (satu baris per provinsi per hari) ke array kolom .npz.
+
+    Baris diurutkan per (provinsi, tanggal); ``offsets`` menunjuk potongan
+    tiap provinsi, sehingga lookup cukup searchsorted di array tanggal.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    df = df.dropna(subset=["Provinsi", "Tanggal"])
+    df["Tanggal"] = pd.to_datetime(df["Tanggal"], errors="coerce")
+    df = df.dropna(subset=["Tanggal"])
+    for metric in RATIO_METRICS:
+        column = METRICS[metric][0]
+        if df[column].dtype == object:
+            df[column] = df[column].astype(str).str.replace("%", "", regex=False)
+    df = df.sort_values(["Provinsi", "Tanggal"]).drop_duplicates(["Provinsi", "Tanggal"], keep="last")
+
+    provinces = sorted(df["Provinsi"].astype(str).unique())
+    counts = df.groupby("Provinsi", sort=True).size().reindex(provinces).to_numpy()
+    offsets = np.zeros(len(provinces) + 1, dtype="int64")
+    offsets[1:] = np.cumsum(counts)
+
+    epoch = pd.Timestamp(EPOCH)
+    arrays = {
+        "provinces": np.array(provinces, dtype=str),
+        "offsets": offsets,
+        "days": ((df["Tanggal"] - epoch).dt.days).to_numpy(dtype="int32"),
+    }
+    for metric, (column, _, dtype) in METRICS.items():
+        values = pd.to_numeric(df[column], errors="coerce").fillna(0)
+        arrays[f"m_{metric}"] = values.to_numpy(dtype=dtype)
+
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+    tmp_path = store_path + ".tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, store_path)
+    return len(df), len(provinces)
+
+
+class TimeSeriesStore:
+    """Store kolom time-series COVID per provinsi (read-only, dari .npz)"""
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        data = np.load(store_path)
+        self.provinces = data["provinces"].tolist()
+        self.offsets = data["offsets"]
+        self.days = data["days"]
+        self.metrics = {metric: data[f"m_{metric}"] for metric in METRICS if f"m_{metric}" in data}
+        self.province_ids = {name.lower(): i for i, name in enumerate(self.provinces)}
+
+    def __len__(self):
+        return len(self.days)
+
+    def province_id(self, province):
+        return self.province_ids.get(province.lower())
+
+    def date_range(self, province_id=None):
+        """(tanggal pertama, tanggal terakhir) untuk satu provinsi atau semua data"""
+        if province_id is None:
+            return from_day(self.days.min()), from_day(self.days.max())
+        start, end = self.offsets[province_id], self.offsets[province_id + 1]
+        if start == end:
+            return None, None
+        return from_day(self.days[start]), from_day(self.days[end - 1])
+
+    def row(self, province_id, date):
+        """Posisi baris (provinsi, tanggal) atau None jika tidak ada data"""
+        start, end = self.offsets[province_id], self.offsets[province_id + 1]
+        day = to_day(date)
+        pos = start + int(np.searchsorted(self.days[start:end], day))
+        if pos < end and self.days[pos] == day:
+            return pos
+        return None
+
+    def latest_row(self, province_id):
+        start, end = self.offsets[province_id], self.offsets[province_id + 1]
+        return end - 1 if end > start else None
+
+    def value(self, row, metric):
+        return self.metrics[metric][row]
+
+    def series(self, province_id, metric, start_date=None, end_date=None):
+        """(tanggal, nilai) harian satu provinsi dalam rentang [start_date, end_date]"""
+        start, end = self.offsets[province_id], self.offsets[province_id + 1]
+        days = self.days[start:end]
+        lo = int(np.searchsorted(days, to_day(start_date))) if start_date else 0
+        hi = int(np.searchsorted(days, to_day(end_date), side="right")) if end_date else len(days)
+        return days[lo:hi], self.metrics[metric][start + lo:start + hi]
+
+    def describe_row(self, row, province_id):
+        """Kalimat lengkap satu baris, format sama dengan narasi 01_data_cleaning.ipynb"""
+        m = {metric: format_value(metric, values[row]) for metric, values in self.metrics.items()}
+        return (
+            f"Pada {from_day(self.days[row]).isoformat()}, di {self.provinces[province_id]}, "
+            f"tercatat {m['kasus_baru']} kasus baru COVID-19, {m['kematian_baru']} kematian baru, "
+            f"dan {m['sembuh_baru']} pasien sembuh. Total kasus mencapai {m['total_kasus']}, "
+            f"dengan {m['total_kematian']} kematian dan {m['total_sembuh']} pasien sembuh. "
+            f"Rasio kematian kasus adalah {m['rasio_kematian']}, dan rasio kesembuhan adalah "
+            f"{m['rasio_kesembuhan']}. Jumlah penduduk wilayah ini adalah {m['jumlah_penduduk']} orang."
+        )
+
+    def stats(self):
+        first, last = self.date_range() if len(self) else (None, None)
+        return {
+            "store_path": self.store_path,
+            "rows": len(self),
+            "provinces": len(self.provinces),
+            "first_date": first.isoformat() if first else None,
+            "last_date": last.isoformat() if last else None,
+            "nbytes": int(self.days.nbytes + self.offsets.nbytes + sum(v.nbytes for v in self.metrics.values())),
+        }
+
+
+def main(argv=None):
+    import src.config as config
+
+    parser = argparse.ArgumentParser(description="Build store kolom time-series COVID + rollup dari CSV bersih")
+    parser.add_argument("--csv", default=config.TIMESERIES_CSV_PATH)
+    parser.add_argument("--output", default=config.TIMESERIES_STORE_PATH)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.csv):
+        print(f"❌ CSV tidak ditemukan: {args.csv}")
+        return 1
+
+    from src.rollups import build_rollups, rollup_path_for
+
+    rows, provinces = build_store(args.csv, args.output)
+    print(f"✅ Time-series store: {args.output} ({rows} baris, {provinces} provinsi)")
+
+    rollup_path = rollup_path_for(args.output)
+    months, weeks = build_rollups(TimeSeriesStore(args.output), rollup_path)
+    print(f"✅ Rollups: {rollup_path} ({months} bulan, {weeks} minggu)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
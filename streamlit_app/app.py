@@ -6,16 +6,16 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))  
 src_path = os.path.join(project_root, "src")  
 
-print(f"🔍 Debug Path:")
-print(f"Current dir: {current_dir}")
-print(f"Project root: {project_root}")
-print(f"Src path: {src_path}")
-
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from src.telemetry import get_logger
+
+log = get_logger("app")
+log.debug(f"🔍 Debug Path: current dir {current_dir}, project root {project_root}, src {src_path}")
+
 st.set_page_config(
     page_title="COVID-19 Chatbot",
     page_icon="🦠",
@@ -8,27 +8,32 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
 src_path = os.path.join(project_root, "src")
 
-print(f"🔍 Debug Path:")
-print(f"Current dir: {current_dir}")
-print(f"Project root: {project_root}")
-print(f"Src path: {src_path}")
-
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from src.telemetry import get_logger, span, start_metrics_server
+
+log = get_logger("chat")
+log.debug(f"🔍 Debug Path: current dir {current_dir}, project root {project_root}, src {src_path}")
+
 import streamlit as st
 import time
 
 try:
-    print("🔄 Mencoba import dari src folder...")
+    log.debug("🔄 Mencoba import dari src folder...")
     
-    from retriever import Retriever
-    from generation import load_generation_model, generate_answer
+    from retrieval_service import get_retriever
+    # Satu modul generation (src.generation) dipakai bersama pipeline: cache & counter yang sama
+    from src.pipeline import RequestPipeline
+    from src.generation import (
+        load_generation_model, get_precheck_stats, get_faq_stats,
+        set_context_encoder
+    )
     import config
     
-    print("✅ Semua modul berhasil diimport!")
+    log.debug("✅ Semua modul berhasil diimport!")
     
 except ImportError as e:
     st.error(f"❌ Gagal mengimpor modul: {e}")
@@ -62,8 +67,9 @@ def save_chat_rooms(chat_rooms):
     """Simpan semua chat rooms ke file"""
     ensure_data_dir()
     try:
-        with open(CHAT_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(chat_rooms, f, ensure_ascii=False, indent=2)
+        with span("persistence", rooms=len(chat_rooms)):
+            with open(CHAT_DATA_FILE, 'w', encoding='utf-8') as f:
+                json.dump(chat_rooms, f, ensure_ascii=False, indent=2)
     except Exception as e:
         st.error(f"❌ Gagal save chat rooms: {e}")
 
@@ -82,19 +88,28 @@ if "processing" not in st.session_state:
 if "rename_mode" not in st.session_state:
     st.session_state.rename_mode = None
 
+if "bypass_answer_cache" not in st.session_state:
+    st.session_state.bypass_answer_cache = False
+
 # ==============================
 # 3️⃣ LOAD COMPONENTS - YANG DIPERBAIKI
 # ==============================
 @st.cache_resource
 def load_components():
     try:
-        print("🔄 Loading generation model...")
+        # Prometheus /metrics (config.TELEMETRY), sekali per proses
+        start_metrics_server()
+        
+        log.info("🔄 Loading generation model...")
         generator_id = load_generation_model()  
         
-        print("🔄 Loading retriever...")
-        retriever = Retriever()  
+        log.info("🔄 Loading retriever...")
+        retriever = get_retriever()  
+        
+        # Kalimat context dipilih dengan model embedding yang sama; embedding pertanyaan dari cache retriever
+        set_context_encoder(retriever.encode_texts, retriever.encode_queries)
         
-        print(f"✅ Components loaded - Model: {generator_id}")
+        log.info(f"✅ Components loaded - Model: {generator_id}")
         return retriever, generator_id
         
     except Exception as e:
@@ -106,6 +121,16 @@ def load_components():
 # Load components
 retriever, generator_id = load_components()
 
+@st.cache_resource
+def load_pipeline(_retriever, model_id):
+    return RequestPipeline(
+        _retriever,
+        model_id,
+        max_workers=config.MODEL_CONFIG.get("pipeline_workers", 16),
+        stream_workers=config.MODEL_CONFIG.get("pipeline_stream_workers", 16),
+        stage_timeout=config.MODEL_CONFIG.get("pipeline_stage_timeout", 30.0)
+    )
+
 if retriever is None or generator_id is None:
     st.error("""
     ❌ Sistem tidak dapat dimulai. 
@@ -207,38 +232,51 @@ def format_sources(sources):
     
     return formatted
 
-def process_question(question):
-    """Proses pertanyaan dan kembalikan jawaban dengan sumber referensi"""
+def build_sources(retrieved_docs):
+    """Bangun daftar sumber referensi dari dokumen hasil retrieval"""
+    sources = []
+    for i, doc in enumerate(retrieved_docs[:3]):
+        if isinstance(doc, dict):
+            text = doc.get('text', '')
+            score = doc.get('score', 0)
+            doc_id = doc.get('doc_id', 0)
+            
+            source_info = extract_source_from_text(text, score, doc_id, i + 1)
+            sources.append(source_info)
+    return sources
+
+def build_faq_source(faq_match):
+    """Sumber referensi untuk jawaban FAQ, termasuk skor kemiripan"""
+    return [{
+        "source": "FAQ",
+        "title": faq_match.get("faq_question") or "FAQ",
+        "preview": faq_match["answer"],
+        "score": float(faq_match.get("score") or 0.0),
+        "doc_id": faq_match.get("faq_id")
+    }]
+
+def process_question(question, bypass_cache=False):
+    """Proses pertanyaan: kembalikan stream jawaban, waktu retrieval, dan sumber referensi"""
     try:
-        # --- TAHAP 1: RETRIEVAL ---
-        start_time = time.time()
-        retrieved_docs = retriever.search(question)
-        retrieval_time = time.time() - start_time
+        # Guard rail + answer cache, lalu FAQ dan retrieval paralel; LLM mulai begitu context siap
+        result = load_pipeline(retriever, generator_id).run(question, bypass_cache=bypass_cache)
         
-        print(f"🔍 Retrieval found {len(retrieved_docs)} docs, time: {retrieval_time:.2f}s")
+        if result["kind"] == "rejected":
+            return result["stream"], 0, []
+        if result["kind"] == "faq":
+            faq_match = result["faq_match"]
+            log.debug(f"🎯 FAQ answer ({faq_match['match']}, score {faq_match['score']:.3f})")
+            return result["stream"], result["timings"]["ready"] / 1000, build_faq_source(faq_match)
+        if result["kind"] == "cache":
+            return result["stream"], 0, build_sources(result["docs"])
         
-        # --- TAHAP 2: GENERATION ---
-        gen_start = time.time()
-        answer = generate_answer(question, retrieved_docs, generator_id)
-        generation_time = time.time() - gen_start
+        retrieval_time = result["timings"].get("retrieval", 0) / 1000
+        log.debug(f"🔍 Retrieval found {len(result['docs'])} docs, time: {retrieval_time:.2f}s")
         
-        print(f"🤖 Generation time: {generation_time:.2f}s")
-        
-        # --- TAHAP 3: EKSTRAK SUMBER REFERENSI ---
-        sources = []
-        for i, doc in enumerate(retrieved_docs[:3]):
-            if isinstance(doc, dict):
-                text = doc.get('text', '')
-                score = doc.get('score', 0)
-                doc_id = doc.get('doc_id', 0)
-                
-                source_info = extract_source_from_text(text, score, doc_id, i + 1)
-                sources.append(source_info)
-        
-        return answer, retrieval_time, generation_time, sources
+        return result["stream"], retrieval_time, build_sources(result["docs"])
         
     except Exception as e:
-        return f"❌ Error: {str(e)}", 0, 0, []
+        return iter([f"❌ Error: {str(e)}"]), 0, []
         
 # ==============================
 # 5️⃣ SIDEBAR - CHAT ROOMS LIST
@@ -306,6 +344,12 @@ with st.sidebar:
     if st.session_state.current_chat_id and st.session_state.current_chat_id in st.session_state.chat_rooms:
         current_messages = st.session_state.chat_rooms[st.session_state.current_chat_id]["messages"]
         st.metric("Pesan di Chat Ini", len(current_messages))
+    
+    precheck_stats = get_precheck_stats()
+    st.metric("Retrieval Dihindari (Guard Rail)", precheck_stats["retrievals_avoided"])
+    
+    faq_stats = get_faq_stats()
+    st.metric("Dijawab FAQ (tanpa LLM)", faq_stats["llm_avoided"])
 
 # ==============================
 # 6️⃣ MAIN CHAT AREA
@@ -380,34 +424,48 @@ else:
         with chat_container:
             with st.chat_message("assistant"):
                 with st.spinner("🔄 Mencari informasi..."):
-                    # Proses pertanyaan
-                    answer, retrieval_time, generation_time, sources = process_question(prompt)
-                    
-                    # Tambahkan jawaban assistant ke chat
-                    add_message_to_chat(
-                        st.session_state.current_chat_id, 
-                        "assistant", 
-                        answer, 
-                        retrieval_time, 
-                        generation_time, 
-                        sources
+                    # Proses pertanyaan (retrieval), jawaban di-stream setelahnya
+                    answer_stream, retrieval_time, sources = process_question(
+                        prompt,
+                        bypass_cache=st.session_state.bypass_answer_cache
                     )
-                    
-                    # Tampilkan jawaban
+                
+                # Tampilkan jawaban token demi token
+                gen_start = time.time()
+                try:
+                    answer = st.write_stream(answer_stream)
+                except Exception as e:
+                    answer = f"❌ Error: {str(e)}"
                     st.markdown(answer)
-                    
-                    # Tampilkan sumber referensi
-                    if sources:
-                        with st.expander(f"📚 Lihat {len(sources)} Sumber Referensi", expanded=False):
-                            st.markdown(format_sources(sources))
-                    
-                    # Tampilkan metadata
-                    if retrieval_time > 0 or generation_time > 0:
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.caption(f"⏱️ Retrieval: {retrieval_time:.2f}s")
-                        with col2:
-                            st.caption(f"⏱️ Generation: {generation_time:.2f}s")
+                generation_time = time.time() - gen_start
+                
+                if not isinstance(answer, str):
+                    answer = "".join(str(part) for part in answer)
+                
+                log.debug(f"🤖 Generation time: {generation_time:.2f}s")
+                
+                # Tambahkan jawaban assistant ke chat
+                add_message_to_chat(
+                    st.session_state.current_chat_id, 
+                    "assistant", 
+                    answer, 
+                    retrieval_time, 
+                    generation_time, 
+                    sources
+                )
+                
+                # Tampilkan sumber referensi
+                if sources:
+                    with st.expander(f"📚 Lihat {len(sources)} Sumber Referensi", expanded=False):
+                        st.markdown(format_sources(sources))
+                
+                # Tampilkan metadata
+                if retrieval_time > 0 or generation_time > 0:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.caption(f"⏱️ Retrieval: {retrieval_time:.2f}s")
+                    with col2:
+                        st.caption(f"⏱️ Generation: {generation_time:.2f}s")
 
 
 st.markdown("---")
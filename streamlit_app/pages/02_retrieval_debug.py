@@ -6,18 +6,21 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
 src_path = os.path.join(project_root, "src")
 
-print(f"🔍 Project root: {project_root}")
-
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from src.telemetry import get_logger
+
+log = get_logger("retrieval_debug")
+log.debug(f"🔍 Project root: {project_root}")
+
 import streamlit as st
 
 try:
-    from retriever import Retriever
-    print("✅ Retriever imported successfully")
+    from retrieval_service import get_retriever
+    log.debug("✅ Retriever imported successfully")
 except ImportError as e:
     st.error(f"❌ Import failed: {e}")
     st.stop()
@@ -36,6 +39,14 @@ Masukkan pertanyaan, lalu lihat dokumen mana saja yang dianggap paling relevan.
 faiss_path = os.path.join(project_root, "faiss", "faiss_textcovid19.index")
 texts_path = os.path.join(project_root, "faiss", "faiss_textcovid19_texts.json")
 
+if "bypass_answer_cache" not in st.session_state:
+    st.session_state.bypass_answer_cache = False
+
+st.session_state.bypass_answer_cache = st.checkbox(
+    "⚡ Bypass answer cache di halaman Chat (paksa retrieval + LLM)",
+    value=st.session_state.bypass_answer_cache
+)
+
 with st.expander("🔧 Debug File Status"):
     st.write(f"Project root: `{project_root}`")
     st.write(f"FAISS index path: `{faiss_path}`")
@@ -47,7 +58,7 @@ with st.expander("🔧 Debug File Status"):
 @st.cache_resource
 def load_retriever():
     try:
-        retriever = Retriever()
+        retriever = get_retriever()
         st.success("✅ Retriever berhasil dimuat!")
         return retriever
     except Exception as e:
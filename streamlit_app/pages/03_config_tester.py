@@ -11,3 +11,17 @@ st.json({
     "Index Path": config.INDEX_PATH,
     "Text Path": config.TEXT_PATH,
 })
+
+st.write("## Guard Rail Rules:")
+try:
+    from src.guard_rail import get_guard_rail
+    st.json(get_guard_rail().rule_info())
+except Exception as e:
+    st.error(f"❌ Gagal memuat guard rail rules: {e}")
+
+st.write("## FAQ Table:")
+try:
+    from src.faq import get_faq_index
+    st.json(get_faq_index().info())
+except Exception as e:
+    st.error(f"❌ Gagal memuat tabel FAQ: {e}")
@@ -0,0 +1,67 @@
+import os
+import sys
+import datetime
+
+import numpy as np
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.timeseries import METRICS, TimeSeriesStore, to_day
+from src.rollups import Rollups, build_rollups, rollup_path_for
+
+PROVINCES = ["Bali", "DKI Jakarta", "Jawa Barat", "Kalimantan Timur", "Papua", "Papua Barat"]
+
+# Akhir 2020 dan pertengahan 2021: urutan kasus baru antar provinsi dibalik,
+# jadi ranking tahun 2020, 2021 dan seluruh data berbeda
+DATES = [datetime.date(2020, 12, 30), datetime.date(2020, 12, 31)] + [
+    datetime.date(2021, 7, day) for day in (14, 15, 16)
+]
+
+
+def _kasus_baru(province_id, date):
+    if date.year == 2020:
+        return (province_id + 1) * 100
+    return (len(PROVINCES) - province_id) * 10 + date.day
+
+
+def write_store(path):
+    """Store time-series kecil dengan format yang sama seperti build_store"""
+    columns = {metric: [] for metric in METRICS}
+    days, offsets = [], [0]
+    for province_id in range(len(PROVINCES)):
+        total = 0
+        for date in DATES:
+            new_cases = _kasus_baru(province_id, date)
+            total += new_cases
+            days.append(to_day(date))
+            columns["kasus_baru"].append(new_cases)
+            columns["kematian_baru"].append(new_cases // 10)
+            columns["sembuh_baru"].append(new_cases // 2)
+            columns["total_kasus"].append(total)
+            columns["total_kematian"].append(total // 10)
+            columns["total_sembuh"].append(total // 2)
+            columns["rasio_kematian"].append(10.0)
+            columns["rasio_kesembuhan"].append(50.0)
+            columns["jumlah_penduduk"].append(1000000)
+        offsets.append(len(days))
+
+    arrays = {
+        "provinces": np.array(PROVINCES, dtype=str),
+        "offsets": np.array(offsets, dtype="int64"),
+        "days": np.array(days, dtype="int32"),
+    }
+    for metric, (_, _, dtype) in METRICS.items():
+        arrays[f"m_{metric}"] = np.array(columns[metric], dtype=dtype)
+    np.savez(path, **arrays)
+
+
+@pytest.fixture
+def timeseries(tmp_path):
+    store_path = str(tmp_path / "covid19_timeseries.npz")
+    write_store(store_path)
+    store = TimeSeriesStore(store_path)
+    build_rollups(store, rollup_path_for(store_path))
+    return store, Rollups(rollup_path_for(store_path))
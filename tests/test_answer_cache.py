@@ -0,0 +1,35 @@
+from src.cache import AnswerCache, LRUCache
+
+
+def test_is_lru_with_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.cache.time.time", lambda: clock[0])
+    cache = AnswerCache(max_size=2, ttl=60)
+    assert isinstance(cache, LRUCache)
+
+    cache.put("a", {"answer": "A"})
+    cache.put("b", {"answer": "B"})
+    assert cache.get("a") == {"answer": "A"}
+    cache.put("c", {"answer": "C"})  # 'b' paling lama tidak dipakai
+    assert cache.get("b") is None
+
+    clock[0] += 61
+    assert cache.get("a") is None
+    assert len(cache) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["ttl"]) == (1, 2, 60)
+
+
+def test_discard_and_make_key():
+    cache = AnswerCache()
+    key = AnswerCache.make_key("Apa  gejala COVID?", "fp", "mistral", {"temperature": 0.1, "top_p": 0.9})
+    assert key == AnswerCache.make_key("apa gejala covid?", "fp", "mistral", {"top_p": 0.9, "temperature": 0.1})
+    cache.put(key, "jawaban")
+    cache.discard(key)
+    assert cache.get(key) is None
+
+
+def test_disabled_cache():
+    cache = AnswerCache(max_size=0)
+    cache.put("a", "A")
+    assert cache.get("a") is None
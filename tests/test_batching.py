@@ -0,0 +1,66 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.batching import MicroBatcher
+
+
+class SlowEncoder:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        time.sleep(self.delay)
+        return np.array([[float(len(text))] for text in texts], dtype="float32")
+
+
+def test_single_request_does_not_wait_for_window():
+    encoder = SlowEncoder(delay=0)
+    batcher = MicroBatcher(encoder, max_wait_ms=500)
+    start_time = time.perf_counter()
+    vectors = batcher.encode(["gejala covid"])
+    assert time.perf_counter() - start_time < 0.2
+    assert vectors.tolist() == [[12.0]]
+
+
+def test_concurrent_requests_are_batched():
+    encoder = SlowEncoder(delay=0.05)
+    batcher = MicroBatcher(encoder, max_wait_ms=5)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.encode(["x" * i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {i: vectors.tolist() for i, vectors in results.items()} == {i: [[float(i)]] for i in range(1, 9)}
+    assert len(encoder.calls) < 8
+    assert sum(encoder.calls) == 8
+
+
+def test_max_batch_size_respected():
+    encoder = SlowEncoder(delay=0.05)
+    batcher = MicroBatcher(encoder, max_batch_size=2)
+    threads = [threading.Thread(target=batcher.encode, args=(["a"],)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(encoder.calls) <= 2
+
+
+def test_error_propagates():
+    def broken(texts):
+        raise RuntimeError("model error")
+
+    batcher = MicroBatcher(broken)
+    with pytest.raises(RuntimeError, match="model error"):
+        batcher.encode(["a"])
@@ -0,0 +1,52 @@
+import os
+import json
+
+from src.chunk_store import ChunkStore, META_SUFFIX, open_texts, store_base_for, write_chunk_store
+
+
+def write_texts(tmp_path, texts):
+    texts_path = str(tmp_path / "texts.json")
+    with open(texts_path, "w", encoding="utf-8") as f:
+        json.dump(texts, f)
+    return texts_path
+
+
+def test_store_used_when_in_sync(tmp_path):
+    texts = ["chunk satu", "chunk dua"]
+    texts_path = write_texts(tmp_path, texts)
+    write_chunk_store(texts, store_base_for(texts_path), source_path=texts_path)
+
+    opened = open_texts(texts_path)
+    assert isinstance(opened, ChunkStore)
+    assert list(opened) == texts
+
+
+def test_rebuilt_json_falls_back_to_json(tmp_path):
+    texts_path = write_texts(tmp_path, ["lama satu", "lama dua"])
+    write_chunk_store(["lama satu", "lama dua"], store_base_for(texts_path), source_path=texts_path)
+
+    # Notebook menulis ulang texts JSON tanpa memperbarui store
+    new_texts = ["baru satu", "baru dua", "baru tiga"]
+    write_texts(tmp_path, new_texts)
+    stat = os.stat(texts_path)
+    os.utime(texts_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert open_texts(texts_path) == new_texts
+
+
+def test_store_without_metadata_falls_back_to_json(tmp_path):
+    texts = ["chunk satu"]
+    texts_path = write_texts(tmp_path, texts)
+    base_path = store_base_for(texts_path)
+    write_chunk_store(texts, base_path, source_path=texts_path)
+    os.remove(base_path + META_SUFFIX)
+
+    assert open_texts(texts_path) == texts
+
+
+def test_store_alone_is_used_without_json(tmp_path):
+    texts_path = write_texts(tmp_path, ["chunk satu"])
+    write_chunk_store(["chunk satu"], store_base_for(texts_path), source_path=texts_path)
+    os.remove(texts_path)
+
+    assert isinstance(open_texts(texts_path), ChunkStore)
@@ -0,0 +1,53 @@
+import numpy as np
+
+from src.cache import EmbeddingCache, LRUCache
+
+
+def test_is_lru_keyed_by_normalized_text():
+    cache = EmbeddingCache(max_size=2)
+    assert isinstance(cache, LRUCache)
+    cache.put("Gejala  COVID", [1, 2])
+    cache.put("vaksin", [3, 4])
+    assert cache.get("gejala covid").dtype == np.float32
+    cache.put("isolasi", [5, 6])  # 'vaksin' paling lama tidak dipakai
+    assert cache.get("vaksin") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "embeddings.npz")
+    cache = EmbeddingCache(max_size=4, path=path, model_name="mpnet")
+    cache.put("gejala covid", [1, 2])
+    cache.put("vaksin", [3, 4])
+    assert cache.save()
+
+    loaded = EmbeddingCache(max_size=4, path=path, model_name="mpnet")
+    assert len(loaded) == 2
+    np.testing.assert_array_equal(loaded.get("Vaksin"), [3, 4])
+
+
+def test_load_keeps_most_recent_within_max_size(tmp_path):
+    path = str(tmp_path / "embeddings.npz")
+    cache = EmbeddingCache(max_size=3, path=path)
+    for i in range(3):
+        cache.put(f"q{i}", [i, i])
+    cache.save()
+
+    loaded = EmbeddingCache(max_size=2, path=path)
+    assert loaded.get("q0") is None
+    assert loaded.get("q2") is not None
+
+
+def test_other_model_is_ignored(tmp_path):
+    path = str(tmp_path / "embeddings.npz")
+    cache = EmbeddingCache(path=path, model_name="mpnet")
+    cache.put("gejala covid", [1, 2])
+    cache.save()
+    assert len(EmbeddingCache(path=path, model_name="minilm")) == 0
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = EmbeddingCache(max_size=0, path=str(tmp_path / "embeddings.npz"))
+    cache.put("gejala covid", [1, 2])
+    assert cache.get("gejala covid") is None
+    assert not cache.save()
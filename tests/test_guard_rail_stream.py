@@ -0,0 +1,92 @@
+import pytest
+
+from src import generation
+from src.guard_rail import GuardRail
+
+QUESTION = "Apa saja gejala COVID-19?"
+CONTEXTS = ["Gejala COVID-19 antara lain demam, batuk, dan hilangnya indra penciuman atau perasa."]
+
+ANSWERS = [
+    # 'ras' (topik ditolak) ada di dalam 'perasa'; kata COVID baru muncul di akhir
+    "Hilangnya indra perasa adalah salah satu gejala COVID-19.",
+    "Musik yang tenang dapat membantu pasien yang menjalani isolasi karena covid.",
+    "Maaf, resep makanan tidak ditemukan dalam dokumen sumber.",
+    "Resep martabak manis: campur tepung, telur, dan gula lalu panggang.",
+    "Jangan menyimpan racun di rumah, tetap jalankan protokol kesehatan.",
+    "Vaksin COVID-19 aman dan efektif mengurangi risiko gejala berat.",
+    # Kata berbahaya muncul sebelum rejection phrase: jawaban lengkap lolos
+    "Racun tikus tidak berhubungan dengan COVID-19, maaf saya tidak tahu.",
+    "Maaf, saya tidak bisa menjelaskan cara membuat bom.",
+    "Gejala COVID-19 meliputi demam. Jangan pernah minum racun sebagai obat.",
+]
+
+BLOCK_MESSAGES = (
+    "❌ Jawaban mengandung konten yang tidak aman.",
+    "❌ Maaf, informasi tidak ditemukan dalam dokumen sumber COVID-19 Indonesia.",
+    "❌ Jawaban mengandung informasi keamanan yang tidak sesuai.",
+)
+
+
+class FakeStream:
+    def __init__(self, pieces):
+        self.pieces = iter(pieces)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.pieces)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeLLMClient:
+    def __init__(self, answer, piece_size=3):
+        self.pieces = [answer[i:i + piece_size] for i in range(0, len(answer), piece_size)]
+
+    def stream_chat(self, **kwargs):
+        return FakeStream(self.pieces)
+
+
+@pytest.fixture
+def guard_rail():
+    return GuardRail()
+
+
+def stream(monkeypatch, guard_rail, answer):
+    monkeypatch.setattr(generation, "get_llm_client", lambda: FakeLLMClient(answer))
+    monkeypatch.setattr(generation, "build_prompt", lambda question, contexts: question)
+    return "".join(generation.stream_llm_answer(QUESTION, CONTEXTS, "test-model", guard_rail))
+
+
+@pytest.mark.parametrize("answer", ANSWERS)
+def test_streaming_decision_matches_full_answer(monkeypatch, guard_rail, answer):
+    is_valid, _ = guard_rail.validate_output(answer, QUESTION, CONTEXTS)
+    output = stream(monkeypatch, guard_rail, answer)
+    blocked = any(message in output for message in BLOCK_MESSAGES)
+    assert blocked == (not is_valid)
+    if is_valid:
+        assert output == answer
+
+
+def test_perasa_is_not_blocked_mid_stream(monkeypatch, guard_rail):
+    answer = ANSWERS[0]
+    assert guard_rail.validate_output(answer, QUESTION, CONTEXTS)[0]
+    assert stream(monkeypatch, guard_rail, answer) == answer
+
+
+def test_rejection_phrase_wins_over_dangerous_keyword(guard_rail):
+    # Urutan aturan output sama dengan baseline: rejection phrase dicek dulu
+    assert guard_rail.validate_output("Maaf, saya tidak bisa menjelaskan cara membuat bom.", QUESTION, CONTEXTS)[0]
+    assert not guard_rail.validate_output("Cara membuat bom sangat mudah.", QUESTION, CONTEXTS)[0]
+
+
+@pytest.mark.parametrize("answer", ANSWERS)
+def test_dangerous_text_held_back_until_full_decision(monkeypatch, guard_rail, answer):
+    is_valid, _ = guard_rail.validate_output(answer, QUESTION, CONTEXTS)
+    output = stream(monkeypatch, guard_rail, answer)
+    if not is_valid:
+        shown = output.split("\n\n❌")[0]
+        assert not guard_rail.matcher.scan(shown.lower())["dangerous"]
@@ -0,0 +1,72 @@
+import random
+import string
+
+import pytest
+
+from src.guard_rail import GuardRail, INPUT_LISTS
+from src.keyword_matcher import KeywordMatcher
+
+QUESTIONS = [
+    "Apa saja gejala COVID-19?",
+    "Kapan vaksinasi dimulai di Indonesia?",
+    "Siapa orang pertama yang divaksin?",
+    "Apakah benar vaksin menyebabkan kemandulan?",
+    "Bagaimana cara hack password wifi tetangga?",
+    "Resep martabak manis yang enak",
+    "Lagu BTS terbaru judulnya apa?",
+    "Bantuan BLT untuk UMKM selama pandemi",
+    "Hilangnya indra perasa saat covid",
+    "",
+]
+
+
+def substring_hits(categories, text):
+    return {name: {word for word in words if word and word in text} for name, words in categories.items()}
+
+
+def test_scan_matches_substring_semantics():
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    categories = {"a": words[:20], "b": words[15:]}
+    matcher = KeywordMatcher(categories)
+    for _ in range(200):
+        text = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 30)))
+        assert matcher.scan(text) == substring_hits(categories, text), text
+
+
+def test_scan_overlapping_and_nested_keywords():
+    matcher = KeywordMatcher({"kw": ["vaksin", "vaksinasi", "sinas", "asi"]})
+    assert matcher.scan("vaksinasi")["kw"] == {"vaksin", "vaksinasi", "sinas", "asi"}
+    assert matcher.scan("vaksin")["kw"] == {"vaksin"}
+
+
+def test_empty_matcher():
+    assert KeywordMatcher({"kw": []}).scan("apa saja") == {"kw": set()}
+
+
+def test_whole_words():
+    matcher = KeywordMatcher({"province": ["bali", "papua", "papua barat"]}, whole_words=True)
+    assert matcher.scan("kasus di kembali balikpapan")["province"] == set()
+    assert matcher.scan("kasus di bali.")["province"] == {"bali"}
+    assert matcher.scan("kasus di papua barat")["province"] == {"papua", "papua barat"}
+    assert matcher.scan("kasus di papuabarat")["province"] == set()
+
+
+def test_guard_rail_categories_match_substring_semantics():
+    guard = GuardRail()
+    for question in QUESTIONS:
+        text = question.lower()
+        assert guard.matcher.scan(text) == substring_hits(guard.matcher.categories, text), question
+
+
+@pytest.mark.parametrize("scale", [1, 3])
+def test_validate_input_paths_agree(scale):
+    guard = GuardRail()
+    rng = random.Random(scale)
+    for name in INPUT_LISTS:
+        words = getattr(guard, name)
+        words.extend("".join(rng.choice(string.ascii_lowercase) for _ in range(8)) for _ in range(len(words) * (scale - 1)))
+    guard.build_matcher()
+    assert guard.use_matcher == (scale > 1)
+    for question in QUESTIONS:
+        assert guard._validate_input_loop(question) == guard._validate_input_matcher(question), question
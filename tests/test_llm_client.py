@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from benchmarks.mock_ollama import start_mock_server
+from src.llm_client import LLMTimeoutError, OllamaClient
+
+MESSAGES = [{"role": "user", "content": "Apa gejala COVID-19?"}]
+
+
+@pytest.fixture
+def mock_server():
+    server = start_mock_server(latency_ms=50, latency_sigma=0, tokens_per_s=200, tokens=10)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, timeout=5.0):
+    host, port = server.server_address
+    return OllamaClient(host=f"http://{host}:{port}", timeout=timeout, connect_timeout=1.0)
+
+
+def test_stream_completes(mock_server):
+    client = make_client(mock_server)
+    assert "".join(client.stream_chat("mistral:7b-instruct", MESSAGES))
+    stats = client.stats()
+    assert (stats["completed"], stats["timeouts"], stats["cancelled"]) == (1, 0, 0)
+
+
+def test_stream_timeout_counted_once(mock_server):
+    mock_server.latency_ms = 1000
+    client = make_client(mock_server, timeout=0.2)
+    with pytest.raises(LLMTimeoutError):
+        list(client.stream_chat("mistral:7b-instruct", MESSAGES))
+    stats = client.stats()
+    assert (stats["timeouts"], stats["cancelled"]) == (1, 0)
+
+
+def test_cancel_event_counted_as_cancelled(mock_server):
+    mock_server.latency_ms = 1000
+    client = make_client(mock_server)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    assert list(client.stream_chat("mistral:7b-instruct", MESSAGES, cancel_event=cancel_event)) == []
+    stats = client.stats()
+    assert (stats["timeouts"], stats["cancelled"]) == (0, 1)
+
+
+def test_list_models(mock_server):
+    assert make_client(mock_server).list_models() == ["mistral:7b-instruct"]
+
+
+def test_list_models_fails_fast_when_down():
+    client = OllamaClient(host="http://127.0.0.1:9", connect_timeout=0.5)
+    with pytest.raises(Exception):
+        client.list_models()
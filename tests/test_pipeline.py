@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from src import pipeline
+from src.pipeline import RequestPipeline
+
+
+class FakeRetriever:
+    index_fingerprint = "fp"
+
+    def __init__(self, search=None):
+        self._search = search or (lambda question: [{"text": "gejala covid", "score": 1.0}])
+
+    def search(self, question):
+        return self._search(question)
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Tahap generation diganti fake; return dict yang bisa diatur per test"""
+    state = {"faq": lambda question, retriever: None, "discarded": [], "release": threading.Event()}
+
+    def answer_stream(question, docs, model_id, index_fingerprint=None, bypass_cache=False, cancel_event=None):
+        state["release"].wait(5)
+        yield "jawaban"
+
+    monkeypatch.setattr(pipeline, "precheck_question", lambda question: (True, "OK"))
+    monkeypatch.setattr(pipeline, "get_cached_answer", lambda *args: None)
+    monkeypatch.setattr(pipeline, "get_faq_answer", lambda question, retriever: state["faq"](question, retriever))
+    monkeypatch.setattr(pipeline, "generate_answer_stream", answer_stream)
+    monkeypatch.setattr(pipeline, "discard_cached_answer", lambda question, *args: state["discarded"].append(question))
+    yield state
+    state["release"].set()
+
+
+def slow_faq(question, retriever):
+    time.sleep(0.2)
+    return {"answer": "jawaban FAQ"}
+
+
+@pytest.mark.parametrize("bypass_cache, discarded", [(False, ["q"]), (True, [])])
+def test_cancelled_speculation_discards_only_without_bypass(stages, bypass_cache, discarded):
+    stages["faq"] = slow_faq
+    result = RequestPipeline(FakeRetriever(), "model").run("q", bypass_cache=bypass_cache)
+    assert result["kind"] == "faq"
+    stages["release"].set()
+    time.sleep(0.1)
+    assert sorted(set(stages["discarded"])) == discarded
+
+
+def test_open_streams_do_not_starve_stage_workers(stages):
+    runner = RequestPipeline(FakeRetriever(), "model", max_workers=2, stream_workers=4, stage_timeout=2)
+    streams = [runner.run(f"q{i}")["stream"] for i in range(3)]
+    start_time = time.time()
+    result = runner.run("q-terakhir")
+    assert result["kind"] == "answer"
+    assert time.time() - start_time < 1
+    stages["release"].set()
+    assert [list(stream) for stream in streams] == [["jawaban"]] * 3
+
+
+def test_stage_timeout(stages):
+    blocker = threading.Event()
+    runner = RequestPipeline(FakeRetriever(lambda question: blocker.wait(5)), "model", stage_timeout=0.2)
+    start_time = time.time()
+    with pytest.raises(TimeoutError):
+        runner.run("q")
+    assert time.time() - start_time < 2
+    blocker.set()
+
+
+def test_stream_idle_timeout(stages):
+    runner = RequestPipeline(FakeRetriever(), "model", stage_timeout=0.2)
+    stream = runner.run("q")["stream"]
+    with pytest.raises(TimeoutError):
+        list(stream)
@@ -0,0 +1,109 @@
+import datetime
+
+import pytest
+
+from src.query_router import QueryRouter, parse_date, parse_month
+
+
+@pytest.fixture
+def router(timeseries):
+    store, rollups = timeseries
+    return QueryRouter(None, store, rollups)
+
+
+@pytest.mark.parametrize("question", [
+    "kapan sekolah dibuka kembali tahun 2021?",
+    "apakah kantor boleh buka kembali 15 juli 2021",
+    "berapa kasus baru di balikpapan 15 juli 2021",
+])
+def test_province_not_matched_inside_other_words(router, question):
+    parsed = router.parse(question)
+    assert parsed is None or parsed["province"] != "Bali"
+
+
+def test_province_whole_word(router):
+    parsed = router.parse("berapa kasus baru di Bali pada 15 juli 2021?")
+    assert parsed["kind"] == "daily"
+    assert parsed["province"] == "Bali"
+
+
+def test_multi_word_province_wins_over_prefix(router):
+    assert router.parse("kasus baru di papua barat 15/07/2021")["province"] == "Papua Barat"
+    assert router.parse("kasus baru di papua 15/07/2021")["province"] == "Papua"
+    assert router.parse("kasus baru di jawa barat 15/07/2021")["province"] == "Jawa Barat"
+
+
+def test_alias_whole_word(router):
+    assert router.parse("kasus baru di jabar 15 juli 2021")["province"] == "Jawa Barat"
+    assert router.parse("kasus baru di jabarkan 15 juli 2021") is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2021-07-15", datetime.date(2021, 7, 15)),
+    ("15/07/2021", datetime.date(2021, 7, 15)),
+    ("15 Juli 2021", datetime.date(2021, 7, 15)),
+    ("15 jul 2021", datetime.date(2021, 7, 15)),
+    ("1 Agustus 2021", datetime.date(2021, 8, 1)),
+    ("kasus tahun 2021", None),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize("text", ["31/02/2021", "2021-02-30", "31 februari 2021", "32 juli 2021", "15/13/2021"])
+def test_parse_date_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_date(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Juli 2021", (2021, 7)),
+    ("bulan mar 2022", (2022, 3)),
+    ("sept 2021", (2021, 9)),
+    ("2021-07", (2021, 7)),
+    ("mari 2022", None),
+    ("janji 2022", None),
+    ("tahun 2022", None),
+])
+def test_parse_month(text, expected):
+    assert parse_month(text) == expected
+
+
+def test_invalid_date_falls_back_to_retriever(router):
+    assert router.parse("kasus baru di bali 31/02/2021") is None
+    assert router.parse("kasus baru di bali 31 februari 2021") is None
+    assert router.parse("kasus baru di bali 2021-13") is None
+
+
+def test_non_month_word_is_not_a_month(router):
+    parsed = router.parse("kasus baru di bali mari 2021")
+    assert parsed["month"] is None
+    assert parsed["kind"] == "year"
+
+
+def test_ranking_by_year(router):
+    docs_2020 = router.route("provinsi dengan kasus tertinggi tahun 2020")
+    docs_2021 = router.route("provinsi dengan kasus tertinggi tahun 2021")
+    assert "tahun 2020" in docs_2020[0]["text"]
+    assert "1. Papua Barat" in docs_2020[0]["text"]
+    assert "tahun 2021" in docs_2021[0]["text"]
+    assert "1. Bali" in docs_2021[0]["text"]
+
+
+def test_ranking_by_date(router):
+    parsed = router.parse("provinsi dengan kasus tertinggi pada 15 juli 2021")
+    assert parsed["kind"] == "ranking"
+    assert parsed["date"] == datetime.date(2021, 7, 15)
+    text = router.answer(parsed)[0]["text"]
+    assert "2021-07-15" in text
+    assert "1. Bali (75)" in text
+
+
+def test_ranking_all_time_without_period(router):
+    text = router.route("provinsi dengan kasus tertinggi")[0]["text"]
+    assert "pada" not in text
+    assert "1. Papua Barat" in text
+
+
+def test_weekly_ranking_goes_to_retriever(router):
+    assert router.parse("provinsi dengan kasus tertinggi minggu 15 juli 2021") is None
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from src.reranker import Reranker
+from src.telemetry import render_metrics
+
+
+class FakeCrossEncoder:
+    """Skor = panjang teks; setiap predict butuh `delay` detik"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, pairs, batch_size=None, show_progress_bar=False):
+        self.calls.append(len(pairs))
+        time.sleep(self.delay)
+        return [float(len(text)) for _, text in pairs]
+
+
+def make_reranker(budget_ms=1000, max_pending=8, delay=0.05):
+    reranker = Reranker("fake", budget_ms=budget_ms, max_pending=max_pending)
+    reranker.model = FakeCrossEncoder(delay)
+    return reranker
+
+
+def docs_for(query):
+    return [{"doc_id": i, "text": f"{query} " + "x" * i, "rank": 5 - i} for i in range(1, 5)]
+
+
+def rerank_concurrently(reranker, queries):
+    results = {}
+
+    def worker(query):
+        results[query] = reranker.rerank(query, docs_for(query), keep=2)
+
+    threads = [threading.Thread(target=worker, args=(query,)) for query in queries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_rerank_orders_by_score():
+    docs, info = make_reranker().rerank("q", docs_for("q"), keep=2)
+    assert info["status"] == "ok"
+    assert [doc["doc_id"] for doc in docs] == [4, 3]
+    assert make_reranker().rerank("q", [], keep=2)[1]["status"] == "skipped"
+
+
+def test_concurrent_requests_are_batched_not_busy():
+    reranker = make_reranker()
+    queries = [f"pertanyaan {i}" for i in range(6)]
+    results = rerank_concurrently(reranker, queries)
+    assert {info["status"] for _, info in results.values()} == {"ok"}
+    assert len(reranker.model.calls) < len(queries)
+    assert sum(reranker.model.calls) == 4 * len(queries)
+    assert reranker.stats()["busy"] == 0
+
+
+def test_full_queue_is_busy_and_exported():
+    reranker = make_reranker(max_pending=1, delay=0.2)
+    results = rerank_concurrently(reranker, [f"pertanyaan {i}" for i in range(5)])
+    statuses = [info["status"] for _, info in results.values()]
+    assert "busy" in statuses
+    assert reranker.stats()["busy_rate"] > 0
+    assert 'chatbot_rerank_total{status="busy"}' in render_metrics()
+
+
+def test_late_scores_are_cached():
+    reranker = make_reranker(budget_ms=10, delay=0.1)
+    assert reranker.rerank("q", docs_for("q"))[1]["status"] == "timeout"
+    time.sleep(0.2)
+    assert reranker.rerank("q", docs_for("q"))[1]["status"] == "cached"
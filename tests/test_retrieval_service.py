@@ -0,0 +1,167 @@
+import http.client
+import socket
+import time
+import threading
+
+import numpy as np
+import pytest
+
+from src import retrieval_service
+from src.retrieval_service import MAX_TEXTS_PER_REQUEST, RetrievalServer, RetrieverClient
+
+
+class FakeRetriever:
+    def __init__(self, total=600):
+        self.texts = [f"chunk {i}" for i in range(total)]
+        self.index_fingerprint = "fp-1"
+
+    def get_index_stats(self):
+        return {"index_fingerprint": self.index_fingerprint, "total_texts": len(self.texts)}
+
+    def search(self, query, top_k=None):
+        return [{"text": self.texts[0], "score": 1.0}]
+
+    def encode_queries(self, queries):
+        return np.ones((len(queries), 4), dtype="float32")
+
+
+@pytest.fixture
+def service():
+    retriever = FakeRetriever()
+    server = RetrievalServer(("127.0.0.1", 0), retriever)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield retriever, RetrieverClient("127.0.0.1", server.server_address[1], timeout=5)
+    server.shutdown()
+    server.server_close()
+
+
+def test_texts_response_is_clamped(service):
+    _, client = service
+    texts = client._request("GET", "/texts?start=0&end=100000")["texts"]
+    assert len(texts) == MAX_TEXTS_PER_REQUEST
+
+
+def test_invalid_texts_range_rejected(service):
+    _, client = service
+    for path in ("/texts?start=-5&end=3", "/texts?start=5&end=2", "/texts?start=a"):
+        with pytest.raises(RuntimeError):
+            client._request("GET", path)
+
+
+def test_remote_texts_pages_large_slices(service):
+    retriever, client = service
+    assert client.texts[0:len(retriever.texts)] == retriever.texts
+    assert client.texts[10:400:7] == retriever.texts[10:400:7]
+    assert client.texts[-1] == retriever.texts[-1]
+
+
+def test_fingerprint_follows_service_index(service):
+    retriever, client = service
+    assert client.index_fingerprint == "fp-1"
+    retriever.index_fingerprint = "fp-2"
+    retriever.texts = retriever.texts[:10]
+    client.search("gejala covid")
+    assert client.index_fingerprint == "fp-2"
+    assert len(client.texts) == 10
+
+
+class FakeResponse:
+    status = 200
+
+    def read(self):
+        return b'{"status": "ok"}'
+
+
+class FakeConnection:
+    """Koneksi palsu: setiap request mengambil error berikutnya dari `errors` (None = sukses)"""
+    created = []
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.requests = 0
+        FakeConnection.created.append(self)
+
+    def request(self, *args, **kwargs):
+        self.requests += 1
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+
+    def getresponse(self):
+        return FakeResponse()
+
+    def close(self):
+        pass
+
+
+def fake_client(monkeypatch, errors):
+    FakeConnection.created = []
+    monkeypatch.setattr(retrieval_service.http.client, "HTTPConnection", lambda *a, **k: FakeConnection(errors))
+    monkeypatch.setattr(RetrieverClient, "get_index_stats", lambda self: {})
+    client = RetrieverClient("127.0.0.1", 1)
+    client._request("GET", "/health")  # koneksi keep-alive sudah terbuka
+    return client
+
+
+def test_stale_keep_alive_retried_once(monkeypatch):
+    errors = []
+    client = fake_client(monkeypatch, errors)
+    errors.append(http.client.RemoteDisconnected("closed"))
+    assert client._request("GET", "/health") == {"status": "ok"}
+    assert len(FakeConnection.created) == 2
+
+
+@pytest.mark.parametrize("error", [socket.timeout("timed out"), ConnectionRefusedError("refused")])
+def test_timeout_and_other_errors_not_retried(monkeypatch, error):
+    errors = []
+    client = fake_client(monkeypatch, errors)
+    errors.append(error)
+    with pytest.raises(type(error)):
+        client._request("POST", "/search", {"query": "x"})
+    assert len(FakeConnection.created) == 1
+
+
+def test_fresh_connection_not_retried(monkeypatch):
+    errors = [http.client.RemoteDisconnected("closed")]
+    FakeConnection.created = []
+    monkeypatch.setattr(retrieval_service.http.client, "HTTPConnection", lambda *a, **k: FakeConnection(errors))
+    monkeypatch.setattr(RetrieverClient, "get_index_stats", lambda self: {})
+    client = RetrieverClient("127.0.0.1", 1)
+    with pytest.raises(http.client.RemoteDisconnected):
+        client._request("GET", "/health")
+    assert len(FakeConnection.created) == 1
+
+
+def test_requests_reuse_one_keep_alive_connection(service):
+    _, client = service
+    conn = http.client.HTTPConnection(client.host, client.port, timeout=5)
+    responses = []
+    sockets = []
+    for method, path in (("GET", "/health"), ("GET", "/unknown"), ("GET", "/texts?start=0&end=2")):
+        conn.request(method, path)
+        response = conn.getresponse()
+        responses.append((response.status, response.getheader("Content-Length") is not None))
+        response.read()
+        sockets.append(conn.sock)
+    conn.close()
+    assert responses == [(200, True), (404, True), (200, True)]
+    assert sockets[0] is not None and all(sock is sockets[0] for sock in sockets)
+
+
+def test_client_keeps_its_connection(service):
+    _, client = service
+    client.is_alive()
+    sock = client._local.conn.sock
+    assert sock is not None
+    client.search("gejala covid")
+    assert client._local.conn.sock is sock
+
+
+def test_idle_connection_closed_by_server_is_reopened(service, monkeypatch):
+    _, client = service
+    monkeypatch.setattr(retrieval_service.RetrievalRequestHandler, "timeout", 0.2)
+    client._drop_connection(client._connection())
+    assert client.is_alive()
+    time.sleep(0.5)  # server menutup koneksi idle
+    assert client._request("GET", "/health") == {"status": "ok"}
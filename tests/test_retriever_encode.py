@@ -0,0 +1,84 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.cache import EmbeddingCache
+from src.retriever import Retriever
+
+
+class SlowEmbedder:
+    def __init__(self, delay=0.1, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("embedder error")
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype="float32")
+
+
+def make_retriever(embedder, cache_size=16):
+    """Retriever tanpa model/index: cukup untuk jalur _encode"""
+    retriever = Retriever.__new__(Retriever)
+    retriever.embedder = embedder
+    retriever.batcher = None
+    retriever.metric = "l2"
+    retriever.normalize_embeddings = True
+    retriever.embedding_cache = EmbeddingCache(max_size=cache_size)
+    retriever._inflight = {}
+    retriever._inflight_lock = threading.Lock()
+    return retriever
+
+
+def run_concurrently(*fns):
+    results = [None] * len(fns)
+    errors = [None] * len(fns)
+
+    def call(i, fn):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i, fn)) for i, fn in enumerate(fns)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+@pytest.mark.parametrize("cache_size", [16, 0])
+def test_concurrent_encodes_of_same_question_share_one_embedding(cache_size):
+    embedder = SlowEmbedder()
+    retriever = make_retriever(embedder, cache_size)
+    question = "Apa saja gejala COVID-19?"
+    (faq_vector, search_vector), errors = run_concurrently(
+        lambda: retriever._encode([question]),
+        lambda: retriever._encode([question.lower()]),
+    )
+    assert errors == [None, None]
+    assert len(embedder.calls) == 1
+    np.testing.assert_array_equal(faq_vector, search_vector)
+
+
+def test_duplicates_in_one_call_encoded_once():
+    embedder = SlowEmbedder(delay=0)
+    vectors = make_retriever(embedder)._encode(["gejala covid", "Gejala  COVID", "vaksin"])
+    assert embedder.calls == [["gejala covid", "vaksin"]]
+    np.testing.assert_array_equal(vectors[0], vectors[1])
+
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    embedder = SlowEmbedder(fail=True)
+    retriever = make_retriever(embedder)
+    _, errors = run_concurrently(lambda: retriever._encode(["q"]), lambda: retriever._encode(["q"]))
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert retriever._inflight == {}
+    embedder.fail = False
+    assert retriever._encode(["q"]).shape == (1, 2)
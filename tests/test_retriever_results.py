@@ -0,0 +1,70 @@
+import threading
+
+import faiss
+import numpy as np
+
+from src.cache import EmbeddingCache
+from src.lexical_index import LexicalIndex
+from src.retriever import Retriever
+
+VECTORS = np.eye(4, dtype="float32")
+
+
+class FakeEmbedder:
+    def encode(self, texts, convert_to_numpy=True):
+        return np.tile(VECTORS[0], (len(texts), 1))
+
+
+class NoMatchLexical:
+    """BM25 tanpa token yang cocok: semua skor 0"""
+
+    def __init__(self, n_docs):
+        self.n_docs = n_docs
+
+    def score(self, query):
+        return np.zeros(self.n_docs, dtype="float64")
+
+    top_k = staticmethod(LexicalIndex.top_k)
+
+
+def make_retriever(texts, lexical=None):
+    """Retriever dengan index flat kecil, tanpa model asli"""
+    retriever = Retriever.__new__(Retriever)
+    retriever.embedder = FakeEmbedder()
+    retriever.batcher = None
+    retriever.metric = "ip"
+    retriever.normalize_embeddings = True
+    retriever.embedding_cache = EmbeddingCache(max_size=16)
+    retriever._inflight = {}
+    retriever._inflight_lock = threading.Lock()
+    retriever.index = faiss.IndexFlatIP(VECTORS.shape[1])
+    retriever.index.add(VECTORS)
+    retriever.texts = texts
+    retriever.lexical = lexical
+    retriever.reranker = None
+    retriever.default_top_k = 2
+    retriever.hybrid_candidates = 4
+    retriever.rerank_candidates = 15
+    retriever.rrf_k = 60
+    retriever.score_threshold = 0.3
+    return retriever
+
+
+def test_debug_reports_candidates_actually_searched():
+    texts = ["gejala covid", "vaksin", "isolasi", "ppkm"]
+    _, dense_info = make_retriever(texts).search_with_debug("gejala covid", top_k=2)
+    assert (dense_info["top_k"], dense_info["total_docs_searched"]) == (2, 2)
+
+    _, hybrid_info = make_retriever(texts, NoMatchLexical(len(texts))).search_with_debug("gejala covid", top_k=2)
+    assert (hybrid_info["top_k"], hybrid_info["total_docs_searched"]) == (2, 4)
+
+
+def test_hybrid_fallback_has_same_shape_and_str_text():
+    texts = [{"chunk": "gejala covid"}, "vaksin", "isolasi", "ppkm"]
+    retriever = make_retriever(texts, NoMatchLexical(len(texts)))
+    results, info = retriever.search_with_debug("tidak ada yang cocok", top_k=2)
+    assert info["found_documents"] == 1
+    fallback = results[0]
+    assert fallback["text"] == str(texts[0])
+    assert set(fallback) == {"text", "score", "original_score", "bm25_score", "rrf_score", "rank", "doc_id"}
+    assert fallback["bm25_score"] == 0.0 and fallback["rrf_score"] > 0
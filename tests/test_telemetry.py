@@ -0,0 +1,19 @@
+from src.telemetry import MetricsRegistry
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.inc("chatbot_test_total", labels={"span": 'a"b\\c\nd'}, help_text="Baris satu\nbaris dua")
+    text = registry.render()
+    assert 'chatbot_test_total{span="a\\"b\\\\c\\nd"} 1' in text
+    assert "# HELP chatbot_test_total Baris satu\\nbaris dua" in text
+    # Satu sample per baris: newline di label tidak boleh memecah baris
+    assert len(text.strip().split("\n")) == 3
+
+
+def test_histogram_labels_are_escaped():
+    registry = MetricsRegistry()
+    registry.observe("chatbot_test_ms", 3, labels={"span": 'x"y'}, buckets=(1, 5))
+    text = registry.render()
+    assert 'chatbot_test_ms_bucket{span="x\\"y",le="5"} 1' in text
+    assert 'chatbot_test_ms_count{span="x\\"y"} 1' in text